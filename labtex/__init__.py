@@ -2,8 +2,18 @@ import imp
 from labtex.unit import Unit, U
 from labtex.measurement import Measurement, M
 from labtex.measurementlist import MeasurementList, ML
-from labtex.linear import LinearRegression
+from labtex.measurementarray import MeasurementArray
+from labtex.buffer import MeasurementBuffer
+from labtex.statistics import Statistics
+from labtex.covariance import Covariance
+from labtex.memmap import MappedMeasurementList
+from labtex.files import read_csv, write_csv, read_npz, write_npz, read_parquet, write_parquet
+from labtex.linear import LinearRegression, OnlineLinearRegression
+from labtex.leastsquares import LeastSquares, PolynomialRegression
 from labtex.nonlinear import NonlinearRegression
+from labtex.montecarlo import MonteCarlo
+from labtex.resampling import Bootstrap, Jackknife
+from labtex.lazy import Expression
 from labtex.document import Document
 
 
@@ -0,0 +1,86 @@
+from numbers import Number
+from typing import Iterable, Union
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement
+from labtex.measurementlist import MeasurementList, _conversionfactor, _readonly
+
+class MeasurementBuffer:
+    """A growable buffer of measurements sharing a unit, for streaming acquisition. For example,
+    >>> buffer = MeasurementBuffer("mV")
+    >>> buffer.append(Measurement(1.2, 0.1, "mV"))
+    >>> buffer.extend([1.3, 1.1], 0.1)
+    >>> buffer.freeze()
+
+    Appending is amortised constant time: the backing arrays double in capacity when full.
+    `freeze()` returns a MeasurementList viewing the measurements so far without copying them. Later appends
+    do not affect it. Measurements in other units with the same dimensions are converted as they are added.
+    Buffered measurements are independent inputs, so a frozen list is not correlated with the Measurements appended to it.
+    """
+    def __init__(self, unit : Union[Unit,str] = "", capacity : int = 1024):
+        self.unit = unit if isinstance(unit,Unit) else Unit(unit)
+        self._values = np.empty(max(1, capacity))
+        self._uncertainties = np.empty(max(1, capacity))
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return repr(self.freeze())
+
+    @property
+    def capacity(self):
+        return len(self._values)
+
+    def _reserve(self, length : int):
+        "Grow the backing arrays to hold at least `length` measurements, at least doubling their capacity."
+        if(length > self.capacity):
+            capacity = max(length, 2 * self.capacity)
+            for name in ('_values', '_uncertainties'):
+                grown = np.empty(capacity)
+                grown[:self._length] = getattr(self, name)[:self._length]
+                setattr(self, name, grown)
+
+    def _factor(self, unit : Unit):
+        if(unit == self.unit):
+            return 1
+        try:
+            return _conversionfactor(unit, self.unit)
+        except Exception:
+            raise Exception(f"MeasurementBuffer Error: Cannot add measurements in {unit} to a buffer in {self.unit}.")
+
+    def append(self, measurement : Union[Measurement,Number], uncertainty : Number = 0):
+        "Add a single Measurement, or a value and uncertainty in the units of the buffer."
+        if(isinstance(measurement,Measurement)):
+            factor = self._factor(measurement.unit)
+            value, uncertainty = measurement.value * factor, measurement.uncertainty * factor
+        elif(isinstance(measurement,Number)):
+            value = measurement
+        else:
+            raise Exception(f"MeasurementBuffer Error: Cannot append an object of type {type(measurement)}. Try a Measurement or a Number.")
+        self._reserve(self._length + 1)
+        self._values[self._length] = value
+        self._uncertainties[self._length] = uncertainty
+        self._length += 1
+
+    def extend(self, measurements : Union[MeasurementList,Iterable[Number]], uncertainties : Union[Number,Iterable[Number]] = 0):
+        "Add a MeasurementList, or arrays of values and uncertainties in the units of the buffer."
+        if(isinstance(measurements,MeasurementList)):
+            factor = self._factor(measurements.unit)
+            values, uncertainties = measurements._values * factor, measurements._uncertainties * factor
+        else:
+            values = np.asarray(measurements, dtype=float)
+        if(values.ndim != 1):
+            raise Exception(f"MeasurementBuffer Error: Can only extend by 1-D data. Shape: {values.shape}")
+        start, stop = self._length, self._length + len(values)
+        self._reserve(stop)
+        self._values[start:stop] = values
+        self._uncertainties[start:stop] = uncertainties
+        self._length = stop
+
+    def freeze(self):
+        "MeasurementList of the measurements buffered so far, viewing the buffer without copying."
+        return MeasurementList._new(_readonly(self._values[:self._length]), _readonly(self._uncertainties[:self._length]), self.unit)
@@ -0,0 +1,90 @@
+from typing import Union
+
+import numpy as np
+
+class Covariance:
+    """Covariance matrix of a MeasurementList, stored according to its structure:
+    - `diagonal`: independent measurements, `diag(diagonal)`
+    - `lowrank`: a few inputs shared between measurements, `diag(diagonal) + factor @ factor.T`
+    - `dense`: a full `dense` matrix, when a low rank factor would be no smaller
+
+    For example, a calibration line applied to a list is correlated through its two parameters only:
+    >>> fit = LinearRegression(x, y)
+    >>> fit.predict(z).covariance()
+    Covariance(lowrank, length 1000, rank 2)
+
+    so it takes O(n) memory. `toarray()` builds the full matrix and `@` multiplies by it without building it.
+    """
+    __slots__ = ('diagonal', 'factor', 'dense')
+
+    def __init__(self, diagonal : np.ndarray = None, factor : np.ndarray = None, dense : np.ndarray = None):
+        self.diagonal = diagonal
+        self.factor = factor if factor is None or factor.shape[1] else None
+        self.dense = dense
+
+    @classmethod
+    def from_array(cls, matrix : np.ndarray, tolerance : float = 1e-12):
+        """Store a covariance matrix by its structure: diagonal if it has no off-diagonal terms,
+        otherwise factored by its eigenvalues above `tolerance` times the largest, when there are fewer than its length."""
+        matrix = np.asarray(matrix, dtype=float)
+        if(matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]):
+            raise Exception(f"Covariance Error: A covariance matrix must be square. Shape: {matrix.shape}")
+        if(not np.allclose(matrix, matrix.T)):
+            raise Exception("Covariance Error: A covariance matrix must be symmetric.")
+        diagonal = np.diag(matrix).copy()
+        if(not np.any(matrix - np.diag(diagonal))):
+            return cls(diagonal)
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+        if(eigenvalues[0] < -tolerance * max(eigenvalues[-1], 0)):
+            raise Exception("Covariance Error: A covariance matrix must be positive semidefinite.")
+        kept = eigenvalues > tolerance * eigenvalues[-1]
+        if(np.count_nonzero(kept) < len(matrix)):
+            return cls(np.zeros(len(matrix)), eigenvectors[:, kept] * np.sqrt(eigenvalues[kept]))
+        return cls(dense=matrix)
+
+    @property
+    def structure(self):
+        if(self.dense is not None):
+            return 'dense'
+        return 'lowrank' if self.factor is not None else 'diagonal'
+
+    @property
+    def rank(self):
+        "Number of columns of the low rank factor, or the length of a dense or diagonal matrix."
+        return self.factor.shape[1] if self.structure == 'lowrank' else len(self)
+
+    def __len__(self):
+        return len(self.dense) if self.dense is not None else len(self.diagonal)
+
+    def __repr__(self):
+        return f"Covariance({self.structure}, length {len(self)}" + (f", rank {self.rank})" if self.structure == 'lowrank' else ")")
+
+    def variances(self):
+        "The diagonal of the matrix, i.e. the squared uncertainties."
+        if(self.dense is not None):
+            return np.diag(self.dense).copy()
+        if(self.factor is not None):
+            return self.diagonal + np.einsum('ij,ij->i', self.factor, self.factor)
+        return self.diagonal.copy()
+
+    def toarray(self):
+        "The full covariance matrix."
+        if(self.dense is not None):
+            return self.dense.copy()
+        matrix = np.diag(self.diagonal)
+        if(self.factor is not None):
+            matrix += self.factor @ self.factor.T
+        return matrix
+
+    def __array__(self, dtype = None, copy = None):
+        return self.toarray() if dtype is None else self.toarray().astype(dtype)
+
+    def __matmul__(self, obj : Union[np.ndarray,list]):
+        "Product of the covariance matrix with a vector or matrix, in O(n * rank) for diagonal and low rank matrices."
+        obj = np.asarray(obj, dtype=float)
+        if(self.dense is not None):
+            return self.dense @ obj
+        product = self.diagonal * obj if obj.ndim == 1 else self.diagonal[:, None] * obj
+        if(self.factor is not None):
+            product = product + self.factor @ (self.factor.T @ obj)
+        return product
@@ -0,0 +1,311 @@
+import math
+import operator
+import re
+from numbers import Number
+from typing import Union
+
+import numpy as np
+import pandas
+from pandas.api.extensions import ExtensionArray, ExtensionDtype, register_extension_dtype
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement
+from labtex.measurementlist import MeasurementList, _conversionfactor
+from labtex.files import _unitstring
+from labtex import ufunc as ufuncs
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# pandas (and, when pyarrow is installed, Arrow) support for columns of measurements.
+# Import this module to register the `measurement[unit]` dtype, e.g. before reading a Parquet file written with it.
+
+@register_extension_dtype
+class MeasurementDtype(ExtensionDtype):
+    """pandas dtype of a column of measurements in a single unit, named e.g. `measurement[mV]`.
+    >>> pandas.Series(ml.to_series())
+    >>> pandas.Series([1.2, 3.4], dtype="measurement[mV]")
+    """
+    type = Measurement
+    kind = 'O'
+    na_value = np.nan
+    _metadata = ('unit',)
+    _is_numeric = True
+    _match = re.compile(r'^measurement(?:\[(.*)\])?$')
+
+    def __init__(self, unit : Union[Unit,str] = ""):
+        self.unit = unit if isinstance(unit,Unit) else Unit(unit)
+
+    @property
+    def name(self):
+        return f"measurement[{_unitstring(self.unit)}]"
+
+    def __repr__(self):
+        return self.name
+
+    @classmethod
+    def construct_from_string(cls, string : str):
+        match = cls._match.match(string) if isinstance(string,str) else None
+        if(match is None):
+            raise TypeError(f"Cannot construct a 'MeasurementDtype' from '{string}'")
+        return cls(match.group(1) or "")
+
+    @classmethod
+    def construct_array_type(cls):
+        return MeasurementExtensionArray
+
+    def __from_arrow__(self, array):
+        "Convert an Arrow array of the `labtex.measurement` extension type, without copying a single chunk."
+        chunks = array.chunks if isinstance(array,pyarrow.ChunkedArray) else [array]
+        storage = [ chunk.storage if isinstance(chunk,pyarrow.ExtensionArray) else chunk for chunk in chunks ]
+        columns = [
+            [ chunk.field(field).to_numpy(zero_copy_only=False) for chunk in storage ] or [np.zeros(0)]
+            for field in ('value', 'uncertainty')
+        ]
+        values, uncertainties = ( column[0] if len(column) == 1 else np.concatenate(column) for column in columns )
+        return MeasurementExtensionArray(MeasurementList.from_arrays(values, uncertainties, self.unit))
+
+class MeasurementExtensionArray(ExtensionArray):
+    """pandas ExtensionArray wrapping a MeasurementList, so that a DataFrame column can hold one without copying.
+    >>> series = ml.to_series()
+    >>> MeasurementList.from_series(series * 2)
+
+    Arithmetic propagates uncertainty through the MeasurementList operations, and `sum`, `mean`, `std` and `sem`
+    (including in `groupby`) are vectorised. Grouped reductions and concatenation treat measurements as independent.
+    Scalars are Measurements, with missing values stored as NaN.
+    """
+    def __init__(self, ml : MeasurementList):
+        if(not isinstance(ml,MeasurementList)):
+            raise Exception(f"MeasurementExtensionArray Error: Expected a MeasurementList, not {type(ml).__name__}.")
+        self._data = ml
+        self._dtype = MeasurementDtype(ml.unit)
+
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype = None, copy : bool = False):
+        dtype = MeasurementDtype.construct_from_string(dtype) if isinstance(dtype,str) else dtype
+        unit = dtype.unit if isinstance(dtype,MeasurementDtype) else None
+        if(isinstance(scalars,MeasurementExtensionArray)):
+            scalars = scalars._data
+        if(isinstance(scalars,MeasurementList)):
+            return cls(scalars if unit is None or unit == scalars.unit else scalars.to(unit))
+        scalars = list(scalars)
+        if(unit is None):
+            unit = next((scalar.unit for scalar in scalars if isinstance(scalar,Measurement)), Unit(""))
+        values, uncertainties = np.full(len(scalars), np.nan), np.full(len(scalars), np.nan)
+        for i, scalar in enumerate(scalars):
+            if(isinstance(scalar,Measurement)):
+                factor = 1 if scalar.unit == unit else _conversionfactor(scalar.unit, unit)
+                values[i], uncertainties[i] = scalar.value * factor, scalar.uncertainty * factor
+            elif(isinstance(scalar,Number) and not (isinstance(scalar,float) and math.isnan(scalar))):
+                values[i], uncertainties[i] = scalar, 0
+            elif(scalar is not None and not (isinstance(scalar,float) and math.isnan(scalar)) and scalar is not pandas.NA):
+                raise TypeError(f"Cannot convert {type(scalar).__name__} to a Measurement")
+        return cls(MeasurementList._new(values, uncertainties, unit))
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls(MeasurementList._new(values.real.copy(), values.imag.copy(), original.dtype.unit))
+
+    def _values_for_factorize(self):
+        # Value and uncertainty together as one hashable number
+        return np.asarray(self._data._values) + 1j * np.broadcast_to(self._data._uncertainties, len(self)), np.nan
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def nbytes(self):
+        return self._data._values.nbytes + np.asarray(self._data._uncertainties).nbytes
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, item):
+        item = pandas.api.indexers.check_array_indexer(self, item) if isinstance(item,(np.ndarray,list,ExtensionArray)) else item
+        if(isinstance(item,tuple) and len(item) == 1):
+            item = item[0]
+        selected = self._data[item]
+        if(isinstance(selected,MeasurementList)):
+            return MeasurementExtensionArray(selected)
+        return self.dtype.na_value if math.isnan(selected.value) else selected
+
+    def __setitem__(self, key, value):
+        "Set elements in place. The column then no longer tracks the correlations of its MeasurementList."
+        key = pandas.api.indexers.check_array_indexer(self, key) if isinstance(key,(np.ndarray,list,ExtensionArray)) else key
+        if(isinstance(value,MeasurementExtensionArray)):
+            value = value._data
+        elif(not isinstance(value,MeasurementList)):
+            value = MeasurementExtensionArray._from_sequence(value if isinstance(value,(list,np.ndarray)) else [value], dtype=self.dtype)._data
+        factor = 1 if value.unit == self.dtype.unit else _conversionfactor(value.unit, self.dtype.unit)
+        values, uncertainties = np.array(self._data._values), np.array(np.broadcast_to(self._data._uncertainties, len(self)))
+        # A single measurement is set at every selected position
+        single = slice(None) if len(value) != 1 else 0
+        values[key] = value._values[single] * factor
+        uncertainties[key] = value._uncertainties[single] * factor
+        self._data = MeasurementList._new(values, uncertainties, self.dtype.unit)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __eq__(self, other):
+        if(isinstance(other,MeasurementExtensionArray)):
+            other = other._data
+        if(isinstance(other,(MeasurementList,Measurement))):
+            values, uncertainties = (other._values, other._uncertainties) if isinstance(other,MeasurementList) else (other.value, other.uncertainty)
+            return (self._data._values == values) & (self._data._uncertainties == uncertainties) & (self._data.unit == other.unit)
+        return np.zeros(len(self), dtype=bool)
+
+    def __ne__(self, other):
+        return ~self.__eq__(other)
+
+    def isna(self):
+        return np.isnan(self._data._values)
+
+    def take(self, indices, *, allow_fill : bool = False, fill_value = None):
+        indices = np.asarray(indices, dtype=np.intp)
+        if(not allow_fill):
+            return MeasurementExtensionArray(self._data[indices])
+        if(np.any(indices < -1)):
+            raise ValueError("Indices must be at least -1 when allow_fill is True")
+        if(len(self) == 0 and np.any(indices >= 0)):
+            raise IndexError("Cannot take from an empty MeasurementExtensionArray")
+        # Missing elements (-1) are filled with NaN
+        fill = np.nan if fill_value is None or (isinstance(fill_value,float) and math.isnan(fill_value)) else fill_value
+        if(isinstance(fill,Measurement)):
+            factor = 1 if fill.unit == self.dtype.unit else _conversionfactor(fill.unit, self.dtype.unit)
+            fill = (fill.value * factor, fill.uncertainty * factor)
+        else:
+            fill = (fill, fill)
+        values = np.where(indices == -1, fill[0], np.asarray(self._data._values)[indices] if len(self) else np.nan)
+        uncertainties = np.where(indices == -1, fill[1], np.broadcast_to(self._data._uncertainties, len(self))[indices] if len(self) else np.nan)
+        return MeasurementExtensionArray(MeasurementList._new(values, uncertainties, self.dtype.unit))
+
+    def copy(self):
+        return MeasurementExtensionArray(MeasurementList._new(np.array(self._data._values), np.array(self._data._uncertainties), self.dtype.unit))
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        unit = to_concat[0].dtype.unit
+        return cls(MeasurementList._new(
+            np.concatenate([ array._data._values for array in to_concat ]),
+            np.concatenate([ np.broadcast_to(array._data._uncertainties, len(array)) for array in to_concat ]),
+            unit
+        ))
+
+    def _formatter(self, boxed : bool = False):
+        return lambda measurement: "NaN" if not isinstance(measurement,Measurement) or math.isnan(measurement.value) else str(measurement)
+
+    def __array__(self, dtype = None, copy = None):
+        if(dtype in (None, object)):
+            return np.array([ self.dtype.na_value if math.isnan(measurement.value) else measurement for measurement in self._data ], dtype=object)
+        return np.asarray(self._data._values, dtype=dtype)
+
+    def __arrow_array__(self, type = None):
+        "Arrow array of the `labtex.measurement` extension type, sharing the value and uncertainty buffers."
+        arrowtype = MeasurementArrowType(self.dtype.unit)
+        storage = pyarrow.StructArray.from_arrays(
+            [ pyarrow.array(np.ascontiguousarray(self._data._values)), pyarrow.array(np.ascontiguousarray(np.broadcast_to(self._data._uncertainties, len(self)))) ],
+            fields=list(arrowtype.storage_type)
+        )
+        return pyarrow.ExtensionArray.from_storage(arrowtype, storage)
+
+    # Arithmetic through the MeasurementList operators
+    def _arithmetic(self, other, op):
+        if(isinstance(other,(pandas.Series,pandas.Index,pandas.DataFrame))):
+            return NotImplemented
+        if(isinstance(other,MeasurementExtensionArray)):
+            other = other._data
+        elif(isinstance(other,(np.ndarray,list))):
+            other = ufuncs.operands([np.asarray(other, dtype=float)])[0]
+        result = op(self._data, other)
+        return MeasurementExtensionArray(result) if isinstance(result,MeasurementList) else result
+
+    def __add__(self, other):
+        return self._arithmetic(other, operator.add)
+
+    def __radd__(self, other):
+        return self._arithmetic(other, lambda x, y: y + x)
+
+    def __sub__(self, other):
+        return self._arithmetic(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._arithmetic(other, lambda x, y: y - x)
+
+    def __mul__(self, other):
+        return self._arithmetic(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._arithmetic(other, lambda x, y: y * x)
+
+    def __truediv__(self, other):
+        return self._arithmetic(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self._arithmetic(other, lambda x, y: y / x)
+
+    def __pow__(self, other):
+        return self._arithmetic(other, operator.pow)
+
+    def __neg__(self):
+        return MeasurementExtensionArray(-self._data)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "NumPy ufuncs act on the MeasurementList, e.g. `np.sqrt(series)`."
+        inputs = [ x._data if isinstance(x,MeasurementExtensionArray) else x for x in inputs ]
+        result = getattr(ufunc, method)(*inputs, **kwargs)
+        return MeasurementExtensionArray(result) if isinstance(result,MeasurementList) else result
+
+    # Vectorised reductions
+    def _reduce(self, name : str, *, skipna : bool = True, keepdims : bool = False, **kwargs):
+        if(name not in ('sum', 'mean', 'std', 'sem')):
+            raise TypeError(f"'{type(self).__name__}' with dtype {self.dtype} does not support reduction '{name}'")
+        ml = self._data[~self.isna()] if skipna else self._data
+        result = getattr(ml, name)()
+        if(keepdims):
+            return MeasurementExtensionArray._from_sequence([result], dtype=self.dtype)
+        return result
+
+    def _groupby_op(self, *, how : str, has_dropped_na : bool, min_count : int, ngroups : int, ids : np.ndarray, **kwargs):
+        "Sums and means of each group with one pass over the column, adding uncertainties in quadrature."
+        if(how not in ('sum', 'mean')):
+            return super()._groupby_op(how=how, has_dropped_na=has_dropped_na, min_count=min_count, ngroups=ngroups, ids=ids, **kwargs)
+        values, uncertainties = np.asarray(self._data._values), np.broadcast_to(self._data._uncertainties, len(self))
+        keep = (ids >= 0) & ~np.isnan(values)
+        ids, values, uncertainties = ids[keep], values[keep], uncertainties[keep]
+        counts = np.bincount(ids, minlength=ngroups)
+        sums = np.bincount(ids, weights=values, minlength=ngroups)
+        variances = np.bincount(ids, weights=uncertainties**2, minlength=ngroups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if(how == 'mean'):
+                sums, variances = sums / counts, variances / counts**2
+        missing = counts < max(min_count, 1 if how == 'mean' else 0)
+        sums[missing] = variances[missing] = np.nan
+        return MeasurementExtensionArray(MeasurementList._new(sums, np.sqrt(variances), self.dtype.unit))
+
+if(pyarrow is not None):
+    class MeasurementArrowType(pyarrow.ExtensionType):
+        """Arrow extension type `labtex.measurement` of a column of measurements: a struct of `value` and `uncertainty`
+        float64 fields, with the unit as its metadata. It converts to a `MeasurementDtype` column in pandas."""
+        def __init__(self, unit : Union[Unit,str] = ""):
+            self.unit = unit if isinstance(unit,Unit) else Unit(unit)
+            super().__init__(pyarrow.struct([("value", pyarrow.float64()), ("uncertainty", pyarrow.float64())]), "labtex.measurement")
+
+        def __arrow_ext_serialize__(self):
+            return _unitstring(self.unit).encode()
+
+        @classmethod
+        def __arrow_ext_deserialize__(cls, storage_type, serialized):
+            return cls(serialized.decode())
+
+        def to_pandas_dtype(self):
+            return MeasurementDtype(self.unit)
+
+    try:
+        pyarrow.register_extension_type(MeasurementArrowType())
+    except pyarrow.ArrowKeyError:
+        # Already registered, e.g. when the module is reloaded
+        pass
@@ -2,6 +2,7 @@ import subprocess
 import regex as re
 from labtex.linear import LinearRegression
 from labtex.measurementlist import MeasurementList
+from labtex.lazy import Expression
 
 from typing import Any, List, Union
 
@@ -129,6 +130,8 @@ r"""\begin{table}[ht]!regex
     def table_code(self,nameandsymbols : List[str], data : List[MeasurementList], \
         headers :List[str] = [], caption : str = "", label : str = "", style : str = "sideways"):
 
+        # Lazy expressions are evaluated once, here
+        data = [line.evaluate() if isinstance(line, Expression) else line for line in data]
         assert len(nameandsymbols) == len(data)
         assert all(len(data[0]) == len(line) for line in data)
         columns = len(data[0])
@@ -0,0 +1,164 @@
+from numbers import Number
+from typing import Any, Union
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement, _propagate
+from labtex.measurementlist import MeasurementList, _propagatelist, _conversionfactor
+from labtex import ufunc as ufuncs
+
+class Dual:
+    """Vectorised dual number for forward mode differentiation.
+    Carries a value (a float or an array over a list) and its tangent with respect to every input at once,
+    with the inputs along the first axis of `tangent`, and the unit of the value. Supports arithmetic and the NumPy
+    ufuncs that Measurements support, combining units and prefixes like them, so functions written with NumPy
+    can be differentiated exactly in one pass."""
+    __slots__ = ('value', 'tangent', 'unit')
+
+    def __init__(self, value, tangent, unit : Unit = Unit("")):
+        self.value = value
+        self.tangent = tangent
+        self.unit = unit
+
+    def __repr__(self):
+        return f"Dual({self.value}, {self.tangent}, {self.unit})"
+
+    def __add__(self,obj):
+        if(isinstance(obj,Dual)):
+            try:
+                factor = _conversionfactor(obj.unit, self.unit)
+            except Exception:
+                raise Exception(f"Cannot add measurements with different units: {self.unit} and {obj.unit}")
+            return Dual(self.value + obj.value * factor, self.tangent + obj.tangent * factor, self.unit)
+        # Constants are added in the units of the dual number, as for Measurements
+        return Dual(self.value + obj, self.tangent, self.unit)
+
+    def __radd__(self,obj):
+        return self.__add__(obj)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.tangent, self.unit)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Dual(abs(self.value), np.sign(self.value) * self.tangent, self.unit)
+
+    def __sub__(self,obj):
+        return self.__add__(-obj)
+
+    def __rsub__(self,obj):
+        return self.__neg__().__add__(obj)
+
+    def __mul__(self,obj):
+        if(isinstance(obj,Dual)):
+            factor, unit = Unit.product(self.unit, obj.unit)
+            return Dual(self.value * obj.value * factor, (self.tangent * obj.value + self.value * obj.tangent) * factor, unit)
+        return Dual(self.value * obj, self.tangent * obj, self.unit)
+
+    def __rmul__(self,obj):
+        return self.__mul__(obj)
+
+    def __truediv__(self,obj):
+        if(isinstance(obj,Dual)):
+            factor, unit = Unit.quotient(self.unit, obj.unit)
+            denominator = obj.value * factor
+            value = self.value / denominator
+            return Dual(value, (self.tangent - value * obj.tangent * factor) / denominator, unit)
+        return Dual(self.value / obj, self.tangent / obj, self.unit)
+
+    def __rtruediv__(self,obj):
+        value = obj / self.value
+        return Dual(value, -value / self.value * self.tangent, 1 / self.unit)
+
+    def __pow__(self,obj):
+        if(isinstance(obj,Dual)):
+            if(not Unit.unitless(obj.unit) or np.ndim(obj.value) != 0):
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+            value = self.value ** obj.value
+            return Dual(value, obj.value * self.value ** (obj.value - 1) * self.tangent + value * np.log(self.value) * obj.tangent, self.unit ** obj.value)
+        return Dual(self.value ** obj, obj * self.value ** (obj - 1) * self.tangent if obj != 0 else 0 * self.tangent, self.unit ** obj)
+
+    def __rpow__(self,obj):
+        if(not Unit.unitless(self.unit)):
+            raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+        value = obj ** self.value
+        return Dual(value, value * np.log(obj) * self.tangent, Unit(""))
+
+    # Comparisons act on the value, in the units of the left operand, so functions can branch on their inputs
+    def _compared(self,obj):
+        return obj.value * _conversionfactor(obj.unit, self.unit) if isinstance(obj,Dual) else obj
+
+    def __lt__(self,obj):
+        return self.value < self._compared(obj)
+
+    def __le__(self,obj):
+        return self.value <= self._compared(obj)
+
+    def __gt__(self,obj):
+        return self.value > self._compared(obj)
+
+    def __ge__(self,obj):
+        return self.value >= self._compared(obj)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "Differentiate through NumPy ufuncs, using the same derivatives and unit rules as Measurements."
+        if(method != '__call__' or kwargs):
+            return NotImplemented
+        if(len(inputs) == 2 and ufunc in ufuncs.binary):
+            inputs = [ obj.item() if isinstance(obj,np.generic) else obj for obj in inputs ]
+            if(not isinstance(inputs[0],Dual)):
+                # e.g. ndarray * Dual, which would otherwise return NotImplemented from the ndarray
+                return getattr(inputs[1], f"__r{ufuncs.binary[ufunc].__name__}__")(inputs[0])
+            return ufuncs.binary[ufunc](*inputs)
+        if(len(inputs) == 1):
+            result = ufuncs.apply(ufunc, self.value, self.unit)
+            if(result is not None):
+                value, derivative, unit = result
+                return Dual(value, derivative * self.tangent, unit)
+        return NotImplemented
+
+def apply(func : Any, *args : Union[Measurement,MeasurementList], unit : Union[Unit,str] = None):
+    """Propagate uncertainty through `func` using its exact partial derivatives, computed with dual numbers.
+    `func` takes the values of `args` in their own units and may use arithmetic and NumPy ufuncs, which combine
+    units and prefixes as they do for Measurements, giving the unit of the result. With `unit`, the result is
+    converted to it. Returns a MeasurementList if any argument is a MeasurementList and a Measurement otherwise."""
+    if(not all(isinstance(x,(Measurement,MeasurementList)) for x in args)):
+        raise Exception("Apply Error: Arguments must be Measurements or MeasurementLists.")
+    lengths = { len(x) for x in args if isinstance(x,MeasurementList) }
+    if(len(lengths) > 1):
+        raise Exception(f"Apply Error: MeasurementList arguments must have the same length. Lengths: {lengths}")
+    length = lengths.pop() if lengths else None
+    if(unit is not None):
+        unit = unit if isinstance(unit,Unit) else Unit(unit)
+
+    # Seed one tangent direction per argument
+    shape = (len(args),) if length is None else (len(args), length)
+    duals = []
+    for i, x in enumerate(args):
+        value = x._values if isinstance(x,MeasurementList) else x.value
+        tangent = np.zeros(shape)
+        tangent[i] = 1
+        duals.append(Dual(value if length is None else np.broadcast_to(value, (length,)), tangent, x.unit))
+    result = func(*duals)
+    if(not isinstance(result,Dual)):
+        # A constant result is taken to be in `unit`
+        result = Dual(result, np.zeros(shape), Unit("") if unit is None else unit)
+
+    # Derivatives of the result in `unit` with respect to each argument in its own unit
+    factor = 1
+    if(unit is not None):
+        try:
+            factor = _conversionfactor(result.unit, unit)
+        except Exception as error:
+            raise Exception(f"Apply Error: The result, in {result.unit}, cannot be given in {unit} ({error}).")
+    else:
+        unit = result.unit
+    values = result.value * factor
+    tangent = np.broadcast_to(result.tangent, shape) * factor
+    terms = [ (tangent[i], x) for i, x in enumerate(args) ]
+    if(length is None):
+        return Measurement._derived(float(values), _propagate(*( (float(derivative), x.components) for derivative, x in terms )), unit)
+    return MeasurementList._derived(np.array(np.broadcast_to(values, (length,)), dtype=float), *_propagatelist(length, *terms), unit)
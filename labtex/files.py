@@ -0,0 +1,131 @@
+import itertools
+import re
+from typing import Dict
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurementlist import MeasurementList, _conversionfactor
+from labtex.buffer import MeasurementBuffer
+
+# Reading and writing columns of measurements.
+# Every format names its columns by the same convention: `V [mV]` holds values in mV and `dV` (or `dV [uV]`)
+# their uncertainties, in the unit of the values unless one is given. Columns without an uncertainty column are exact.
+
+_header = re.compile(r'^\s*(.*?)\s*(?:\[(.*)\])?\s*$')
+
+def _parseheader(names : list):
+    """Pair each value column with its uncertainty column.
+    Returns (name, unit, value index, uncertainty index or None, uncertainty conversion factor) for every value column."""
+    parsed = [ _header.match(name).groups() for name in names ]
+    indices = { name: i for i, (name, _) in enumerate(parsed) }
+    columns = []
+    for i, (name, unit) in enumerate(parsed):
+        if(name.startswith('d') and name[1:] in indices):
+            continue
+        try:
+            unit = Unit(unit or "")
+            uncertainty = indices.get('d' + name)
+            factor = 1
+            if(uncertainty is not None and parsed[uncertainty][1]):
+                factor = _conversionfactor(Unit(parsed[uncertainty][1]), unit)
+        except Exception as error:
+            raise Exception(f"IO Error: Could not read the units of column '{names[i]}' ({error}).")
+        columns.append((name, unit, i, uncertainty, factor))
+    return columns
+
+def _read(names : list, blocks) -> Dict[str, MeasurementList]:
+    "Collect blocks of columns (2-D arrays, one column per name) into a MeasurementList per value column."
+    columns = _parseheader(names)
+    buffers = { name: MeasurementBuffer(unit) for name, unit, _, _, _ in columns }
+    for block in blocks:
+        for name, _, value, uncertainty, factor in columns:
+            buffers[name].extend(block[value], 0 if uncertainty is None else block[uncertainty] * factor)
+    return { name: buffer.freeze() for name, buffer in buffers.items() }
+
+def _unitstring(unit : Unit):
+    "Unit in a form that `Unit` parses back. Fractional powers are written in full so they read back exactly."
+    return " ".join(
+        f"{dim['prefix']}{symbol}" + (f"^{_power(dim['power'])}" if dim['power'] != 1 else "")
+        for symbol, dim in unit.units.items() if dim['power'] != 0
+    )
+
+def _power(power):
+    return f"{power:g}" if float(power).is_integer() else repr(float(power))
+
+def _write(columns : Dict[str, MeasurementList]):
+    "Header names and arrays of the value and uncertainty columns to write."
+    if(not columns):
+        raise Exception("IO Error: There are no columns to write.")
+    lengths = { len(ml) for ml in columns.values() }
+    if(len(lengths) > 1):
+        raise Exception(f"IO Error: All columns must have the same length. Lengths: {lengths}")
+    names, arrays = [], []
+    for name, ml in columns.items():
+        if(not isinstance(ml,MeasurementList)):
+            raise Exception(f"IO Error: Column '{name}' must be a MeasurementList, not {type(ml).__name__}.")
+        unit = _unitstring(ml.unit)
+        names += [f"{name} [{unit}]" if unit else name, f"d{name}"]
+        arrays += [np.asarray(ml._values), np.broadcast_to(ml._uncertainties, len(ml))]
+    return names, arrays
+
+def read_csv(path : str, delimiter : str = ",", chunksize : int = 2**16, comments : str = "#") -> Dict[str, MeasurementList]:
+    """Read the columns of a CSV file as MeasurementLists keyed by name, e.g. a header `V [mV],dV,t [s]`.
+    Every column of `chunksize` rows is parsed at once, so memory use beyond the result does not depend on the length of the file."""
+    with open(path) as file:
+        header = next((line for line in file if line.strip() and not line.startswith(comments)), None)
+        if(header is None):
+            raise Exception(f"IO Error: {path} has no header.")
+        names = [ name.strip() for name in header.split(delimiter) ]
+        def blocks():
+            while True:
+                lines = list(itertools.islice(file, chunksize))
+                if(not lines):
+                    return
+                block = np.loadtxt(lines, delimiter=delimiter, comments=comments, ndmin=2)
+                if(block.size):
+                    if(block.shape[1] != len(names)):
+                        raise Exception(f"IO Error: {path} has {block.shape[1]} columns but its header names {len(names)}.")
+                    yield block.T
+        return _read(names, blocks())
+
+def write_csv(path : str, columns : Dict[str, MeasurementList], delimiter : str = ",", chunksize : int = 2**16):
+    """Write MeasurementLists keyed by name to a CSV file, with a value and uncertainty column for each.
+    Numbers are written in their shortest form that reads back exactly, `chunksize` rows at a time."""
+    names, arrays = _write(columns)
+    row = delimiter.join(["%r"] * len(arrays)) + "\n"
+    with open(path, 'w') as file:
+        file.write(delimiter.join(names) + "\n")
+        for start in range(0, len(arrays[0]), chunksize):
+            file.write("".join(row % tuple(values) for values in np.column_stack([ array[start:start + chunksize] for array in arrays ]).tolist()))
+
+def read_npz(path : str) -> Dict[str, MeasurementList]:
+    "Read MeasurementLists from a NumPy `.npz` archive written by `write_npz`."
+    with np.load(path) as archive:
+        return _read(archive.files, [[ archive[name] for name in archive.files ]])
+
+def write_npz(path : str, columns : Dict[str, MeasurementList], compressed : bool = False):
+    "Write MeasurementLists keyed by name to a binary NumPy `.npz` archive, one array per value and uncertainty column."
+    names, arrays = _write(columns)
+    (np.savez_compressed if compressed else np.savez)(path, **dict(zip(names, arrays)))
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception("IO Error: Reading and writing Parquet files requires pyarrow. Install it with `pip install pyarrow`.")
+    return pyarrow
+
+def read_parquet(path : str, chunksize : int = 2**16) -> Dict[str, MeasurementList]:
+    "Read MeasurementLists from a Parquet file in batches of `chunksize` rows. Requires pyarrow."
+    pyarrow = _pyarrow()
+    file = pyarrow.parquet.ParquetFile(path)
+    blocks = ( [ column.to_numpy() for column in batch.columns ] for batch in file.iter_batches(batch_size=chunksize) )
+    return _read(file.schema_arrow.names, blocks)
+
+def write_parquet(path : str, columns : Dict[str, MeasurementList]):
+    "Write MeasurementLists keyed by name to a Parquet file. Requires pyarrow."
+    pyarrow = _pyarrow()
+    names, arrays = _write(columns)
+    pyarrow.parquet.write_table(pyarrow.table({ name: np.ascontiguousarray(array) for name, array in zip(names, arrays) }), path)
@@ -0,0 +1,274 @@
+import math
+from numbers import Number
+from typing import Union
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement, _propagate
+from labtex.measurementlist import MeasurementList, _propagatelist, _conversionfactor
+from labtex import ufunc as ufuncs
+
+class Expression:
+    """A lazily evaluated formula of Measurements and MeasurementLists.
+    Create one with `x.lazy()`. Operators then build an expression graph instead of computing each step,
+    and the result is evaluated once by `evaluate()`, `repr` or table output. For example,
+    >>> x = MeasurementList([1,2,3],0.1,"m").lazy()
+    >>> y = x * x + np.sin(x / Measurement(2,0,"m")) * x
+    >>> y.evaluate()
+
+    Repeated subexpressions are only evaluated once, and the elementwise steps are evaluated together over
+    blocks of at most `chunksize` elements so that no intermediate list is created at full length.
+    Units are checked as the expression is built.
+    """
+    chunksize = 2**16
+    __slots__ = ('operation', 'operands', 'unit', 'length', 'factor', '_result')
+
+    def __init__(self, operation, operands : tuple, unit : Unit, length : int = None, factor : float = 1):
+        self.operation = operation
+        self.operands = operands
+        self.unit = unit
+        self.length = length
+        # Factor converting the prefixes of the second operand onto those of the first
+        self.factor = factor
+        self._result = None
+
+    @staticmethod
+    def leaf(x : Union[Measurement,MeasurementList]):
+        "Wrap a Measurement or MeasurementList as the input of an expression."
+        return Expression('leaf', (x,), x.unit, len(x) if isinstance(x,MeasurementList) else None)
+
+    @staticmethod
+    def _wrap(obj):
+        "Convert an operand to an Expression, or return None if it is not supported."
+        if(isinstance(obj,Expression)):
+            return obj
+        if(isinstance(obj,(Measurement,MeasurementList))):
+            return Expression.leaf(obj)
+        if(isinstance(obj,Number)):
+            return Expression('constant', (obj,), Unit(""))
+        # An array holds a constant for each element, in the units of the other operand like a number
+        if(isinstance(obj,np.ndarray) and obj.ndim == 1 and obj.dtype.kind in 'biuf'):
+            return Expression('constant', (np.asarray(obj, dtype=float),), Unit(""), len(obj))
+        return None
+
+    @staticmethod
+    def _length(a, b):
+        if(a.length is not None and b.length is not None and a.length != b.length):
+            raise Exception(f"MeasurementList Error: Cannot combine two MeasurementLists with different lengths: {a.length} =/= {b.length}.")
+        return a.length if a.length is not None else b.length
+
+    def __repr__(self):
+        return repr(self.evaluate())
+
+    def __len__(self):
+        if(self.length is None):
+            raise TypeError("Expression of a single Measurement has no len()")
+        return self.length
+
+    def tableprint(self, novalues = False, nounits = False):
+        "Evaluate the expression and return it in printable LaTeX table format. Used in `Document().table()`."
+        return self.evaluate().tableprint(novalues, nounits)
+
+    def __add__(self,obj):
+        obj = Expression._wrap(obj)
+        if(obj is None):
+            return NotImplemented
+        # Constants are added in the units of the expression, as for Measurements
+        if(obj.operation == 'constant' or self.operation == 'constant'):
+            unit, factor = (self.unit if obj.operation == 'constant' else obj.unit), 1
+        else:
+            try:
+                factor = _conversionfactor(obj.unit, self.unit)
+            except Exception:
+                raise Exception(f"Cannot add measurements with different units: {self.unit} and {obj.unit}")
+            unit = self.unit
+        return Expression('+', (self, obj), unit, Expression._length(self, obj), factor)
+
+    def __radd__(self,obj):
+        return self.__add__(obj)
+
+    def __neg__(self):
+        return Expression('neg', (self,), self.unit, self.length)
+
+    def __sub__(self,obj):
+        if(isinstance(obj,Number)):
+            return self.__add__(-obj)
+        obj = Expression._wrap(obj)
+        if(obj is None):
+            return NotImplemented
+        return self.__add__(-obj)
+
+    def __rsub__(self,obj):
+        return self.__neg__().__add__(obj)
+
+    def __mul__(self,obj):
+        obj = Expression._wrap(obj)
+        if(obj is None):
+            return NotImplemented
+        factor, unit = Unit.product(self.unit, obj.unit)
+        return Expression('*', (self, obj), unit, Expression._length(self, obj), factor)
+
+    def __rmul__(self,obj):
+        obj = Expression._wrap(obj)
+        if(obj is None):
+            return NotImplemented
+        return obj.__mul__(self)
+
+    def __truediv__(self,obj):
+        obj = Expression._wrap(obj)
+        if(obj is None):
+            return NotImplemented
+        if(self.operation == 'constant'):
+            factor, unit = 1, 1 / obj.unit
+        else:
+            factor, unit = Unit.quotient(self.unit, obj.unit)
+        return Expression('/', (self, obj), unit, Expression._length(self, obj), factor)
+
+    def __rtruediv__(self,obj):
+        obj = Expression._wrap(obj)
+        if(obj is None):
+            return NotImplemented
+        return obj.__truediv__(self)
+
+    def __pow__(self,obj):
+        if(isinstance(obj,Expression)):
+            obj = obj.evaluate()
+        if(isinstance(obj,Measurement)):
+            if(not Unit.unitless(obj.unit)):
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+            return Expression('**', (self, Expression.leaf(obj)), self.unit ** obj.value, self.length)
+        if(isinstance(obj,Number)):
+            return Expression('**', (self, Expression('constant', (obj,), Unit(""))), self.unit ** obj, self.length)
+        return NotImplemented
+
+    def __rpow__(self,obj):
+        if(isinstance(obj,Number)):
+            if(not Unit.unitless(self.unit)):
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+            return Expression('**', (Expression('constant', (obj,), Unit("")), self), Unit(""), self.length)
+        return NotImplemented
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "Record NumPy ufuncs such as `np.sin(x)` in the expression."
+        if(method != '__call__' or kwargs):
+            return NotImplemented
+        if(len(inputs) == 2 and ufunc in ufuncs.binary):
+            inputs = ufuncs.operands(inputs)
+            return ufuncs.call(ufunc, *inputs) if inputs is not None else NotImplemented
+        if(len(inputs) == 1 and ufunc in ufuncs.unary):
+            return Expression(ufunc, (self,), ufuncs.unary[ufunc][1](self.unit), self.length)
+        return NotImplemented
+
+    def _graph(self):
+        """Merge repeated subexpressions and return the distinct nodes in evaluation order,
+        with the operands of each node replaced by their positions in that order.
+        Nodes are merged when they apply the same operation to the same (merged) operands."""
+        positions, merged, nodes, graph = {}, {}, [], []
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if(id(node) in positions):
+                continue
+            if(node.operation == 'leaf'):
+                key = ('leaf', id(node.operands[0]))
+            elif(node.operation == 'constant'):
+                key = ('constant', node.operands[0] if node.length is None else id(node.operands[0]))
+            elif(not expanded):
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in node.operands if id(operand) not in positions)
+                continue
+            else:
+                key = (node.operation, node.factor) + tuple(positions[id(operand)] for operand in node.operands)
+            if(key not in merged):
+                merged[key] = len(nodes)
+                nodes.append(node)
+                graph.append(key[2:] if node.operation not in ('leaf', 'constant') else ())
+            positions[id(node)] = merged[key]
+        return nodes, graph
+
+    def evaluate(self):
+        """Evaluate the expression as a Measurement or MeasurementList, propagating uncertainty through every
+        input. The result is cached, so an expression is only ever evaluated once."""
+        if(self._result is not None):
+            return self._result
+        if(self.operation == 'leaf'):
+            self._result = self.operands[0]
+            return self._result
+
+        nodes, graph = self._graph()
+        leaves = [ i for i, node in enumerate(nodes) if node.operation == 'leaf' ]
+        if(self.length is None):
+            values, derivatives = _evaluate(nodes, graph, leaves, None)
+            self._result = Measurement._derived(
+                float(values),
+                _propagate(*( (float(derivatives[i]), nodes[i].operands[0].components) for i in leaves )),
+                self.unit
+            )
+            return self._result
+
+        values = np.empty(self.length)
+        derivatives = { i: np.empty(self.length) for i in leaves }
+        for start in range(0, self.length, Expression.chunksize):
+            chunk = slice(start, min(start + Expression.chunksize, self.length))
+            values[chunk], chunkderivatives = _evaluate(nodes, graph, leaves, chunk)
+            for i in leaves:
+                derivatives[i][chunk] = chunkderivatives[i]
+        self._result = MeasurementList._derived(
+            values,
+            *_propagatelist(self.length, *( (derivatives[i], nodes[i].operands[0]) for i in leaves )),
+            self.unit
+        )
+        return self._result
+
+def _evaluate(nodes, graph, leaves, chunk):
+    """Evaluate the values of a merged expression graph over one block of elements, then accumulate the
+    derivative of the result with respect to every leaf in a single reverse pass."""
+    values = []
+    for node, operands in zip(nodes, graph):
+        operation = node.operation
+        if(operation == 'leaf'):
+            x = node.operands[0]
+            values.append(x._values[chunk] if isinstance(x,MeasurementList) else x.value)
+        elif(operation == 'constant'):
+            values.append(node.operands[0] if node.length is None else node.operands[0][chunk])
+        elif(operation == '+'):
+            values.append(values[operands[0]] + values[operands[1]] * node.factor)
+        elif(operation == 'neg'):
+            values.append(-values[operands[0]])
+        elif(operation == '*'):
+            values.append(values[operands[0]] * values[operands[1]] * node.factor)
+        elif(operation == '/'):
+            values.append(values[operands[0]] / (values[operands[1]] * node.factor))
+        elif(operation == '**'):
+            values.append(values[operands[0]] ** values[operands[1]])
+        else:
+            values.append(node.operation(values[operands[0]]))
+
+    adjoints = [0] * len(nodes)
+    adjoints[-1] = 1
+    for i in reversed(range(len(nodes))):
+        node, operands, adjoint = nodes[i], graph[i], adjoints[i]
+        operation = node.operation
+        if(operation in ('leaf', 'constant') or (np.ndim(adjoint) == 0 and adjoint == 0)):
+            continue
+        if(operation == '+'):
+            partials = (1, node.factor)
+        elif(operation == 'neg'):
+            partials = (-1,)
+        elif(operation == '*'):
+            partials = (values[operands[1]] * node.factor, values[operands[0]] * node.factor)
+        elif(operation == '/'):
+            partials = (1 / (values[operands[1]] * node.factor), -values[i] / values[operands[1]])
+        elif(operation == '**'):
+            base, exponent = values[operands[0]], values[operands[1]]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                partials = (
+                    np.where(base != 0, exponent * base ** (exponent - 1), 0) if nodes[operands[0]].operation != 'constant' else 0,
+                    values[i] * np.log(base) if nodes[operands[1]].operation != 'constant' else 0
+                )
+        else:
+            partials = (ufuncs.unary[operation][0](np.asarray(values[operands[0]], dtype=float)),)
+        for operand, partial in zip(operands, partials):
+            adjoints[operand] = adjoints[operand] + adjoint * partial
+    return values[-1], { i: adjoints[i] for i in leaves }
@@ -0,0 +1,108 @@
+from typing import Dict, Union
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement, _keys
+from labtex.measurementlist import MeasurementList
+from labtex.covariance import Covariance
+
+def _column(column : Union[MeasurementList,np.ndarray,float], n : int):
+    "Values and unit of a column of the design matrix. Arrays and numbers are dimensionless."
+    if(isinstance(column,MeasurementList)):
+        return np.asarray(column._values, dtype=float), column.unit
+    return np.broadcast_to(np.asarray(column, dtype=float), n), Unit("")
+
+def _solve(A : np.ndarray, b : np.ndarray):
+    "Least squares solution of A p = b by a QR decomposition, with the covariance (A^T A)^-1 and the chi-squared of the residuals."
+    # Scaling the columns to unit norm keeps polynomial design matrices well conditioned
+    scale = np.linalg.norm(A, axis=0)
+    if(not np.all(scale)):
+        raise Exception("LeastSquares Error: A column of the design matrix is zero.")
+    Q, R = np.linalg.qr(A / scale)
+    if(np.min(np.abs(np.diag(R))) < 1e-12 * np.max(np.abs(np.diag(R)))):
+        raise Exception("LeastSquares Error: The columns of the design matrix are linearly dependent.")
+    params = solve_triangular(R, Q.T @ b) / scale
+    Rinv = solve_triangular(R, np.eye(len(R))) / scale[:, None]
+    residuals = b - A @ params
+    return params, Rinv @ Rinv.T, float(residuals @ residuals)
+
+class LeastSquares:
+    """Weighted least squares fit of a model linear in its parameters, y = Σ p_j f_j,
+    with one column f_j of the design matrix for each parameter, e.g. a plane through two predictors:
+    >>> fit = LeastSquares(z, {"a": x, "b": y, "c": 1})
+    >>> fit.params["a"], fit.covariance
+
+    Columns are MeasurementLists, whose values are used, or arrays and numbers. The points are weighted by the inverse
+    variances of `y` and solved by a QR decomposition. Parameters are correlated Measurements with the units of `y`
+    over their columns, and `covariance` holds their full covariance matrix in the order of `params`.
+    Unless `absolute_sigma`, the uncertainties are scaled by the reduced chi-squared as in LinearRegression.
+    """
+    def __init__(self, y : MeasurementList, columns : Dict[str, Union[MeasurementList,np.ndarray,float]], absolute_sigma : bool = False):
+        self.y = y
+        self.columns = columns
+        n = len(y)
+        if(any(isinstance(column,MeasurementList) and len(column) != n for column in columns.values())):
+            raise Exception(f"LeastSquares Error: Every column must have the length of y, {n}.")
+        design, units = zip(*( _column(column, n) for column in columns.values() ))
+        if(n <= len(design)):
+            raise Exception(f"LeastSquares Error: {len(design)} parameters need more than {n} points.")
+        sqrtw = 1 / np.broadcast_to(y._uncertainties, n)
+        A = np.column_stack(design) * sqrtw[:, None]
+        b = np.asarray(y._values) * sqrtw
+
+        # The weighted design matrix and values are kept for resampling the points
+        self._weighted = (A, b)
+        params, covariance, self.chi2 = _solve(A, b)
+        self.dof = n - len(params)
+        if(not absolute_sigma):
+            covariance *= self.chi2 / self.dof
+        self.covariance = Covariance(dense=covariance)
+
+        # The parameters share the inputs of a square root of their covariance
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        root = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+        keys = [ next(_keys) for _ in params ]
+        self.params = {
+            name: Measurement._derived(float(params[j]), dict(zip(keys, root[j])), y.unit / units[j])
+            for j, name in enumerate(columns)
+        }
+
+    def __repr__(self):
+        return "\n".join(f"{name} = {param}" for name, param in self.params.items())
+
+    def predict(self, columns : Dict[str, Union[MeasurementList,np.ndarray,float]]):
+        "Model at new columns with the names of the parameters, propagating the covariance of the parameters."
+        return sum(
+            self.params[name] * (MeasurementList.from_arrays(column, 0) if isinstance(column,np.ndarray) else column)
+            for name, column in columns.items()
+        )
+
+class PolynomialRegression(LeastSquares):
+    """Weighted least squares polynomial of a given degree, y = Σ a_k x^k, with parameters `a0`, `a1`, ...:
+    >>> fit = PolynomialRegression(x, y, 2)
+    >>> fit.params["a2"], fit.predict(x)
+    """
+    def __init__(self, x : MeasurementList, y : MeasurementList, degree : int, absolute_sigma : bool = False):
+        self.x = x
+        self.degree = degree
+        super().__init__(y, self._columns(x), absolute_sigma)
+
+    def _columns(self, x):
+        if(isinstance(x,MeasurementList)):
+            values = np.asarray(x._values, dtype=float)
+            return { f"a{k}": MeasurementList.from_arrays(values**k, 0, x.unit**k) for k in range(self.degree + 1) }
+        return { f"a{k}": x**k for k in range(self.degree + 1) }
+
+    def predict(self, x : Union[Measurement,MeasurementList,np.ndarray,float]):
+        "The polynomial at `x` by Horner's scheme, propagating the uncertainties of `x` and the covariance of the parameters."
+        if(not isinstance(x,(Measurement,MeasurementList))):
+            x = np.asarray(x)
+            params = [ param.value for param in self.params.values() ]
+        else:
+            params = list(self.params.values())
+        y = params[-1]
+        for param in reversed(params[:-1]):
+            y = y * x + param
+        return y
@@ -1,11 +1,13 @@
+import math
 from typing import Iterable, Union
 from labtex.unit import Unit
-from labtex.measurement import Measurement
-from labtex.measurementlist import MeasurementList
+from labtex.measurement import Measurement, _keys
+from labtex.measurementlist import MeasurementList, _conversionfactor
 
 import matplotlib.pyplot as plt 
 from matplotlib.axes import Axes
-from numpy import array, linspace
+import numpy as np
+from numpy import linspace
 
 # plt.style.use('seaborn-whitegrid')
 plt.rcParams.update({
@@ -18,38 +20,101 @@ plt.rcParams.update({
     "figure.dpi" : 300,
 })
 
+def _linearfit(x, y, w, axis : int = -1):
+    """Weighted least squares lines through the points along `axis` of broadcast arrays, as vectorised reductions.
+    Returns the slopes, intercepts, their statistical uncertainties and the weighted means of x."""
+    x, y, w = np.broadcast_arrays(x, y, w)
+    n = y.shape[axis]
+    total = lambda a: np.sum(a, axis=axis, keepdims=True)
+
+    W = total(w)
+    xmean = total(w * x) / W
+    ymean = total(w * y) / W
+
+    D = total(w * (x - xmean) ** 2)
+    m = total(w * (x - xmean) * y) / D
+    c = ymean - m * xmean
+
+    chi2 = total(w * (y - x*m - c) ** 2)
+    Delta_m = (chi2 / D / (n - 2)) ** 0.5
+    Delta_c = ((1 / W + xmean ** 2 / D) * chi2 / (n - 2)) ** 0.5
+    return tuple(np.squeeze(a, axis=axis) for a in (m, c, Delta_m, Delta_c, xmean))
+
+def _yorkfit(x, y, xvariance, yvariance, axis : int = -1, tolerance : float = 1e-10, maxiter : int = 100):
+    """Lines through points with uncertainties in both x and y by the method of York et al. (2004), as vectorised reductions.
+    Each pass reweights the points by the slope found so far, starting from the ordinary fit, until the slopes change by
+    less than `tolerance` relative to themselves. Returns the same as `_linearfit`, with the mean of the adjusted x."""
+    m = np.expand_dims(_linearfit(x, y, 1 / yvariance, axis)[0], axis)
+    x, y, xvariance, yvariance = np.broadcast_arrays(x, y, xvariance, yvariance)
+    n = y.shape[axis]
+    total = lambda a: np.sum(a, axis=axis, keepdims=True)
+
+    def reweight(m):
+        W = 1 / (yvariance + m**2 * xvariance)
+        xmean = total(W * x) / total(W)
+        ymean = total(W * y) / total(W)
+        U, V = x - xmean, y - ymean
+        return W, xmean, ymean, U, V, W * (U * yvariance + m * V * xvariance)
+
+    for _ in range(maxiter):
+        W, xmean, ymean, U, V, beta = reweight(m)
+        slope = total(W * beta * V) / total(W * beta * U)
+        converged = np.all(np.abs(slope - m) <= tolerance * np.abs(slope))
+        m = slope
+        if(converged):
+            break
+    W, xmean, ymean, U, V, beta = reweight(m)
+    c = ymean - m * xmean
+
+    # Uncertainties from the least squares adjusted x, scaled by the scatter about the line as in `_linearfit`
+    adjusted = xmean + beta
+    adjustedmean = total(W * adjusted) / total(W)
+    D = total(W * (adjusted - adjustedmean) ** 2)
+    chi2 = total(W * (y - x*m - c) ** 2)
+    Delta_m = (chi2 / D / (n - 2)) ** 0.5
+    Delta_c = ((1 / total(W) + adjustedmean ** 2 / D) * chi2 / (n - 2)) ** 0.5
+    return tuple(np.squeeze(a, axis=axis) for a in (m, c, Delta_m, Delta_c, adjustedmean))
+
+def _lobf(m, c, Delta_m, Delta_c, xmean, xunit : Unit, yunit : Unit):
+    "Line of best fit Measurements, correlated through cov(m, c) = -xmean * Delta_m**2 by sharing the input behind the uncertainty in m."
+    slope, intercept = next(_keys), next(_keys)
+    return {
+        "m": Measurement._derived(m, {slope: Delta_m}, yunit / xunit),
+        "c": Measurement._derived(c, {slope: -xmean * Delta_m, intercept: max(Delta_c**2 - (xmean * Delta_m)**2, 0) ** 0.5}, yunit)
+    }
+
 class LinearRegression:
-    "Linearly regress two MeasurementLists."
-    def __init__(self,x : MeasurementList, y : MeasurementList):
+    """Linearly regress two MeasurementLists.
+    With `odr`, the uncertainties of x are included by York's method, which minimises the distances to the line
+    weighted by the uncertainties in both x and y. Otherwise only the uncertainties of y weight the points."""
+    def __init__(self,x : MeasurementList, y : MeasurementList, odr : bool = False):
         self.x = x
         self.y = y
-        x = array(self.x.values())
-        y = array(self.y.values())
-
-        assert len(x) == len(y)
-
-        n = len(x)
-        w = 1/array([measurement.uncertainty for measurement in self.y])**2
-
-        xmean = sum(w * x) / sum(w)
-        ymean = sum(w * y) / sum(w)
-
-        D = sum(w * (x - xmean) ** 2)
-
-        m = 1 / D * sum(w * (x - xmean) * y)
-
-        c = ymean - m * xmean
-
-        d = y - x*m - c
-        # Statistical uncertainties
-        Delta_m = (1/D * sum(w * d ** 2) / (n - 2) ) ** 0.5
-        Delta_c = ( (1 / sum(w) + xmean ** 2 / D) * sum( w * d ** 2 ) / (n - 2) ) ** 0.5       
-
-        # Line of best fit parameters
-        self.lobf =  {
-            "m": Measurement(m, Delta_m, self.y.unit / self.x.unit),
-            "c": Measurement(c, Delta_c, self.y.unit)
-        }
+        self.odr = odr
+        assert len(self.x) == len(self.y)
+        if(odr):
+            fit = _yorkfit(self.x.values(), self.y.values(), self.x.uncertainties()**2, self.y.uncertainties()**2)
+        else:
+            fit = _linearfit(self.x.values(), self.y.values(), 1/self.y.uncertainties()**2)
+        m, c, Delta_m, Delta_c, xmean = map(float, fit)
+
+        self.lobf = _lobf(m, c, Delta_m, Delta_c, xmean, self.x.unit, self.y.unit)
+
+    @staticmethod
+    def batch(x : np.ndarray, y : np.ndarray, yerr : np.ndarray, axis : int = -1, xerr : np.ndarray = None):
+        """Fit a line to each of many datasets at once, e.g. one calibration per detector channel:
+        >>> fit = LinearRegression.batch(x, y, yerr)   # x, y, yerr of shape (channels, points), or x of shape (points,)
+        >>> fit["m"], fit["dm"]
+
+        The points lie along `axis` of arrays that broadcast together. Returns a dict of arrays over the remaining axes:
+        slopes `m`, intercepts `c`, their uncertainties `dm` and `dc` and their covariances `cov`.
+        Uncertainties `xerr` in x are included by York's method, iterating on every dataset at once."""
+        x, y, yerr = (np.asarray(a, dtype=float) for a in (x, y, yerr))
+        if(xerr is None):
+            m, c, Delta_m, Delta_c, xmean = _linearfit(x, y, 1/yerr**2, axis)
+        else:
+            m, c, Delta_m, Delta_c, xmean = _yorkfit(x, y, np.asarray(xerr, dtype=float)**2, yerr**2, axis)
+        return {"m": m, "c": c, "dm": Delta_m, "dc": Delta_c, "cov": -xmean * Delta_m**2}
 
     def __repr__(self):
         return f"m = {self.lobf['m']}\nc = {self.lobf['c']}"
@@ -83,3 +148,95 @@ class LinearRegression:
         xlabel and plt.xlabel(xlabel + f"{' (' + Unit.latex(self.x.unit) + ')' if self.x.unit != '' else ''}")
         ylabel and plt.ylabel(ylabel + f"{' (' + Unit.latex(self.y.unit) + ')' if self.y.unit != '' else ''}")
         return fig, ax
+
+
+class OnlineLinearRegression:
+    """Linear regression of a stream of MeasurementLists that can be merged across chunks and processes.
+    For example, fitting an acquisition as it is read:
+    >>> fit = OnlineLinearRegression("s", "V")
+    >>> for x, y in chunks:
+    ...     fit.update(x, y)
+    >>> fit.lobf["m"], fit.lobf["c"]
+
+    Only the weighted sufficient statistics are kept: the total weight, the weighted means of x and y
+    and the weighted sums of squared and cross deviations about them. Chunks are combined with the pairwise update
+    of Chan et al., so `lobf` gives the same line as `LinearRegression` of the whole stream in O(1) at any point.
+    """
+    def __init__(self, xunit : Union[Unit,str] = "", yunit : Union[Unit,str] = ""):
+        self.xunit = xunit if isinstance(xunit,Unit) else Unit(xunit)
+        self.yunit = yunit if isinstance(yunit,Unit) else Unit(yunit)
+        self.count = 0
+        self._weight = 0.0
+        self._xmean = 0.0
+        self._ymean = 0.0
+        self._sxx = 0.0
+        self._sxy = 0.0
+        self._syy = 0.0
+        self._lobf = None
+
+    __repr__ = LinearRegression.__repr__
+    predict = LinearRegression.predict
+
+    def update(self, x : MeasurementList, y : MeasurementList):
+        "Add a chunk of points, weighted by the uncertainties of `y`. Returns the regression."
+        if(len(x) != len(y)):
+            raise Exception(f"LinearRegression Error: x and y must have the same length. Lengths: {len(x)}, {len(y)}")
+        if(len(x) == 0):
+            return self
+        xfactor = 1 if x.unit == self.xunit else _conversionfactor(x.unit, self.xunit)
+        yfactor = 1 if y.unit == self.yunit else _conversionfactor(y.unit, self.yunit)
+        xvalues = np.asarray(x._values) * xfactor
+        yvalues = np.asarray(y._values) * yfactor
+        weights = np.broadcast_to(1 / (np.asarray(y._uncertainties) * yfactor)**2, len(y))
+        chunk = OnlineLinearRegression(self.xunit, self.yunit)
+        chunk.count = len(x)
+        chunk._weight = np.sum(weights).item()
+        chunk._xmean = (np.sum(weights * xvalues) / chunk._weight).item()
+        chunk._ymean = (np.sum(weights * yvalues) / chunk._weight).item()
+        chunk._sxx = np.sum(weights * (xvalues - chunk._xmean)**2).item()
+        chunk._sxy = np.sum(weights * (xvalues - chunk._xmean) * (yvalues - chunk._ymean)).item()
+        chunk._syy = np.sum(weights * (yvalues - chunk._ymean)**2).item()
+        self._merge(chunk)
+        return self
+
+    def merge(self, other):
+        "Combined regression of two disjoint streams."
+        merged = OnlineLinearRegression(self.xunit, self.yunit)
+        merged._merge(self)
+        merged._merge(other)
+        return merged
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def _merge(self, other):
+        if(other.count == 0):
+            return
+        if(other.xunit != self.xunit or other.yunit != self.yunit):
+            raise Exception(f"LinearRegression Error: Cannot merge regressions of {self.yunit} against {self.xunit} and {other.yunit} against {other.xunit}.")
+        weight = self._weight + other._weight
+        dx = other._xmean - self._xmean
+        dy = other._ymean - self._ymean
+        product = self._weight * other._weight / weight
+        self._xmean += dx * other._weight / weight
+        self._ymean += dy * other._weight / weight
+        self._sxx += other._sxx + dx * dx * product
+        self._sxy += other._sxy + dx * dy * product
+        self._syy += other._syy + dy * dy * product
+        self._weight = weight
+        self.count += other.count
+        self._lobf = None
+
+    @property
+    def lobf(self):
+        "Line of best fit of the points so far, as a dict of the slope `m` and intercept `c`."
+        if(self.count < 3):
+            raise Exception(f"LinearRegression Error: A line with uncertainties needs at least 3 points, not {self.count}.")
+        if(self._lobf is None):
+            m = self._sxy / self._sxx
+            c = self._ymean - m * self._xmean
+            variance = max(self._syy - m * self._sxy, 0) / (self.count - 2)
+            Delta_m = math.sqrt(variance / self._sxx)
+            Delta_c = math.sqrt((1 / self._weight + self._xmean**2 / self._sxx) * variance)
+            self._lobf = _lobf(m, c, Delta_m, Delta_c, self._xmean, self.xunit, self.yunit)
+        return self._lobf
@@ -1,9 +1,42 @@
-import copy
 import math
+import os
+import uuid
+from itertools import count
 from numbers import Number
 from typing import Union
 from labtex.unit import Unit
-from labtex.unit import factorandbasedims
+from labtex.tracking import Projection
+from labtex import ufunc as ufuncs
+
+class _Keys:
+    """Keys identifying independent inputs in the uncertainty components of derived quantities.
+    Each process counts up from its own random 128-bit token, renewed in forked children, so that inputs
+    created in different processes (e.g. by multiprocessing workers) never share a key."""
+    def __init__(self):
+        self._renew()
+        if(hasattr(os, 'register_at_fork')):
+            os.register_at_fork(after_in_child=self._renew)
+
+    def _renew(self):
+        self._count = count(uuid.uuid4().int << 64)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._count)
+
+_keys = _Keys()
+
+def _propagate(*terms):
+    """First order propagation of sparse uncertainty components.
+    Each term is a (partial derivative, components) pair and the result maps each independent input
+    to the sum of its contributions. Cost scales with the number of inputs, not the length of the chain."""
+    components = {}
+    for derivative, terms_components in terms:
+        for key, component in terms_components.items():
+            components[key] = components.get(key, 0) + derivative * component
+    return components
 
 class Measurement:
     """Base Class for all single valued measurements with uncertainties and SI units.
@@ -11,14 +44,68 @@ class Measurement:
     >>> x = Measurement(1.234, 0.01, "m")
     >>> print(x)
     1.23 ± 0.01 m
+
+    Derived measurements keep track of their sensitivity to each independent measurement,
+    so correlated quantities such as `x * y + x` propagate their uncertainty correctly.
     """
+    __slots__ = ('value', 'uncertainty', 'unit', '_components', '_key')
+
     def __init__(self, value: float, uncertainty: float = 0, unit: Union[Unit,str] = ""):
         "Create a measurement with a value, uncertainty and SI Unit."
         self.value = value
         self.uncertainty = uncertainty
-        self.relativeuncertainty = self.uncertainty / self.value if self.value != 0 else 0
-
         self.unit = unit if (isinstance(unit,Unit)) else Unit(unit)
+        self._components = None
+        self._key = None
+
+    @staticmethod
+    def _derived(value: float, components: dict, unit: Unit):
+        "Create a measurement from its uncertainty components with respect to independent inputs."
+        measurement = Measurement.__new__(Measurement)
+        measurement.value = value
+        measurement.uncertainty = math.sqrt(sum(component * component for component in components.values()))
+        measurement.unit = unit
+        measurement._components = components
+        measurement._key = None
+        return measurement
+
+    @property
+    def components(self):
+        "Contribution to the uncertainty of each independent input, keyed by input."
+        if(self._components is None):
+            if(self._key is None):
+                self._key = next(_keys)
+            return {self._key: self.uncertainty}
+        return self._components
+
+    @property
+    def relativeuncertainty(self):
+        return self.uncertainty / self.value if self.value != 0 else 0
+
+    @staticmethod
+    def covariance(x, y):
+        "Covariance of two Measurements due to the independent inputs they share."
+        xcomponents, ycomponents = x.components, y.components
+        return sum(component * ycomponents[key] for key, component in xcomponents.items() if key in ycomponents)
+
+    @staticmethod
+    def correlation(x, y):
+        "Correlation coefficient of two Measurements."
+        return Measurement.covariance(x, y) / (x.uncertainty * y.uncertainty)
+
+    def budget(self, *inputs):
+        """Fraction of the variance contributed by each of the given Measurements/MeasurementLists.
+        Without arguments, returns the fraction for every independent input by key."""
+        variance = self.uncertainty ** 2
+        if(not inputs):
+            return { key: component**2 / variance for key, component in self.components.items() }
+        budget = []
+        for x in inputs:
+            keys = _inputkeys(x)
+            budget.append(sum(
+                component**2 for key, component in self.components.items() if _dependson(key, keys)
+            ) / variance)
+        return budget
     
     def __repr__(self):
         "Print string with sigfigs up to uncertainty."
@@ -41,34 +128,24 @@ class Measurement:
     
     def __add__(self,obj):
         "Add two measurements."
-
-        # Addition necessitates independent variables
-        if(self == obj):
-            return Measurement(
-            self.value * 2,
-            self.uncertainty * 2,
-            self.unit
-        )
-
         if(isinstance(obj,Measurement)):
             if(self.unit == obj.unit):
-                return Measurement(
-                    self.value + obj.value,
-                    math.hypot(self.uncertainty,obj.uncertainty),
-                    self.unit
-            )
-            factor1, basedims1 = factorandbasedims(self.unit)
-            factor2, basedims2 = factorandbasedims(obj.unit)
-            if(basedims1 == basedims2):
-                return self + obj.to(self.unit)
+                factor = 1
+            elif(self.unit.samedimensions(obj.unit)):
+                factor = obj.unit.factor / self.unit.factor
             else:
                 raise Exception(f"Cannot add measurements with different units: {self.unit} and {obj.unit}")
+            return Measurement._derived(
+                self.value + obj.value * factor,
+                _propagate((1, self.components), (factor, obj.components)),
+                self.unit
+            )
 
         # For a constant with no uncertainty
         if(isinstance(obj,Number)):
-            return Measurement(
+            return Measurement._derived(
                 self.value + obj,
-                self.uncertainty,
+                self.components,
                 self.unit
             )
         if(isinstance(obj,list)):
@@ -81,9 +158,17 @@ class Measurement:
 
     def __neg__(self):
         "Negate a measurement."
-        return Measurement(
+        return Measurement._derived(
             -self.value,
-            self.uncertainty,
+            _propagate((-1, self.components)),
+            self.unit
+        )
+
+    def __abs__(self):
+        "Absolute value of a measurement."
+        return Measurement._derived(
+            abs(self.value),
+            _propagate((math.copysign(1, self.value) if self.value != 0 else 0, self.components)),
             self.unit
         )
         
@@ -95,37 +180,21 @@ class Measurement:
 
     def __mul__(self,obj):
         "Multiply two measurements."
-
-        # Multiplication necessitates independent variables
-        # This occurs if you do: x * x
-        if(self == obj):
-            return Measurement(
-            self.value ** 2,
-            (self.value ** 2) * 2 * self.relativeuncertainty,
-            self.unit ** 2
-        )
-
         if(isinstance(obj,Measurement)):
             # If the unit objects share a dimension with different prefixes we need to convert
             # Note this cannot be implemented in the unit class as it affects the measurement value
-            newobj = copy.deepcopy(obj)
-            for unit in Unit.knownUnits:
-                if (self.unit.units[unit]['power'] != 0 
-                    and obj.unit.units[unit]['power'] != 0
-                    and self.unit.units[unit]['prefix'] != obj.unit.units[unit]['prefix']):
-                    newobj.value *= (Unit.prefixes[obj.unit.units[unit]['prefix']] / Unit.prefixes[self.unit.units[unit]['prefix']])**obj.unit.units[unit]['power']
-                    newobj.unit.units[unit]['prefix'] = self.unit.units[unit]['prefix']
-                    newobj.relativeuncertainty = newobj.uncertainty / newobj.value
-            return Measurement(
-                self.value * newobj.value,
-                abs(self.value * newobj.value) * math.hypot(self.relativeuncertainty, newobj.relativeuncertainty),
-                self.unit * newobj.unit
+            factor, unit = Unit.product(self.unit, obj.unit)
+            value = obj.value * factor
+            return Measurement._derived(
+                self.value * value,
+                _propagate((value, self.components), (self.value * factor, obj.components)),
+                unit
             )
 
         if(isinstance(obj,Number)):
-            return Measurement(
+            return Measurement._derived(
                 self.value * obj,
-                self.uncertainty * abs(obj),
+                _propagate((obj, self.components)),
                 self.unit
             )
         if(isinstance(obj,list)):
@@ -139,34 +208,19 @@ class Measurement:
     
     def __truediv__(self,obj):
         "Divide two measurements."
-
-        # While nonsensical, this only occurs if you do: x / x
-        if(self == obj):
-            return Measurement(
-            1,
-            0,
-            ""
-        )
-
         if(isinstance(obj,Measurement)):
-            newobj = copy.deepcopy(obj)
-            for unit in Unit.knownUnits:
-                if (self.unit.units[unit]['power'] != 0 
-                    and obj.unit.units[unit]['power'] != 0
-                    and self.unit.units[unit]['prefix'] != obj.unit.units[unit]['prefix']):
-                    newobj.value *= (Unit.prefixes[obj.unit.units[unit]['prefix']] / Unit.prefixes[self.unit.units[unit]['prefix']])**obj.unit.units[unit]['power']
-                    newobj.unit.units[unit]['prefix'] = self.unit.units[unit]['prefix']
-                    newobj.relativeuncertainty = newobj.uncertainty / newobj.value
-            return Measurement(
-                self.value / newobj.value,
-                abs(self.value / newobj.value) * math.hypot(self.relativeuncertainty,newobj.relativeuncertainty),
-                self.unit / newobj.unit
+            factor, unit = Unit.quotient(self.unit, obj.unit)
+            value = obj.value * factor
+            return Measurement._derived(
+                self.value / value,
+                _propagate((1 / value, self.components), (-self.value * factor / value**2, obj.components)),
+                unit
             )
 
         if(isinstance(obj,Number)):
-            return Measurement(
+            return Measurement._derived(
                 self.value / obj,
-                self.uncertainty / abs(obj),
+                _propagate((1 / obj, self.components)),
                 self.unit
             )
         if(isinstance(obj,list)):
@@ -177,9 +231,9 @@ class Measurement:
     def __rtruediv__(self,obj):
         "Reverse division to accommodate constant / measurement."
         if(isinstance(obj,Number)):
-            return Measurement(
+            return Measurement._derived(
                 obj / self.value,
-                abs(obj / self.value) * self.relativeuncertainty,
+                _propagate((-obj / self.value**2, self.components)),
                 obj / self.unit
             )
         else:
@@ -189,19 +243,21 @@ class Measurement:
         "Raising a measurement to a constant power."
         if(isinstance(obj,Measurement)):
             if(Unit.unitless(obj.unit)):
-                return Measurement(
-                    self.value ** obj.value,
-                     abs(self.value ** obj.value) * math.sqrt(
-                        (obj.value * self.relativeuncertainty)**2 + (math.log(obj.value) * obj.uncertainty)**2
-                        ),
+                value = self.value ** obj.value
+                terms = [(obj.value * self.value ** (obj.value - 1), self.components)]
+                if(obj.uncertainty != 0):
+                    terms.append((value * math.log(self.value), obj.components))
+                return Measurement._derived(
+                    value,
+                    _propagate(*terms),
                     self.unit ** obj.value
                 )
             else:
                 raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
         if(isinstance(obj,Number)):
-            return Measurement(
+            return Measurement._derived(
                 self.value ** obj,
-                abs(self.value ** obj * obj) * self.relativeuncertainty,
+                _propagate((obj * self.value ** (obj - 1) if self.value != 0 or obj >= 1 else 0, self.components)),
                 self.unit ** obj
             )
         else:
@@ -211,10 +267,11 @@ class Measurement:
         "Reverse power for constant ** measurement."
         if(isinstance(obj,Number)):
             if(Unit.unitless(self.unit)):
-                return Measurement(
-                    obj ** self.value,
-                    abs(obj ** self.value  * math.log(obj)) * self.uncertainty,
-                    ""
+                value = obj ** self.value
+                return Measurement._derived(
+                    value,
+                    _propagate((value * math.log(obj), self.components)),
+                    Unit("")
                 )
             else:
                 raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
@@ -224,106 +281,113 @@ class Measurement:
     # Static Functions applied to Measurements
     # All parameters are instances of Measurement
     @staticmethod
-    def sin(x):
-        "Sine function on a Measurement."
+    def _function(x, value: float, derivative: float, name: str = "Trigonometric"):
         if(Unit.unitless(x.unit)):
-            return Measurement(
-            math.sin(x.value),
-            math.fabs(math.cos(x.value)) * x.uncertainty,
-            ""
+            return Measurement._derived(
+                value,
+                _propagate((derivative, x.components)),
+                Unit("")
             )
         else:
-            raise Exception(f"Trigonometric functions take in dimensionless quantities. Input has units: {x.unit}")
+            raise Exception(f"{name} functions take in dimensionless quantities. Input has units: {x.unit}")
+
+    @staticmethod
+    def sin(x):
+        "Sine function on a Measurement."
+        return Measurement._function(x, math.sin(x.value), math.cos(x.value))
 
     @staticmethod
     def cos(x):
         "Cosine function on a Measurement."
-        if(Unit.unitless(x.unit)):
-            return Measurement(
-                math.cos(x.value),
-                math.fabs(math.sin(x.value)) * x.uncertainty,
-                ""
-            )
-        else:
-            raise Exception(f"Trigonometric functions take in dimensionless quantities. Input has units: {x.unit}")
+        return Measurement._function(x, math.cos(x.value), -math.sin(x.value))
 
     @staticmethod
     def tan(x):
         "Tangent function on a Measurement."
-        if(Unit.unitless(x.unit)):
-            return Measurement(
-                math.tan(x.value),
-                x.uncertainty / math.cos(x.value)**2 ,
-                ""
-            )
-        else:
-            raise Exception(f"Trigonometric functions take in dimensionless quantities. Input has units: {x.unit}")
+        return Measurement._function(x, math.tan(x.value), 1 / math.cos(x.value)**2)
     
     @staticmethod
     def log(x):
         "Natural log function on a Measurement."
-        if(Unit.unitless(x.unit)):
-            return Measurement(
-                math.log(x.value),
-                math.fabs(x.relativeuncertainty),
-                ""
-            )
-        else:
-            raise Exception(f"Log functions take in dimensionless quantities. Input has units: {x.unit}")
+        return Measurement._function(x, math.log(x.value), 1 / x.value, "Log")
     
     @staticmethod
     def asin(x):
         "Inverse sine function on a Measurement."
-        if(Unit.unitless(x.unit)):
-            return Measurement(
-                math.asin(x.value),
-                x.uncertainty / (math.sqrt(1 - x.value**2)),
-                ""
-            )
-        else:
-            raise Exception(f"Trigonometric functions take in dimensionless quantities. Input has units: {x.unit}")
+        return Measurement._function(x, math.asin(x.value), 1 / math.sqrt(1 - x.value**2))
     
     @staticmethod
     def acos(x):
         "Inverse cosine function on a Measurement."
-        if(Unit.unitless(x.unit)):
-             return Measurement(
-                math.acos(x.value),
-                x.uncertainty / (math.sqrt(1 - x.value**2)),
-                ""
-            )
-        else:
-            raise Exception(f"Trigonometric functions take in dimensionless quantities. Input has units: {x.unit}")
+        return Measurement._function(x, math.acos(x.value), -1 / math.sqrt(1 - x.value**2))
 
     @staticmethod
     def atan(x):
         "Inverse tangent function on a Measurement."
-        if(Unit.unitless(x.unit)):
-            return Measurement(
-                math.atan(x.value),
-                x.uncertainty / (1 + x.value**2),
-                ""
-            )
-        else:
-            raise Exception(f"Trigonometric functions take in dimensionless quantities. Input has units: {x.unit}")
+        return Measurement._function(x, math.atan(x.value), 1 / (1 + x.value**2))
  
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "Propagate uncertainty and units through NumPy ufuncs, e.g. `np.exp(x)`."
+        if(method != '__call__' or kwargs):
+            return NotImplemented
+        inputs = ufuncs.operands(inputs)
+        if(inputs is None):
+            return NotImplemented
+        if(len(inputs) == 2 and ufunc in ufuncs.binary):
+            return ufuncs.call(ufunc, *inputs)
+        if(len(inputs) == 1):
+            result = ufuncs.apply(ufunc, self.value, self.unit)
+            if(result is not None):
+                value, derivative, unit = result
+                return Measurement._derived(value.item(), _propagate((derivative.item(), self.components)), unit)
+        return NotImplemented
+
+    @staticmethod
+    def apply(func, *args, unit : Union[Unit,str] = None):
+        """Propagate uncertainty through a function of Measurements/MeasurementLists using exact derivatives from dual numbers.
+        `func` receives the values in their own units and may use arithmetic and NumPy functions,
+        which combine units like Measurements. For example,
+        >>> Measurement.apply(lambda x, y: np.sqrt(x**2 + y**2), x, y)"""
+        from labtex.dual import apply
+        return apply(func, *args, unit=unit)
+
+    def lazy(self):
+        "Start a lazily evaluated `Expression` from this measurement."
+        from labtex.lazy import Expression
+        return Expression.leaf(self)
+
     def to(self, unit : Union[str,Unit]):
         "Convert the units of a measurement to one with the same dimensions."
         unit = unit if isinstance(unit,Unit) else Unit(unit)
-        from_factor, from_basedims = factorandbasedims(self.unit)
-        to_factor, to_basedims = factorandbasedims(unit)
-        if(from_basedims == to_basedims):
-            return Measurement(
-                self.value * from_factor / to_factor,
-                self.uncertainty * from_factor / to_factor,
+        if(self.unit.samedimensions(unit)):
+            factor = self.unit.factor / unit.factor
+            return Measurement._derived(
+                self.value * factor,
+                _propagate((factor, self.components)),
                 unit
             )
         else:
-            print(from_factor, from_basedims)
-            print(to_factor, to_basedims)
             raise Exception(f"Dimension Error: Cannot convert from {self.unit} to {unit} because they have different dimensions.")
         
 class M(Measurement):
     "Base Class for all single valued measurements with uncertainties and SI units."
-    pass
+    __slots__ = ()
+
+def _inputkeys(x):
+    """Keys of the independent inputs a Measurement or MeasurementList depends on.
+    Elementwise inputs of a list are identified by their key alone, covering all of their elements."""
+    if(isinstance(x,Measurement)):
+        return set(x.components)
+    components, elements = x._tracked()
+    return { key.key if isinstance(key,Projection) else key for key in components } | { key for key, start, step in elements }
+
+def _dependson(key, keys : set):
+    """Whether an uncertainty component belongs to one of the inputs in `keys`.
+    Components of list elements and selections are keyed by tuples starting with the key of their list."""
+    while True:
+        if(key in keys):
+            return True
+        if(not isinstance(key,tuple)):
+            return False
+        key = key[0]
 
@@ -0,0 +1,532 @@
+import math
+from numbers import Number
+from typing import Union
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement, _keys
+from labtex.measurementlist import MeasurementList, _conversionfactor, _readonly
+from labtex import tracking
+from labtex import ufunc as ufuncs
+
+class MeasurementArray:
+    """An N-dimensional array of measurements sharing a single unit, e.g. a grid of voltage × temperature scans.
+    >>> MeasurementArray([[1,2,3],[4,5,6]],0.1,"V")
+    [[1.0 ± 0.1, 2.0 ± 0.1, 3.0 ± 0.1], [4.0 ± 0.1, 5.0 ± 0.1, 6.0 ± 0.1]] V
+
+    Values and uncertainties are stored as NumPy arrays. Operators broadcast like NumPy arrays,
+    indexing with slices, `reshape` and `transpose` return views, and `sum`, `mean`, `weighted_mean`, `std` and `sem`
+    reduce over an `axis`. A MeasurementList or Measurement can be combined with an array, or converted with
+    `MeasurementArray(ml)` and `aslist()`.
+
+    Like MeasurementList, arrays track their sensitivity to each independent input. Element `index` of an array
+    depends on the input `(key, offset + index · strides)` of each `(key, offset, strides)` it is derived from,
+    so views and broadcasting stay correlated with the array they came from. Reshaping a view that NumPy would copy,
+    or indexing with masks or index arrays, keeps an index map of the position of each input instead,
+    and sums keep the contribution of every element they add up.
+    """
+    def __init__(self, measurements, uncertainty : Union[Number,np.ndarray] = math.nan, unit : Union[Unit,str] = ""):
+        if(isinstance(measurements,MeasurementList)):
+            components, elements = measurements._tracked()
+            self._values = measurements._values
+            self._uncertainties = measurements._uncertainties
+            self.unit = measurements.unit
+            self._components = dict(components)
+            self._elements = { (key, start, step if step is None else (step,)): contribution for (key, start, step), contribution in elements.items() }
+            self._key = None
+            return
+        try:
+            values = np.array(measurements, dtype=float)
+            uncertainties = np.broadcast_to(np.asarray(uncertainty, dtype=float), values.shape)
+        except (TypeError, ValueError) as error:
+            raise Exception(f"MeasurementArray Error: MeasurementArray must be instantiated with an array of numbers and broadcastable uncertainties ({error}).")
+        self._values = values
+        self._uncertainties = uncertainties
+        self.unit = unit if isinstance(unit,Unit) else Unit(unit)
+        self._components = self._elements = self._key = None
+
+    @classmethod
+    def _new(cls, values : np.ndarray, uncertainties : np.ndarray, unit : Unit):
+        "Wrap value and uncertainty arrays without validation."
+        array = MeasurementArray.__new__(MeasurementArray)
+        array._values = values
+        array._uncertainties = uncertainties
+        array.unit = unit
+        array._components = array._elements = array._key = None
+        return array
+
+    @classmethod
+    def _derived(cls, values : np.ndarray, components : dict, elements : dict, unit : Unit):
+        """Create an array from its uncertainty components. `components` maps inputs shared by the whole array to
+        their contribution to each element. `elements` maps (key, offset, strides) to the contribution of
+        input `(key, offset + index · strides)` to the element at `index`, or (key, Positions, None) to that of
+        the input at its position."""
+        array = MeasurementArray._new(values, np.sqrt(tracking.variance(components, elements, values.shape)), unit)
+        array._components = components
+        array._elements = elements
+        return array
+
+    def _tracked(self):
+        "Shared and elementwise uncertainty components of the array. A leaf array is one independent input per element."
+        if(self._components is None):
+            if(self._key is None):
+                self._key = next(_keys)
+            return {}, {(self._key, 0, _cstrides(self.shape)): self._uncertainties}
+        return self._components, self._elements
+
+    @property
+    def shape(self):
+        return self._values.shape
+
+    @property
+    def ndim(self):
+        return self._values.ndim
+
+    @property
+    def size(self):
+        return self._values.size
+
+    def __len__(self):
+        if(self.ndim == 0):
+            raise TypeError("len() of a 0-d MeasurementArray")
+        return self.shape[0]
+
+    def values(self):
+        "Read-only view of the values of the array."
+        return _readonly(self._values)
+
+    def uncertainties(self):
+        "Read-only view of the uncertainties of the array."
+        return _readonly(np.asarray(self._uncertainties))
+
+    def __repr__(self):
+        "Print string with sigfigs up to uncertainty, nested like the array."
+        def nested(values, uncertainties):
+            if(not isinstance(values,list)):
+                return str(Measurement(values, uncertainties, self.unit))[:-(len(str(self.unit)) + 1)]
+            return f"[{', '.join(nested(value, uncertainty) for value, uncertainty in zip(values, uncertainties))}]"
+        return f"{nested(self._values.tolist(), np.broadcast_to(self._uncertainties, self.shape).tolist())} {self.unit}"
+
+    def aslist(self):
+        "The 1-D array as a MeasurementList, correlated with it."
+        if(self.ndim != 1):
+            raise Exception(f"MeasurementArray Error: Only 1-D arrays can be converted to a MeasurementList. Shape: {self.shape}")
+        components, elements = self._tracked()
+        return MeasurementList._derived(
+            self._values,
+            { key: np.broadcast_to(contribution, self.shape) for key, contribution in components.items() },
+            { (key, offset, strides if strides is None else strides[0]): np.broadcast_to(contribution, self.shape) for (key, offset, strides), contribution in elements.items() },
+            self.unit
+        )
+
+    # Views
+    def _view(self, values : np.ndarray, index, descriptor):
+        """Derived array viewing this one: `index` selects from each contribution as it does from the values,
+        and `descriptor` maps each elementwise input (key, offset, strides) onto the view, or gives None
+        when the view is not strided over the inputs. The positions of those inputs are then selected from
+        like the contributions, as are index maps."""
+        components, elements = self._tracked()
+        view = {}
+        for key, contribution in elements.items():
+            mapped = None if isinstance(key[1],tracking.Positions) else descriptor(*key)
+            key = mapped or (key[0], *tracking.indexmap(index(tracking.positions(key[1], key[2], self.shape))))
+            view[key] = view.get(key, 0) + index(np.broadcast_to(contribution, self.shape))
+        return MeasurementArray._derived(
+            values,
+            { key: index(np.broadcast_to(contribution, self.shape)) for key, contribution in components.items() },
+            view,
+            self.unit
+        )
+
+    def __getitem__(self, item):
+        # Integers, slices, None and Ellipsis give views, and indexing every axis with an integer gives a Measurement
+        items = item if isinstance(item,tuple) else (item,)
+        if(any(isinstance(entry,(np.ndarray,list)) for entry in items)):
+            return self._take(item)
+        if(not all(entry is None or entry is Ellipsis or isinstance(entry,(int,np.integer,slice)) for entry in items)):
+            raise TypeError(f"MeasurementArray indices must be integers, slices, None, Ellipsis, boolean masks or integer arrays, not {type(item).__name__}")
+        if(sum(entry is Ellipsis for entry in items) > 1):
+            raise IndexError("An index can only have a single Ellipsis")
+        indexed = sum(entry is not None and entry is not Ellipsis for entry in items)
+        if(indexed > self.ndim):
+            raise IndexError(f"Too many indices for a MeasurementArray with {self.ndim} dimensions")
+        if(Ellipsis in items):
+            position = items.index(Ellipsis)
+            items = items[:position] + (slice(None),) * (self.ndim - indexed) + items[position + 1:]
+        if(all(isinstance(entry,(int,np.integer)) for entry in items) and len(items) == self.ndim):
+            return self._element(tuple(range(n)[i] for n, i in zip(self.shape, items)))
+
+        def descriptor(key, offset, strides):
+            axis, viewstrides = 0, []
+            for entry in items:
+                if(entry is None):
+                    viewstrides.append(0)
+                    continue
+                if(isinstance(entry,slice)):
+                    start, stop, step = entry.indices(self.shape[axis])
+                    offset += start * strides[axis]
+                    viewstrides.append(strides[axis] * step)
+                else:
+                    offset += range(self.shape[axis])[entry] * strides[axis]
+                axis += 1
+            return key, offset, tuple(viewstrides) + tuple(strides[axis:])
+        return self._view(self._values[item], lambda contribution: contribution[item], descriptor)
+
+    def _take(self, item):
+        "Select elements with boolean masks or index arrays, keeping the position of the input of each selected element."
+        return self._view(self._values[item], lambda contribution: contribution[item], lambda key, offset, strides: None)
+
+    def _element(self, index : tuple):
+        "The element at `index` as a Measurement carrying its uncertainty components."
+        components, elements = self._tracked()
+        measurement = {}
+        for key, contribution in components.items():
+            tracking.combine(measurement, key, np.broadcast_to(contribution, self.shape)[index].item())
+        for (key, offset, strides), contribution in elements.items():
+            position = int(offset.array[index]) if strides is None else offset + sum(i * stride for i, stride in zip(index, strides))
+            tracking.combine(measurement, key, tracking.element(key, position, np.broadcast_to(contribution, self.shape)[index].item()))
+        return Measurement._derived(self._values[index].item(), measurement, self.unit)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def reshape(self, *shape):
+        "View the array with a new shape."
+        shape = shape[0] if len(shape) == 1 and isinstance(shape[0],(tuple,list)) else shape
+        values = self._values.reshape(shape)
+        def descriptor(key, offset, strides):
+            reshaped = _reshapestrides(self.shape, strides, values.shape)
+            # Without strides over its inputs, e.g. a transposed array made contiguous, the positions are reshaped instead
+            return None if reshaped is None else (key, offset, reshaped)
+        return self._view(values, lambda contribution: contribution.reshape(values.shape), descriptor)
+
+    def ravel(self):
+        return self.reshape(-1)
+
+    def transpose(self, *axes):
+        "View the array with its axes permuted, reversed by default."
+        axes = axes[0] if len(axes) == 1 and isinstance(axes[0],(tuple,list)) else axes
+        axes = tuple(range(self.ndim))[::-1] if not axes else tuple(range(self.ndim)[axis] for axis in axes)
+        return self._view(
+            self._values.transpose(axes),
+            lambda contribution: contribution.transpose(axes),
+            lambda key, offset, strides: (key, offset, tuple(strides[axis] for axis in axes))
+        )
+
+    @property
+    def T(self):
+        return self.transpose()
+
+    def swapaxes(self, axis1 : int, axis2 : int):
+        axes = list(range(self.ndim))
+        axes[axis1], axes[axis2] = axes[axis2], axes[axis1]
+        return self.transpose(axes)
+
+    # Arithmetic, broadcasting like NumPy
+    def _columns(self, obj, operation : str):
+        "Return the values and unit of an operand, checking that MeasurementArrays broadcast together."
+        if(isinstance(obj,MeasurementList)):
+            obj = MeasurementArray(obj)
+        if(isinstance(obj,MeasurementArray)):
+            try:
+                np.broadcast(np.broadcast_to(0, self.shape), np.broadcast_to(0, obj.shape))
+            except ValueError:
+                raise Exception(f"MeasurementArray Error: Cannot {operation} MeasurementArrays with shapes that do not broadcast together: {self.shape} and {obj.shape}.")
+            return obj, obj._values, obj.unit
+        return obj, obj.value, obj.unit
+
+    def _propagate(self, values, unit : Unit, *terms):
+        "Derived array from (partial derivative, Measurement/MeasurementArray) pairs."
+        return MeasurementArray._derived(values, *_propagatearray(np.shape(values), *terms), unit)
+
+    def __add__(self,obj):
+        "Elementwise addition, broadcasting the operands. A Measurement is added to every element."
+        if(isinstance(obj,(MeasurementArray,MeasurementList,Measurement))):
+            obj, values, unit = self._columns(obj, "add")
+            try:
+                factor = _conversionfactor(unit, self.unit)
+            except Exception:
+                raise Exception(f"Cannot add measurements with different units: {self.unit} and {unit}")
+            return self._propagate(self._values + values * factor, self.unit, (1, self), (factor, obj))
+        constant = _constant(obj)
+        if(constant is not None):
+            return self._propagate(self._values + constant, self.unit, (1, self))
+        return NotImplemented
+
+    def __radd__(self,obj):
+        return self.__add__(obj)
+
+    def __neg__(self):
+        return self._propagate(-self._values, self.unit, (-1, self))
+
+    def __sub__(self,obj):
+        return self.__add__(-obj)
+
+    def __rsub__(self,obj):
+        return self.__neg__().__add__(obj)
+
+    def __mul__(self,obj):
+        "Elementwise multiplication, broadcasting the operands."
+        if(isinstance(obj,(MeasurementArray,MeasurementList,Measurement))):
+            obj, values, unit = self._columns(obj, "multiply")
+            factor, unit = Unit.product(self.unit, unit)
+            values = values * factor
+            return self._propagate(self._values * values, unit, (values, self), (self._values * factor, obj))
+        constant = _constant(obj)
+        if(constant is not None):
+            return self._propagate(self._values * constant, self.unit, (constant, self))
+        return NotImplemented
+
+    def __rmul__(self,obj):
+        return self.__mul__(obj)
+
+    def __truediv__(self,obj):
+        "Elementwise division, broadcasting the operands."
+        if(isinstance(obj,(MeasurementArray,MeasurementList,Measurement))):
+            obj, values, unit = self._columns(obj, "divide")
+            factor, unit = Unit.quotient(self.unit, unit)
+            values = values * factor
+            quotient = self._values / values
+            return self._propagate(quotient, unit, (1 / values, self), (-quotient * factor / values, obj))
+        constant = _constant(obj)
+        if(constant is not None):
+            return self._propagate(self._values / constant, self.unit, (1 / constant, self))
+        return NotImplemented
+
+    def __rtruediv__(self,obj):
+        "Division of a number, array or Measurement by a MeasurementArray."
+        if(isinstance(obj,(MeasurementList,Measurement))):
+            return MeasurementArray(obj) / self if isinstance(obj,MeasurementList) else self._rtruedivide(obj)
+        constant = _constant(obj)
+        if(constant is not None):
+            quotient = constant / self._values
+            return self._propagate(quotient, 1 / self.unit, (-quotient / self._values, self))
+        return NotImplemented
+
+    def _rtruedivide(self, obj : Measurement):
+        factor, unit = Unit.quotient(obj.unit, self.unit)
+        values = self._values * factor
+        quotient = obj.value / values
+        return self._propagate(quotient, unit, (1 / values, obj), (-quotient * factor / values, self))
+
+    def __pow__(self,obj):
+        "Raising each measurement to a constant or unitless Measurement power."
+        if(isinstance(obj,Measurement)):
+            if(not Unit.unitless(obj.unit)):
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+            values = self._values ** obj.value
+            terms = [(obj.value * self._values ** (obj.value - 1), self)]
+            if(obj.uncertainty != 0):
+                terms.append((values * np.log(self._values), obj))
+            return self._propagate(values, self.unit ** obj.value, *terms)
+        if(isinstance(obj,Number)):
+            # As for Measurements, the derivative at zero is taken to be 0 for powers below 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                derivative = obj * self._values ** (obj - 1) if obj >= 1 else np.where(self._values != 0, obj * self._values ** (obj - 1), 0)
+            return self._propagate(self._values ** obj, self.unit ** obj, (derivative, self))
+        return NotImplemented
+
+    def __rpow__(self,obj):
+        "Reverse power for constant ** MeasurementArray."
+        if(isinstance(obj,Number)):
+            if(not Unit.unitless(self.unit)):
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+            values = obj ** self._values
+            return self._propagate(values, Unit(""), (values * math.log(obj), self))
+        return NotImplemented
+
+    def to(self, unit : Union[str,Unit]):
+        "Convert the units of all measurements to one with the same dimensions."
+        unit = unit if isinstance(unit,Unit) else Unit(unit)
+        try:
+            factor = _conversionfactor(self.unit, unit)
+        except Exception:
+            raise Exception(f"Dimension Error: Cannot convert from {self.unit} to {unit} because they have different dimensions.")
+        return self._propagate(self._values * factor, unit, (factor, self))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "Propagate uncertainty and units through NumPy ufuncs, e.g. `np.sqrt(array)` or `grid * array`."
+        if(method != '__call__' or kwargs):
+            return NotImplemented
+        inputs = [ obj.item() if isinstance(obj,np.generic) else obj for obj in inputs ]
+        if(len(inputs) == 2 and ufunc in ufuncs.binary):
+            if(inputs[0] is not self):
+                return getattr(self, f"__r{ufuncs.binary[ufunc].__name__}__")(inputs[0])
+            return ufuncs.binary[ufunc](*inputs)
+        if(len(inputs) == 1):
+            result = ufuncs.apply(ufunc, self._values, self.unit)
+            if(result is not None):
+                values, derivative, unit = result
+                return self._propagate(values, unit, (derivative, self))
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+        "Support NumPy functions such as `np.sum(array, axis=0)`, `np.transpose` and `np.reshape`."
+        if(func not in _arrayfunctions or not all(issubclass(t,(MeasurementArray,np.ndarray)) for t in types)):
+            return NotImplemented
+        return _arrayfunctions[func](*args, **kwargs)
+
+    # Reductions over axes
+    def _axes(self, axis):
+        if(axis is None):
+            return tuple(range(self.ndim))
+        axes = axis if isinstance(axis,tuple) else (axis,)
+        return tuple(sorted(range(self.ndim)[axis] for axis in axes))
+
+    def _count(self, axes : tuple):
+        return int(np.prod([ self.shape[axis] for axis in axes ]))
+
+    def _weightedsum(self, weights, axis):
+        """Weighted sum over `axis`, or over the whole array for None, giving a Measurement when no axes remain.
+        Inputs shared by the array and inputs repeated along the summed axes (from broadcasting) are summed exactly.
+        The other elementwise inputs are kept as a `Projection` of the contribution of each element to a whole sum,
+        and for sums over some axes, as one elementwise input for each position along the summed axes,
+        or one projection for each result when that is fewer."""
+        axes = self._axes(axis)
+        kept = tuple(axis for axis in range(self.ndim) if axis not in axes)
+        values = np.asarray(np.sum(weights * self._values, axis=axes), dtype=float)
+        components, elements = self._tracked()
+        total = { key: np.sum(np.broadcast_to(weights * contribution, self.shape), axis=axes) for key, contribution in components.items() }
+        if(not kept):
+            measurement = {}
+            for key, contribution in total.items():
+                tracking.combine(measurement, key, contribution.item())
+            for (key, offset, strides), contribution in elements.items():
+                projection = tracking.Projection.of(key, tracking.positions(offset, strides, self.shape), weights * contribution)
+                tracking.combine(measurement, key, projection)
+            return Measurement._derived(values.item(), measurement, self.unit)
+        summed = {}
+        for (key, offset, strides), contribution in elements.items():
+            contribution = np.broadcast_to(weights * contribution, self.shape)
+            repeated = tuple(axis for axis in axes if self.shape[axis] == 1 or (strides is not None and strides[axis] == 0))
+            distinct = tuple(axis for axis in axes if axis not in repeated)
+            contribution = np.sum(contribution, axis=repeated, keepdims=True)
+            if(not distinct and strides is not None):
+                key = (key, offset, tuple(strides[axis] for axis in kept))
+                summed[key] = summed.get(key, 0) + contribution.reshape(values.shape)
+                continue
+            # The position and contribution of the inputs along the summed axes, for each result
+            inputs = tracking.positions(offset, strides, self.shape)[tuple(slice(0, 1) if axis in repeated else slice(None) for axis in range(self.ndim))]
+            inputs = np.moveaxis(inputs, distinct, range(-len(distinct), 0)).reshape(values.shape + (-1,))
+            contribution = np.moveaxis(contribution, distinct, range(-len(distinct), 0)).reshape(values.shape + (-1,))
+            if(inputs.shape[-1] <= values.size):
+                for i in range(inputs.shape[-1]):
+                    entry = (key, *tracking.indexmap(inputs[..., i]))
+                    summed[entry] = summed.get(entry, 0) + contribution[..., i]
+            else:
+                identity = np.eye(values.size)
+                for i, index in enumerate(np.ndindex(values.shape)):
+                    total[tracking.Projection.of(key, inputs[index], contribution[index])] = identity[i].reshape(values.shape)
+        return MeasurementArray._derived(values, total, summed, self.unit)
+
+    def sum(self, axis = None):
+        "Sum of the measurements over `axis`, or of the whole array."
+        return self._weightedsum(1, axis)
+
+    def mean(self, axis = None):
+        "Unweighted mean of the measurements over `axis`, or of the whole array."
+        return self._weightedsum(1 / self._count(self._axes(axis)), axis)
+
+    def weighted_mean(self, axis = None):
+        "Inverse-variance weighted mean of the measurements over `axis`, or of the whole array."
+        weights = 1 / np.broadcast_to(self._uncertainties, self.shape)**2
+        return self._weightedsum(weights / np.sum(weights, axis=self._axes(axis), keepdims=True), axis)
+
+    def std(self, axis = None, ddof : int = 1):
+        """Sample standard deviation of the values over `axis`, with the standard error of that estimate
+        for normally distributed values as its uncertainty. `ddof` is subtracted from the number of values as in NumPy."""
+        axes = self._axes(axis)
+        std = np.std(self._values, axis=axes, ddof=ddof)
+        result = MeasurementArray._new(std, std / math.sqrt(2 * (self._count(axes) - 1)), self.unit)
+        return result[()] if result.ndim == 0 else result
+
+    def sem(self, axis = None):
+        "Standard error of the mean over `axis` estimated from the scatter of the values."
+        return self.std(axis) / math.sqrt(self._count(self._axes(axis)))
+
+def _propagatearray(shape : tuple, *terms):
+    """First order propagation of array uncertainty components from (partial derivative, Measurement/MeasurementArray) pairs,
+    broadcasting every operand to `shape`."""
+    components, elements = {}, {}
+    for derivative, obj in terms:
+        if(isinstance(obj,MeasurementArray)):
+            objcomponents, objelements = obj._tracked()
+            # Broadcast axes repeat the same input, so their strides are zero
+            leading = len(shape) - obj.ndim
+            for (key, offset, strides), contribution in objelements.items():
+                if(strides is None):
+                    offset = tracking.Positions(np.broadcast_to(offset.array, shape))
+                else:
+                    strides = (0,) * leading + tuple(0 if n == 1 else stride for n, stride in zip(obj.shape, strides))
+                elements[(key, offset, strides)] = elements.get((key, offset, strides), 0) + derivative * contribution
+            objcomponents = objcomponents.items()
+        else:
+            objcomponents = tracking.shared(obj.components)
+        for key, contribution in objcomponents:
+            components[key] = components.get(key, 0) + derivative * contribution
+    return (
+        { key: np.broadcast_to(contribution, shape) for key, contribution in components.items() },
+        { key: np.broadcast_to(contribution, shape) for key, contribution in elements.items() }
+    )
+
+def _constant(obj):
+    "An exact number or numeric array operand as an array, or None if it is not one."
+    if(isinstance(obj,Number)):
+        return obj
+    if(isinstance(obj,(np.ndarray,list)) and np.asarray(obj).dtype.kind in 'biuf'):
+        return np.asarray(obj, dtype=float)
+    return None
+
+def _cstrides(shape : tuple):
+    "Strides, in elements, of a C-contiguous array."
+    return tuple(int(np.prod(shape[axis + 1:])) for axis in range(len(shape)))
+
+def _reshapestrides(shape : tuple, strides : tuple, newshape : tuple):
+    """Strides of `shape` reshaped to `newshape` without copying, or None if that needs a copy.
+    Follows NumPy: groups of axes with the same number of elements must each be contiguous."""
+    if(np.prod(shape) == 0 or np.prod(newshape) == 0):
+        return _cstrides(newshape)
+    old = [ (n, stride) for n, stride in zip(shape, strides) if n != 1 ]
+    new = [ n for n in newshape if n != 1 ]
+    newstrides, i, j = [], 0, 0
+    while i < len(old):
+        # Smallest groups of old and new axes holding the same number of elements
+        oldgroup, newgroup = [old[i]], [new[j]]
+        i, j = i + 1, j + 1
+        while np.prod([ n for n, _ in oldgroup ]) != np.prod(newgroup):
+            if(np.prod([ n for n, _ in oldgroup ]) < np.prod(newgroup)):
+                oldgroup.append(old[i])
+                i += 1
+            else:
+                newgroup.append(new[j])
+                j += 1
+        if(any(stride != n * innerstride for (_, stride), (n, innerstride) in zip(oldgroup, oldgroup[1:]))):
+            return None
+        stride, grouped = oldgroup[-1][1], []
+        for n in reversed(newgroup):
+            grouped.insert(0, stride)
+            stride *= n
+        newstrides.extend(grouped)
+    # Axes of length one never move, so their strides do not matter
+    newstrides = iter(newstrides)
+    return tuple(0 if n == 1 else next(newstrides) for n in newshape)
+
+def _reduction(method, **defaults):
+    """Wrap a reduction method as a NumPy function, using the array's own implementation.
+    Keyword arguments named in `defaults` are passed on to the method, with NumPy's defaults."""
+    def reduction(array, axis = None, **kwargs):
+        passed = { name: kwargs.pop(name, default) for name, default in defaults.items() }
+        if(any(value is not None for value in kwargs.values())):
+            raise Exception("MeasurementArray Error: Only the axis argument of reductions is supported.")
+        return getattr(array, method.__name__)(axis, **passed)
+    return reduction
+
+_arrayfunctions = {
+    np.sum: _reduction(MeasurementArray.sum),
+    np.mean: _reduction(MeasurementArray.mean),
+    np.std: _reduction(MeasurementArray.std, ddof=0),
+    np.transpose: lambda array, axes = None: array.transpose(axes or ()),
+    np.reshape: lambda array, shape, **kwargs: array.reshape(shape),
+}
@@ -3,10 +3,12 @@ import re
 from numbers import Number
 from typing import List, Union
 from collections.abc import Iterable
-from numpy import array
+import numpy as np
 
 from labtex.unit import Unit
-from labtex.measurement import Measurement
+from labtex.measurement import Measurement, _keys, _inputkeys, _dependson
+from labtex import tracking
+from labtex import ufunc as ufuncs
 class MeasurementList:
     """An extension of the measurement class to take list values. Can be instantiated in a number of ways:
     - Using lists for the values and the uncertainty
@@ -22,114 +24,393 @@ class MeasurementList:
     >>> MeasurementList( 
     ... [Measurement(1,0.1,"m"),Measurement(2,0.2,"m"),Measurement(3,0.3,"m")]
     ... )
+
+    - Wrapping existing NumPy arrays without copying them
+
+    >>> MeasurementList.from_arrays(np.array([1.,2.,3.]), 0.1, "m")
+
+    Like `Measurement`, derived lists track their sensitivity to each independent input. Inputs shared by
+    the whole list (Measurements) and inputs specific to each element (other lists) are kept separately
+    so that the cost of an operation scales with the number of inputs rather than the length of the list squared.
+    Slices and index arrays keep the position of each selected element, and sums keep the contribution of every
+    element they add up, so selections and reductions stay correlated with their list.
     """
     def __init__(self,measurements: Union[List[Number],List[Measurement]], uncertainty: Union[Number,List] = math.nan, unit: Union[Unit,str] = ""):
         
-        if (all(isinstance(value,Measurement) for value in measurements)):
+        # Numeric arrays need no per-element checks
+        if (isinstance(measurements,np.ndarray) and measurements.dtype.kind in 'biuf'):
+            self.unit = unit if (isinstance(unit,Unit)) else Unit(unit)
+            self._values = np.array(measurements, dtype=float)
+            self._uncertainties = _broadcast(uncertainty, self._values.shape)
+            self._components = self._elements = self._key = None
+
+        elif (all(isinstance(value,Measurement) for value in measurements)):
             if (all( value.unit == measurements[0].unit for value in measurements)):
-                self.measurements = array(measurements)
                 self.unit = measurements[0].unit
+                self._values = np.array([measurement.value for measurement in measurements], dtype=float)
+                self._uncertainties = np.array([measurement.uncertainty for measurement in measurements], dtype=float)
+                self._track(measurements)
             else:
                 raise Exception("MeasurementList Error: All measurements in a MeasurementList must have the same units.")
         
         elif (all(isinstance(value,Number) for value in measurements)):
-            uncertainty = uncertainty if isinstance(uncertainty,Iterable) else [uncertainty] * len(measurements)
             self.unit = unit if (isinstance(unit,Unit)) else Unit(unit)
-            self.measurements = array([Measurement(value,uncertainty[i],self.unit) for i,value in enumerate(measurements)])
+            self._values = np.array(measurements, dtype=float)
+            self._uncertainties = _broadcast(uncertainty, self._values.shape)
+            self._components = self._elements = self._key = None
 
         else:
             raise Exception("MeasurementList Error: MeasurementList must be instantiated with a list of Measurements or a list of Numbers.")
+
+    @classmethod
+    def _new(cls, values, uncertainties, unit: Unit):
+        "Wrap columnar value and uncertainty arrays sharing a single Unit without validation."
+        ml = MeasurementList.__new__(MeasurementList)
+        ml._values = values
+        ml._uncertainties = uncertainties
+        ml.unit = unit
+        ml._components = ml._elements = ml._key = None
+        return ml
+
+    @classmethod
+    def from_arrays(cls, values : np.ndarray, uncertainties : Union[Number,np.ndarray], unit : Union[Unit,str] = ""):
+        """Wrap 1-D arrays of values and uncertainties without copying or checking each element.
+        A scalar uncertainty applies to every value. Float arrays are used as they are, so they should
+        not be modified afterwards."""
+        values = np.asarray(values, dtype=float)
+        if(values.ndim != 1):
+            raise Exception(f"MeasurementList Error: Values must be a 1-D array. Shape: {values.shape}")
+        uncertainties = np.asarray(uncertainties, dtype=float)
+        if(uncertainties.ndim == 0):
+            uncertainties = np.broadcast_to(uncertainties, values.shape)
+        elif(uncertainties.shape != values.shape):
+            raise Exception(f"MeasurementList Error: Values and uncertainties must have the same shape: {values.shape} =/= {uncertainties.shape}")
+        return MeasurementList._new(values, uncertainties, unit if isinstance(unit,Unit) else Unit(unit))
+
+    def to_arrays(self):
+        "Read-only views of the values and uncertainties of the list."
+        return self.values(), self.uncertainties()
+
+    @classmethod
+    def _derived(cls, values, components : dict, elements : dict, unit : Unit):
+        """Create a list from its uncertainty components. `components` maps inputs shared by the whole list to
+        their contribution to each element, with a `Projection` of a list as the key of inputs it combines.
+        `elements` maps (key, start, step) to the contribution of input `(key, start + i * step)` to element i,
+        or (key, Positions, None) to that of the input at its position."""
+        contributions = [*components.values(), *elements.values()]
+        if(tracking.overlapping(components, elements)):
+            # Inputs of the same list may coincide, e.g. in a list plus its reverse or minus its mean
+            uncertainties = np.sqrt(tracking.variance(components, elements, (len(values),)))
+        elif(all(_isbroadcast(contribution) for contribution in contributions)):
+            # Uncertainties that are the same for every element stay a single broadcast value
+            variance = sum(contribution[:1] * contribution[:1] for contribution in contributions)
+            uncertainties = _broadcast(np.sqrt(variance)[0] if len(values) else 0, len(values))
+        else:
+            variance = np.zeros(len(values))
+            for contribution in contributions:
+                variance += contribution * contribution
+            uncertainties = np.sqrt(variance)
+        ml = MeasurementList._new(values, uncertainties, unit)
+        ml._components = components
+        ml._elements = elements
+        return ml
+
+    def _tracked(self):
+        "Shared and elementwise uncertainty components of the list. A leaf list is one independent input per element."
+        if(self._components is None):
+            if(self._key is None):
+                self._key = next(_keys)
+            return {}, {(self._key, 0, 1): self._uncertainties}
+        return self._components, self._elements
+
+    def _track(self, measurements : List[Measurement]):
+        """Keep the inputs shared between Measurements so the list stays correlated with them.
+        Elements of other lists keep their positions in them, and other inputs that only affect a single element
+        are combined into one new independent input per element."""
+        self._components = self._elements = self._key = None
+        counts, projected = {}, False
+        for measurement in measurements:
+            for key, component in measurement.components.items():
+                if(isinstance(component,tracking.Projection)):
+                    projected = True
+                else:
+                    counts[key] = counts.get(key, 0) + 1
+        if(all(count == 1 for count in counts.values()) and not projected):
+            return
+        n = len(measurements)
+        components = { key: np.zeros(n) for key, count in counts.items() if count > 1 }
+        residual = np.zeros(n)
+        # Single elements of a list, by the key of that list: the position and contribution for each Measurement
+        singles = {}
+        for i, measurement in enumerate(measurements):
+            for key, component in measurement.components.items():
+                if(isinstance(component,tracking.Projection)):
+                    if(len(component.positions) == 1):
+                        inputs, contributions = singles.setdefault(key, (np.full(n, component.positions[0]), np.zeros(n)))
+                        inputs[i], contributions[i] = component.positions[0], component.weights[0]
+                    else:
+                        components.setdefault(component, np.zeros(n))[i] += 1
+                elif(key in components):
+                    components[key][i] += component
+                else:
+                    residual[i] += component**2
+        self._components = components
+        self._elements = { (key, *_indexmap(inputs)): contributions for key, (inputs, contributions) in singles.items() }
+        self._elements[(next(_keys), 0, 1)] = np.sqrt(residual)
+
+    def _element(self, i : int, components : dict, elements : dict):
+        "The i-th element as a Measurement carrying its uncertainty components."
+        measurement = {}
+        for key, contribution in components.items():
+            tracking.combine(measurement, key, contribution[i].item())
+        for (key, start, step), contribution in elements.items():
+            tracking.combine(measurement, key, tracking.element(key, _position(start, step, i), contribution[i].item()))
+        return Measurement._derived(self._values[i].item(), measurement, self.unit)
+
+    def budget(self, *inputs):
+        "Fraction of the variance of each element contributed by each of the given Measurements/MeasurementLists."
+        variances = tracking.variances(*self._tracked(), (len(self),))
+        variance = self._uncertainties**2
+        budget = []
+        for x in inputs:
+            keys = _inputkeys(x)
+            contribution = np.zeros(len(self))
+            for key, component in variances.items():
+                if(_dependson(key, keys)):
+                    contribution += component
+            budget.append(contribution / variance)
+        return budget
+
+    def covariance(self):
+        """Covariance matrix of the list due to the inputs it depends on, as a `Covariance` stored by its structure.
+        Inputs specific to each element give its diagonal, and inputs shared between elements give a low rank factor,
+        so a list correlated through a few Measurements takes memory proportional to its length."""
+        from labtex.covariance import Covariance
+        n = len(self)
+        independent, bases = tracking.groups(*self._tracked())
+        diagonal, columns, dense = np.zeros(n), [ np.broadcast_to(contribution, n) for contribution in independent.values() ], None
+        # Inputs of the same list may appear at several positions, e.g. after slicing, and in projections such as a mean
+        for entries, projections in bases.values():
+            if(len(entries) == 1 and not projections and entries[0][1] not in (0, None)):
+                diagonal += entries[0][2]**2
+                continue
+            if(entries):
+                # Count the elements depending on each input
+                inputs, rows, summed = tracking.summed(entries, (n,))
+                _, inputs = np.unique(inputs, return_inverse=True)
+                counts = np.bincount(inputs)
+                single = counts[inputs] == 1
+                diagonal += np.bincount(rows[single], weights=summed[single]**2, minlength=n)
+                shared = np.flatnonzero(counts > 1)
+                matrix = np.zeros((n, len(shared)))
+                matrix[rows[~single], np.searchsorted(shared, inputs[~single])] = summed[~single]
+                columns.extend(matrix.T)
+            if(projections):
+                A, H, X = tracking.projected(entries, projections, (n,))
+                if(entries):
+                    dense = (0 if dense is None else dense) + X @ A.T + A @ X.T + A @ H @ A.T
+                else:
+                    eigenvalues, eigenvectors = np.linalg.eigh(H)
+                    columns.extend((A @ (eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None)))).T)
+        factor = np.column_stack(columns) if columns else None
+        if(dense is not None or (factor is not None and factor.shape[1] >= n)):
+            return Covariance(dense=np.diag(diagonal) + (0 if factor is None else factor @ factor.T) + (0 if dense is None else dense))
+        return Covariance(diagonal, factor)
+
+    @classmethod
+    def from_covariance(cls, values, covariance, unit : Union[Unit,str] = ""):
+        """Create a list of correlated measurements from their covariance matrix, given as an array or a `Covariance`.
+        Each column of a low rank or dense covariance becomes an input shared by the list, so the correlations
+        are propagated through later operations."""
+        from labtex.covariance import Covariance
+        values = np.asarray(values, dtype=float)
+        covariance = covariance if isinstance(covariance,Covariance) else Covariance.from_array(covariance)
+        if(values.ndim != 1 or len(covariance) != len(values)):
+            raise Exception(f"MeasurementList Error: A covariance of length {len(covariance)} does not match values of shape {values.shape}.")
+        if(covariance.dense is not None):
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance.dense)
+            diagonal, factor = np.zeros(len(values)), eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+        else:
+            diagonal, factor = covariance.diagonal, covariance.factor
+        return MeasurementList._derived(
+            values,
+            {} if factor is None else { next(_keys): column for column in factor.T },
+            {(next(_keys), 0, 1): np.sqrt(diagonal)},
+            unit if isinstance(unit,Unit) else Unit(unit)
+        )
+
+    @property
+    def measurements(self):
+        "Object array of the individual `Measurement`s. Built on demand."
+        return np.array(list(self), dtype=object)
+
     def __repr__(self):
         "Print string with sigfigs up to uncertainty."            
-        return f"[{', '.join([str(measurement)[:-(len(str(self.unit)) + 1)] for measurement in self])}] {self.unit}"
+        return f"[{', '.join([str(measurement)[:-(len(str(self.unit)) + 1)] for measurement in self._untracked()])}] {self.unit}"
 
     def tableprint(self, novalues = False, nounits = False):
         "return string in printable LaTeX table format. Used in `Document().table()`."
-        constantuncertainty = all(measurement.uncertainty == self.measurements[0].uncertainty for measurement in self)
+        constantuncertainty = _isbroadcast(self._uncertainties) or bool(np.all(self._uncertainties == self._uncertainties[0]))
+        uncertainty = self._uncertainties[0].item()
         tableprint = ""
         if (constantuncertainty):
-            sigdigits = -math.floor(math.log10(self.measurements[0].uncertainty))
-            sigdigits = -math.floor(math.log10(round(self.measurements[0].uncertainty,sigdigits)))
+            sigdigits = -math.floor(math.log10(uncertainty))
+            sigdigits = -math.floor(math.log10(round(uncertainty,sigdigits)))
             if(sigdigits > 0):
                 if(not nounits):
-                    tableprint += f", ($\\pm {round(self.measurements[0].uncertainty,sigdigits)}$ {Unit.latex(self.unit)})"
+                    tableprint += f", ($\\pm {round(uncertainty,sigdigits)}$ {Unit.latex(self.unit)})"
                 if(not novalues):
-                    tableprint += f"& { r' & '.join([str(round(measurement.value,sigdigits)) for measurement in self ] ) }"
+                    tableprint += f"& { r' & '.join([str(round(value,sigdigits)) for value in self._values.tolist() ] ) }"
             else: # remove decimal points from the float data type
                 if(not nounits):
-                    tableprint += f", ($\\pm {round(int(self.measurements[0].uncertainty),sigdigits)}$ {self.unit}) "
+                    tableprint += f", ($\\pm {round(int(uncertainty),sigdigits)}$ {self.unit}) "
                 if(not novalues):
-                    tableprint += f"& { r' & '.join([ str(round(round(measurement.value),sigdigits)) for measurement in self ] ) }"
+                    tableprint += f"& { r' & '.join([ str(round(round(value),sigdigits)) for value in self._values.tolist() ] ) }"
         else:
             if(not nounits):
                 # power = re.compile('(\^\-?\d+)')
                 tableprint += f", ({Unit.latex(self.unit)}) " if not Unit.unitless(self.unit) else ""
             if(not novalues):
                 if(len(str(self.unit)) == 0): # 0 breaks python indexing
-                    tableprint += f"& ${ r'$ & $'.join([str(measurement) for measurement in self ] ) }$"
+                    tableprint += f"& ${ r'$ & $'.join([str(measurement) for measurement in self._untracked() ] ) }$"
                 else:
-                    tableprint += f"& ${ r'$ & $'.join([str(measurement)[:-len(str(measurement.unit))] for measurement in self ] ) }$"
+                    tableprint += f"& ${ r'$ & $'.join([str(measurement)[:-len(str(measurement.unit))] for measurement in self._untracked() ] ) }$"
 
-        return tableprint.replace('±','\pm').replace('×','\\times')
+        return tableprint.replace('±','\\pm').replace('×','\\times')
 
     def __len__(self):
-        return len(self.measurements)
+        return len(self._values)
 
     def __getitem__(self,item):
-        # item can be a slice or an index/int
+        # item can be a slice, an index/int, a boolean mask or an array of indices
         # if its an index, return a measurement
-        if (isinstance(item,int)):
-            return self.measurements[item]
-        # if its a slice, return a measurementlist
+        if (isinstance(item,(int,np.integer))):
+            return self._element(range(len(self))[item], *self._tracked())
+        # if its a slice, return a view of the measurementlist
         elif (isinstance(item,slice)):
-            return MeasurementList(self.measurements[item])
+            components, elements = self._tracked()
+            return MeasurementList._derived(
+                self._values[item],
+                { key: contribution[item] for key, contribution in components.items() },
+                { _select(*key, len(self), item): contribution[item] for key, contribution in elements.items() },
+                self.unit
+            )
+        # if its a mask or an array of indices, select with a single NumPy operation
+        elif (isinstance(item,(np.ndarray,list))):
+            return self._take(_indices(item, len(self)))
+        else:
+            raise TypeError(f"MeasurementList indices must be integers, slices, boolean masks or integer arrays, not {type(item).__name__}")
+
+    def _take(self, index : np.ndarray):
+        """Select the elements at `index`, keeping the position of the input of each selected element:
+        as a step for evenly spaced indices, like a slice, and as an explicit index map otherwise."""
+        components, elements = self._tracked()
+        return MeasurementList._derived(
+            self._values[index],
+            { key: contribution[index] for key, contribution in components.items() },
+            { _select(*key, len(self), index): contribution[index] for key, contribution in elements.items() },
+            self.unit
+        )
 
     def __iter__(self):
-        yield from self.measurements
+        components, elements = self._tracked()
+        for i in range(len(self)):
+            yield self._element(i, components, elements)
+
+    def _untracked(self):
+        "Iterate over plain Measurements, e.g. for printing."
+        for value, uncertainty in zip(self._values.tolist(), self._uncertainties.tolist()):
+            yield Measurement(value, uncertainty, self.unit)
 
     def values(self):
-        return [measurement.value for measurement in self]
+        "Read-only view of the values of the list."
+        return _readonly(self._values)
     
     def uncertainties(self):
-        return [measurement.uncertainty for measurement in self]
+        "Read-only view of the uncertainties of the list."
+        return _readonly(self._uncertainties)
     
     def concat(self,obj):
         "Non-mutating concatenation of a Measurement/MeasurementList to the current MeasurementList."
-        if(isinstance(obj,MeasurementList)):
+        if(isinstance(obj,Measurement)):
             if(self.unit == obj.unit):
-                return MeasurementList([*[measurement for measurement in self], *[measurement for measurement in obj]])
+                obj = MeasurementList([obj])
             else:
-                raise Exception("MeasurementList Error: Cannot append two MeasurementLists with different units.")
-        elif(isinstance(obj,Measurement)):
+                raise Exception("MeasurementList Error: Cannot append a MeasurementList and a Measurement with different units.")
+        if(isinstance(obj,MeasurementList)):
             if(self.unit == obj.unit):
-                return MeasurementList([*[measurement for measurement in self], obj])
+                n, m = len(self), len(obj)
+                components, elements = self._tracked()
+                objcomponents, objelements = obj._tracked()
+                concatenated = {
+                    key: np.concatenate((components.get(key, np.zeros(n)), objcomponents.get(key, np.zeros(m))))
+                    for key in {**components, **objcomponents}
+                }
+                concatenatedelements = { _pad(*key, 0, m): np.concatenate((contribution, np.zeros(m))) for key, contribution in elements.items() }
+                # Elements of obj are shifted along by n
+                for key, contribution in objelements.items():
+                    key = _pad(*key, n, 0)
+                    concatenatedelements[key] = concatenatedelements.get(key, 0) + np.concatenate((np.zeros(n), contribution))
+                return MeasurementList._derived(
+                    np.concatenate((self._values, obj._values)),
+                    concatenated,
+                    concatenatedelements,
+                    self.unit
+                )
             else:
-                raise Exception("MeasurementList Error: Cannot append a MeasurementList and a Measurement with different units.")
+                raise Exception("MeasurementList Error: Cannot append two MeasurementLists with different units.")
         else:
             raise Exception(f"Object of type {type(obj)} cannot be appended to a MeasurementList. Try a MeasurementList or a Measurement.")
 
-        
+    def _columns(self, obj, operation : str):
+        "Return the values and unit of an operand, checking the length of MeasurementLists."
+        if(isinstance(obj,MeasurementList)):
+            if(len(self) != len(obj)):
+                raise Exception(f"MeasurementList Error: Cannot {operation} two MeasurementLists with different lengths: {len(self)} =/= {len(obj)}.")
+            return obj._values, obj.unit
+        return obj.value, obj.unit
+
+    def _propagate(self, values, unit : Unit, *terms):
+        "Derived list from (partial derivative, Measurement/MeasurementList) pairs."
+        return MeasurementList._derived(values, *_propagatelist(len(self), *terms), unit)
+
+    def _constant(self, obj, operation : str):
+        "An exact number, or a NumPy array of one for each element, as a constant operand; None for other operands."
+        if(isinstance(obj,Number)):
+            return obj
+        if(isinstance(obj,np.ndarray) and obj.dtype.kind in 'biuf'):
+            if(obj.shape != (len(self),)):
+                raise Exception(f"MeasurementList Error: Cannot {operation} a MeasurementList of length {len(self)} and an array of shape {obj.shape}.")
+            return np.asarray(obj, dtype=float)
+        return None
+
     def __add__(self,obj):
         "Elementwise addition of two MeasurementLists. If a Measurement is added, it is added to all Measurements in the list."
-        if(isinstance(obj,MeasurementList)):
-            if(len(self) == len(obj)):
-                return MeasurementList(
-                    [measurement + obj[i] for i,measurement in enumerate(self)]
-                )
-            else:
-                raise Exception(f"MeasurementList Error: Cannot add two MeasurementLists with different lengths: {len(self)} =/= {len(obj)}. If you want to concatenate them use .concat().")
+        if(isinstance(obj,(MeasurementList,Measurement))):
+            values, unit = self._columns(obj, "add")
+            try:
+                factor = _conversionfactor(unit, self.unit)
+            except Exception:
+                raise Exception(f"Cannot add measurements with different units: {self.unit} and {unit}")
+            return self._propagate(self._values + values * factor, self.unit, (1, self), (factor, obj))
+
+        # For a constant with no uncertainty, or an array of one for each element
+        constant = self._constant(obj, "add")
+        if(constant is not None):
+            return self._propagate(self._values + constant, self.unit, (1, self))
+        if(isinstance(obj,list)):
+            raise Exception("Cannot add a MeasurementList to a list. Convert list to MeasurementList first.")
         else:
-            return MeasurementList(
-                [measurement + obj for measurement in self]
-            )
+            return NotImplemented
 
     def __radd__(self,obj):
         return self.__add__(obj)
 
     def __neg__(self):
-        return MeasurementList(
-            [-measurement for measurement in self]
-        )
+        return self._propagate(-self._values, self.unit, (-1, self))
+
+    def __abs__(self):
+        return self._propagate(np.abs(self._values), self.unit, (np.sign(self._values), self))
 
     def __sub__(self,obj):
         return self.__add__(-obj)
@@ -139,97 +420,285 @@ class MeasurementList:
 
     def __mul__(self,obj):
         "Elementwise (aka inner) multiplication of two MeasurementLists. If a Measurement is used, it is multiplied by all Measurements in the list."
-        if(isinstance(obj,MeasurementList)):
-            if(len(self) == len(obj)):
-                return MeasurementList(
-                    [measurement * obj[i] for i,measurement in enumerate(self)]
-                )
-            else:
-                raise Exception(f"MeasurementList Error: Cannot multiply two MeasurementLists with different lengths: {len(self)} =/= {len(obj)}. If you want to concatenate them use .concat(), or if you want to multiply elementwise then use iterators.")
+        if(isinstance(obj,(MeasurementList,Measurement))):
+            values, unit = self._columns(obj, "multiply")
+            # Shared dimensions with different prefixes are rescaled onto the prefixes of self
+            factor, unit = Unit.product(self.unit, unit)
+            values = values * factor
+            return self._propagate(self._values * values, unit, (values, self), (self._values * factor, obj))
+
+        constant = self._constant(obj, "multiply")
+        if(constant is not None):
+            return self._propagate(self._values * constant, self.unit, (constant, self))
+        if(isinstance(obj,list)):
+            raise Exception("Cannot multiply a MeasurementList by a list. Convert list to MeasurementList first.")
         else:
-            return MeasurementList(
-                [measurement * obj for measurement in self]
-            )
+            return NotImplemented
 
     def __rmul__(self,obj):
         return self.__mul__(obj)
         
     def __truediv__(self,obj):
         "Elementwise division of two MeasurementLists. If a Measurement is used all Measurements in the list are divided by it."
-        if(isinstance(obj,MeasurementList)):
-            if(len(self) == len(obj)):
-                return MeasurementList(
-                    [measurement / obj[i] for i,measurement in enumerate(self)]
-                )
-            else:
-                raise Exception(f"MeasurementList Error: Cannot divide two MeasurementLists with different lengths: {len(self)} =/= {len(obj)}.")
+        if(isinstance(obj,(MeasurementList,Measurement))):
+            values, unit = self._columns(obj, "divide")
+            factor, unit = Unit.quotient(self.unit, unit)
+            values = values * factor
+            quotient = self._values / values
+            return self._propagate(quotient, unit, (1 / values, self), (-quotient * factor / values, obj))
+
+        constant = self._constant(obj, "divide")
+        if(constant is not None):
+            return self._propagate(self._values / constant, self.unit, (1 / constant, self))
+        if(isinstance(obj,list)):
+            raise Exception("Cannot divide a MeasurementList by a list. Convert list to MeasurementList first.")
         else:
-            return MeasurementList(
-                [measurement / obj for measurement in self]
-            )
+            return NotImplemented
 
     def __rtruediv__(self,obj):
-        "Accomodates the division of a number or Measurement by a MeasurementList."
-        return MeasurementList(
-            [obj / measurement for measurement in self]
-        )
+        "Accomodates the division of a number, array or Measurement by a MeasurementList."
+        if(isinstance(obj,Measurement)):
+            factor, unit = Unit.quotient(obj.unit, self.unit)
+            values = self._values * factor
+            quotient = obj.value / values
+            return self._propagate(quotient, unit, (1 / values, obj), (-quotient * factor / values, self))
+        constant = self._constant(obj, "divide")
+        if(constant is not None):
+            quotient = constant / self._values
+            return self._propagate(quotient, 1 / self.unit, (-quotient / self._values, self))
+        else:
+            return NotImplemented
 
     def __pow__(self,obj):
-        return MeasurementList(
-            [measurement ** obj for measurement in self]
-        )
+        "Raising each measurement in the list to a constant power."
+        if(isinstance(obj,Measurement)):
+            if(Unit.unitless(obj.unit)):
+                values = self._values ** obj.value
+                terms = [(obj.value * self._values ** (obj.value - 1), self)]
+                if(obj.uncertainty != 0):
+                    terms.append((values * np.log(self._values), obj))
+                return self._propagate(values, self.unit ** obj.value, *terms)
+            else:
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+        if(isinstance(obj,Number)):
+            # As for Measurements, the derivative at zero is taken to be 0 for powers below 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                derivative = obj * self._values ** (obj - 1) if obj >= 1 else np.where(self._values != 0, obj * self._values ** (obj - 1), 0)
+            return self._propagate(self._values ** obj, self.unit ** obj, (derivative, self))
+        else:
+            return NotImplemented
 
     def __rpow__(self,obj):
-        return MeasurementList(
-            [obj ** measurement for measurement in self]
-        )
+        "Reverse power for constant ** MeasurementList."
+        if(isinstance(obj,Number)):
+            if(Unit.unitless(self.unit)):
+                values = obj ** self._values
+                return self._propagate(values, Unit(""), (values * math.log(obj), self))
+            else:
+                raise Exception("Cannot raise a constant to a dimensional quantity. Units: " + str(self.unit))
+        else:
+            return NotImplemented
 
-    def to(self,unit : str):
-        return MeasurementList(
-            [measurement.to(unit) for measurement in self]
-        )
+    @staticmethod
+    def apply(func, *args, unit : Union[Unit,str] = None):
+        """Propagate uncertainty through a function of Measurements/MeasurementLists using exact derivatives from dual numbers.
+        `func` receives the values in their own units and may use arithmetic and NumPy functions,
+        which combine units like Measurements. For example,
+        >>> MeasurementList.apply(lambda x, y: np.sqrt(x**2 + y**2), x, y)"""
+        from labtex.dual import apply
+        return apply(func, *args, unit=unit)
+
+    def lazy(self):
+        "Start a lazily evaluated `Expression` from this list."
+        from labtex.lazy import Expression
+        return Expression.leaf(self)
+
+    def to(self,unit : Union[str,Unit]):
+        "Convert the units of all measurements to one with the same dimensions."
+        unit = unit if isinstance(unit,Unit) else Unit(unit)
+        try:
+            factor = _conversionfactor(self.unit, unit)
+        except Exception:
+            raise Exception(f"Dimension Error: Cannot convert from {self.unit} to {unit} because they have different dimensions.")
+        return self._propagate(self._values * factor, unit, (factor, self))
+
+    def _weightedsum(self, weights = 1):
+        """Weighted sum of the measurements in the list, with independent uncertainties added in quadrature.
+        Inputs shared by the whole list stay tracked, and the elementwise inputs are kept as a `Projection` of the
+        contribution of each element, so the sum stays correlated with the list, its elements and other sums of them."""
+        components, elements = self._tracked()
+        total = {}
+        for key, contribution in components.items():
+            tracking.combine(total, key, np.sum(weights * contribution).item())
+        for (key, start, step), contribution in elements.items():
+            projection = tracking.Projection.of(key, tracking.positions(start, step, (len(self),)), weights * contribution)
+            tracking.combine(total, key, projection)
+        return Measurement._derived(np.sum(weights * self._values).item(), total, self.unit)
+
+    def _linear(self, matrix):
+        """Product of a constant matrix with the list, or of a vector for a single Measurement.
+        Inputs specific to each element become projections shared by the result, so its elements stay correlated:
+        one for each row of the matrix, or for each input when the matrix has more rows than columns."""
+        matrix = np.asarray(matrix, dtype=float)
+        if(matrix.ndim not in (1, 2) or matrix.shape[-1] != len(self)):
+            raise Exception(f"MeasurementList Error: Cannot multiply a MeasurementList of length {len(self)} by an array of shape {matrix.shape}.")
+        if(matrix.ndim == 1):
+            return self._weightedsum(matrix)
+        components, elements = self._tracked()
+        total = { key: matrix @ contribution for key, contribution in components.items() }
+        rows = len(matrix)
+        _, bases = tracking.groups({}, elements)
+        for key, (entries, _) in bases.items():
+            inputs = np.concatenate([ tracking.positions(start, step, (len(self),)) for start, step, _ in entries ])
+            weights = np.concatenate([ matrix * contribution for _, _, contribution in entries ], axis=1)
+            if(not np.all(inputs[1:] > inputs[:-1])):
+                # Sum the weights of each input, which may appear at several positions after slicing
+                inputs, index = np.unique(inputs, return_inverse=True)
+                order = np.argsort(index.ravel(), kind='stable')
+                weights = np.add.reduceat(weights[:, order], np.searchsorted(index.ravel()[order], np.arange(len(inputs))), axis=1)
+            if(rows <= len(inputs)):
+                identity = np.eye(rows)
+                for row in range(rows):
+                    total[tracking.Projection(key, inputs, weights[row])] = identity[row]
+            else:
+                for i, position in enumerate(inputs.tolist()):
+                    total[tracking.element(key, position, 1)] = weights[:, i]
+        return MeasurementList._derived(matrix @ self._values, total, {}, self.unit)
+
+    def __matmul__(self,obj):
+        "Matrix product with a constant array, or the dot product of two MeasurementLists."
+        if(isinstance(obj,MeasurementList)):
+            return (self * obj).sum()
+        if(isinstance(obj,(np.ndarray,list))):
+            return self._linear(np.asarray(obj, dtype=float).T)
+        return NotImplemented
+
+    def __rmatmul__(self,obj):
+        if(isinstance(obj,(np.ndarray,list))):
+            return self._linear(obj)
+        return NotImplemented
+
+    def sum(self):
+        "Sum of all measurements in the list, with independent uncertainties added in quadrature."
+        return self._weightedsum()
+
+    def mean(self):
+        "Unweighted mean of the measurements in the list."
+        return self._weightedsum(1 / len(self))
+
+    def weighted_mean(self):
+        "Inverse-variance weighted mean of the measurements in the list."
+        weights = 1 / self._uncertainties**2
+        return self._weightedsum(weights / np.sum(weights))
+
+    def std(self, ddof : int = 1):
+        """Sample standard deviation of the values in the list, with the standard error of that estimate
+        for normally distributed values as its uncertainty. `ddof` is subtracted from the number of values as in NumPy."""
+        std = np.std(self._values, ddof=ddof).item()
+        return Measurement(std, std / math.sqrt(2 * (len(self) - 1)), self.unit)
+
+    def sem(self):
+        "Standard error of the mean estimated from the scatter of the values in the list."
+        return self.std() / math.sqrt(len(self))
+
+    def to_series(self, name : str = None, index = None):
+        "A pandas Series of `measurement[unit]` dtype viewing the list without copying it."
+        import pandas
+        from labtex.dataframe import MeasurementExtensionArray
+        return pandas.Series(MeasurementExtensionArray(self), name=name, index=index, copy=False)
+
+    @classmethod
+    def from_series(cls, series):
+        "The MeasurementList of a pandas Series of `measurement[unit]` dtype without copying it, or exact values from a numeric Series."
+        from labtex.dataframe import MeasurementExtensionArray
+        if(isinstance(series.array,MeasurementExtensionArray)):
+            return series.array._data
+        return MeasurementList.from_arrays(series.to_numpy(dtype=float), 0)
+
+    def statistics(self):
+        "Single pass, mergeable `Statistics` of the list."
+        from labtex.statistics import Statistics
+        return Statistics(self.unit).update(self)
+
+    @classmethod
+    def from_samples(cls, samples, unit : Union[Unit,str] = "", axis : int = -1):
+        """Summarise repeated samples as their mean with the standard error of the mean as its uncertainty.
+        1-D samples give a Measurement, while 2-D samples give a MeasurementList reducing along `axis`."""
+        samples = np.asarray(samples, dtype=float)
+        unit = unit if isinstance(unit,Unit) else Unit(unit)
+        if(samples.ndim not in (1, 2)):
+            raise Exception(f"MeasurementList Error: Samples must be 1-D or 2-D. Shape: {samples.shape}")
+        count = samples.shape[axis]
+        values = np.mean(samples, axis=axis)
+        uncertainties = np.std(samples, axis=axis, ddof=1) / math.sqrt(count)
+        if(samples.ndim == 1):
+            return Measurement(values.item(), uncertainties.item(), unit)
+        return MeasurementList._new(values, uncertainties, unit)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "Propagate uncertainty and units through NumPy ufuncs, e.g. `np.sqrt(ml)` or `array * ml`."
+        if(method != '__call__' or kwargs):
+            return NotImplemented
+        if(ufunc is np.matmul and len(inputs) == 2):
+            return self.__matmul__(inputs[1]) if inputs[0] is self else self.__rmatmul__(inputs[0])
+        inputs = ufuncs.operands(inputs)
+        if(inputs is None):
+            return NotImplemented
+        if(len(inputs) == 2 and ufunc in ufuncs.binary):
+            return ufuncs.call(ufunc, *inputs)
+        if(len(inputs) == 1):
+            result = ufuncs.apply(ufunc, self._values, self.unit)
+            if(result is not None):
+                values, derivative, unit = result
+                return self._propagate(values, unit, (derivative, self))
+        return NotImplemented
+
+    def __array_function__(self, func, types, args, kwargs):
+        "Support NumPy functions such as `np.sum`, `np.mean` and `np.concatenate` on MeasurementLists."
+        if(func not in _arrayfunctions or not all(issubclass(t,(MeasurementList,np.ndarray)) for t in types)):
+            return NotImplemented
+        return _arrayfunctions[func](*args, **kwargs)
+
+    # Static Functions applied to MeasurementLists
+    # Each evaluates the function and its derivative over the whole list at once
+    @staticmethod
+    def _function(x, func, derivative, name : str = "Trigonometric"):
+        if(Unit.unitless(x.unit)):
+            return x._elementwise(func, derivative)
+        else:
+            raise Exception(f"{name} functions take in dimensionless quantities. Input has units: {x.unit}")
+
+    def _elementwise(self, func, derivative):
+        "Apply `func` to the values of a dimensionless list, with derivative `derivative`."
+        return self._propagate(func(self._values), Unit(""), (derivative(self._values), self))
 
     @staticmethod
     def sin(x):
-        return MeasurementList(
-            [Measurement.sin(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.sin, np.cos)
 
     @staticmethod
     def cos(x):
-        return MeasurementList(
-            [Measurement.cos(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.cos, lambda v: -np.sin(v))
 
     @staticmethod
     def tan(x):
-        return MeasurementList(
-            [Measurement.tan(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.tan, lambda v: 1 / np.cos(v)**2)
 
     @staticmethod
     def log(x):
-        return MeasurementList(
-            [Measurement.log(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.log, lambda v: 1 / v, "Log")
 
     @staticmethod
     def asin(x):
-        return MeasurementList(
-            [Measurement.asin(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.arcsin, lambda v: 1 / np.sqrt(1 - v**2))
     
     @staticmethod
     def acos(x):
-        return MeasurementList(
-            [Measurement.acos(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.arccos, lambda v: -1 / np.sqrt(1 - v**2))
 
     @staticmethod
     def atan(x):
-        return MeasurementList(
-            [Measurement.atan(measurement) for measurement in x]
-        )
+        return MeasurementList._function(x, np.arctan, lambda v: 1 / (1 + v**2))
 
 class ML(MeasurementList):
     """An extension of the measurement class to take list values. Can be instantiated in a number of ways:
@@ -248,4 +717,114 @@ class ML(MeasurementList):
      ... )`
 
     """
-    pass
\ No newline at end of file
+    pass
+
+
+def _propagatelist(length : int, *terms):
+    """First order propagation of list uncertainty components from (partial derivative, Measurement/MeasurementList) pairs.
+    Returns the shared and elementwise components, each contribution an array over the list."""
+    components, elements = {}, {}
+    for derivative, obj in terms:
+        if(isinstance(obj,MeasurementList)):
+            objcomponents, objelements = obj._tracked()
+            objcomponents = objcomponents.items()
+        else:
+            objcomponents, objelements = tracking.shared(obj.components), {}
+        for key, contribution in objcomponents:
+            components[key] = _accumulate(components.get(key, 0), derivative, contribution)
+        for key, contribution in objelements.items():
+            elements[key] = _accumulate(elements.get(key, 0), derivative, contribution)
+    return (
+        { key: _broadcast(contribution, length) for key, contribution in components.items() },
+        { key: _broadcast(contribution, length) for key, contribution in elements.items() }
+    )
+
+def _broadcast(value, shape):
+    "Broadcast a value over the list without copying it, so a scalar is stored once."
+    return np.broadcast_to(np.asarray(value, dtype=float), shape)
+
+def _isbroadcast(array):
+    "Whether an array over the list holds one value broadcast to every element."
+    return np.ndim(array) == 0 or (np.ndim(array) == 1 and (len(array) <= 1 or array.strides[0] == 0))
+
+def _accumulate(total, derivative, contribution):
+    "total + derivative * contribution, working on single values when neither varies over the list."
+    if(np.ndim(derivative) == 0 and _isbroadcast(contribution) and _isbroadcast(total)):
+        return _first(total) + derivative * _first(contribution)
+    return total + derivative * contribution
+
+def _first(array):
+    "The value of an array broadcast over the list."
+    return array[0] if np.ndim(array) and len(array) else array
+
+def _position(start, step, i : int):
+    "Position of the input of element i for an elementwise key (start, step)."
+    return int(start.array[i]) if isinstance(start,tracking.Positions) else start + i * step
+
+def _indexmap(array : np.ndarray):
+    "The (start, step) of an elementwise key of a list with the given positions."
+    start, step = tracking.indexmap(array)
+    return (start, step) if step is None else (start, step[0] if len(array) > 1 else 1)
+
+def _select(key, start, step, length : int, item):
+    "Elementwise key of the elements of a list of `length` selected by a slice or an array of indices."
+    if(isinstance(start,tracking.Positions)):
+        return (key, *_indexmap(start.array[item]))
+    if(isinstance(item,slice)):
+        first, stop, stride = item.indices(length)
+        return key, start + first * step, step * stride
+    return (key, *_indexmap(start + step * item))
+
+def _pad(key, start, step, before : int, after : int):
+    "Elementwise key of the elements of a list after putting `before` elements in front of it and `after` behind it."
+    if(isinstance(start,tracking.Positions)):
+        array = start.array
+        return (key, *_indexmap(np.concatenate((np.full(before, array[0]), array, np.full(after, array[-1])))))
+    return key, start - before * step, step
+
+def _indices(item, length : int):
+    "Normalise a boolean mask or an array of (possibly negative) indices to an array of indices."
+    index = np.asarray(item)
+    if(index.dtype == bool):
+        if(index.shape != (length,)):
+            raise IndexError(f"Boolean mask of shape {index.shape} does not match MeasurementList of length {length}")
+        return np.flatnonzero(index)
+    if(index.size == 0):
+        return np.zeros(0, dtype=int)
+    if(index.ndim != 1 or index.dtype.kind not in 'iu'):
+        raise IndexError("MeasurementList can only be indexed by 1-D boolean masks or integer arrays")
+    return np.arange(length)[index]
+
+def _readonly(array : np.ndarray):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+def _conversionfactor(fromunit : Unit, tounit : Unit):
+    "Factor converting values in `fromunit` to `tounit`. Raises if their dimensions differ."
+    if(not fromunit.samedimensions(tounit)):
+        raise Exception(f"Dimension Error: Cannot convert from {fromunit} to {tounit} because they have different dimensions.")
+    return fromunit.factor / tounit.factor
+
+def _reduction(method, **defaults):
+    """Wrap a reduction method as a NumPy function over the whole (1-D) list, using the list's own implementation.
+    Keyword arguments named in `defaults` are passed on to the method, with NumPy's defaults."""
+    def reduction(ml, axis = None, **kwargs):
+        passed = { name: kwargs.pop(name, default) for name, default in defaults.items() }
+        if(axis not in (None, 0) or any(value is not None for value in kwargs.values())):
+            raise Exception("MeasurementList Error: Only reductions over the whole list are supported.")
+        return getattr(ml, method.__name__)(**passed)
+    return reduction
+
+def _concatenate(mls, axis = 0, **kwargs):
+    result = mls[0]
+    for ml in mls[1:]:
+        result = result.concat(ml)
+    return result
+
+_arrayfunctions = {
+    np.sum: _reduction(MeasurementList.sum),
+    np.mean: _reduction(MeasurementList.mean),
+    np.std: _reduction(MeasurementList.std, ddof=0),
+    np.concatenate: _concatenate,
+}
@@ -0,0 +1,200 @@
+import json
+import operator
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, Union
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurementlist import MeasurementList
+from labtex.statistics import Statistics
+from labtex import ufunc as ufuncs
+
+class MappedMeasurementList(MeasurementList):
+    """A MeasurementList stored out of core in a directory of memory-mapped files:
+    `values.npy`, `uncertainties.npy` and a `unit.json` header. For example,
+    >>> ml = MappedMeasurementList.save(MeasurementList([1,2,3],0.1,"m"), "run1")
+    >>> MappedMeasurementList.open("run1") * 2
+
+    Elementwise operators, NumPy ufuncs, functions such as `MeasurementList.sin`, single pass reductions and `to()`
+    are evaluated in blocks of `chunksize` elements,
+    writing their results to a new mapped list, so memory use does not depend on the length of the list.
+    Results are written to temporary directories under `directory` (by default the system temporary directory),
+    deleted once the result is garbage collected or the interpreter exits, unless `map` is given a path to keep.
+    Slices are mapped views of the same files. Mapped lists, including slices, are independent inputs:
+    correlations are tracked within each operation but not between the lists it produces.
+    """
+    chunksize = 2**20
+    directory = None
+
+    @staticmethod
+    def _paths(path : str):
+        return tuple(os.path.join(path, name) for name in ('values.npy', 'uncertainties.npy', 'unit.json'))
+
+    @classmethod
+    def create(cls, path : str, length : int, unit : Union[Unit,str] = ""):
+        "Create a mapped list of `length` zeros at `path`, to be filled in place."
+        unit = unit if isinstance(unit,Unit) else Unit(unit)
+        os.makedirs(path, exist_ok=True)
+        values, uncertainties, header = cls._paths(path)
+        with open(header, 'w') as file:
+            json.dump({ symbol: dict(dim) for symbol, dim in unit.units.items() if dim['power'] != 0 }, file)
+        ml = MeasurementList._new(
+            np.lib.format.open_memmap(values, mode='w+', dtype=float, shape=(length,)),
+            np.lib.format.open_memmap(uncertainties, mode='w+', dtype=float, shape=(length,)),
+            unit
+        )
+        ml.__class__ = cls
+        ml.path = path
+        return ml
+
+    @classmethod
+    def open(cls, path : str, mode : str = 'r'):
+        "Open the mapped list at `path`, read-only by default."
+        values, uncertainties, header = cls._paths(path)
+        with open(header) as file:
+            unit = Unit(json.load(file))
+        ml = MeasurementList._new(
+            np.lib.format.open_memmap(values, mode=mode),
+            np.lib.format.open_memmap(uncertainties, mode=mode),
+            unit
+        )
+        ml.__class__ = cls
+        ml.path = path
+        return ml
+
+    @classmethod
+    def save(cls, ml : MeasurementList, path : str):
+        "Write a MeasurementList to `path` in chunks and return it as a mapped list."
+        mapped = cls.create(path, len(ml), ml.unit)
+        for chunk in mapped._chunks():
+            mapped._values[chunk] = ml._values[chunk]
+            mapped._uncertainties[chunk] = ml._uncertainties[chunk]
+        mapped.flush()
+        return mapped
+
+    def flush(self):
+        "Write any changes in memory to disk."
+        for array in (self._values, self._uncertainties):
+            if(isinstance(array,np.memmap)):
+                array.flush()
+
+    def _chunks(self):
+        return [ slice(start, min(start + self.chunksize, len(self))) for start in range(0, len(self), self.chunksize) ]
+
+    def map(self, func : Any, *operands, path : str = None):
+        """Evaluate `func(self, *operands)` chunk by chunk into a new mapped list at `path`.
+        MeasurementList operands are split into the same chunks, while Measurements and numbers are passed as they are."""
+        for obj in operands:
+            if(isinstance(obj,MeasurementList) and len(obj) != len(self)):
+                raise Exception(f"MeasurementList Error: Cannot combine two MeasurementLists with different lengths: {len(self)} =/= {len(obj)}.")
+        operands = (self,) + operands
+        result = None
+        for chunk in self._chunks() or [slice(0, 0)]:
+            # The same list appearing twice is the same chunk, keeping correlations within the operation
+            chunks = {}
+            for obj in operands:
+                if(isinstance(obj,MeasurementList) and id(obj) not in chunks):
+                    chunks[id(obj)] = MeasurementList._new(obj._values[chunk], obj._uncertainties[chunk], obj.unit)
+            evaluated = func(*[ chunks.get(id(obj), obj) for obj in operands ])
+            if(not isinstance(evaluated,MeasurementList)):
+                return NotImplemented
+            if(result is None):
+                result = MappedMeasurementList.create(path or tempfile.mkdtemp(dir=MappedMeasurementList.directory), len(self), evaluated.unit)
+                if(path is None):
+                    weakref.finalize(result, shutil.rmtree, result.path, ignore_errors=True)
+            result._values[chunk] = evaluated._values
+            result._uncertainties[chunk] = evaluated._uncertainties
+        result.flush()
+        return result
+
+    def __add__(self,obj):
+        return self.map(operator.add, obj)
+
+    def __radd__(self,obj):
+        return self.map(lambda x, obj: obj + x, obj)
+
+    def __neg__(self):
+        return self.map(operator.neg)
+
+    def __abs__(self):
+        return self.map(operator.abs)
+
+    def __sub__(self,obj):
+        return self.map(operator.sub, obj)
+
+    def __rsub__(self,obj):
+        return self.map(lambda x, obj: obj - x, obj)
+
+    def __mul__(self,obj):
+        return self.map(operator.mul, obj)
+
+    def __rmul__(self,obj):
+        return self.map(lambda x, obj: obj * x, obj)
+
+    def __truediv__(self,obj):
+        return self.map(operator.truediv, obj)
+
+    def __rtruediv__(self,obj):
+        return self.map(lambda x, obj: obj / x, obj)
+
+    def __pow__(self,obj):
+        return self.map(operator.pow, obj)
+
+    def __rpow__(self,obj):
+        return self.map(lambda x, obj: obj ** x, obj)
+
+    def to(self, unit : Union[str,Unit]):
+        "Convert the units of all measurements, chunk by chunk."
+        return self.map(MeasurementList.to, unit)
+
+    def _elementwise(self, func, derivative):
+        "Functions such as `MeasurementList.sin`, chunk by chunk."
+        return self.map(MeasurementList._elementwise, func, derivative)
+
+    def __getitem__(self, item):
+        "Slices are mapped views of the same files, while elements, masks and index arrays are read into memory."
+        if(isinstance(item,slice)):
+            view = MeasurementList._new(self._values[item], self._uncertainties[item], self.unit)
+            view.__class__ = MappedMeasurementList
+            view.path = self.path
+            return view
+        return super().__getitem__(item)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        "Evaluate NumPy ufuncs chunk by chunk."
+        if(method != '__call__' or kwargs):
+            return NotImplemented
+        if(len(inputs) == 1 and ufunc in ufuncs.unary):
+            return self.map(ufunc)
+        return super().__array_ufunc__(ufunc, method, *inputs, **kwargs)
+
+    def statistics(self):
+        "Single pass, mergeable `Statistics` of the list, read chunk by chunk."
+        statistics = Statistics(self.unit)
+        for chunk in self._chunks():
+            statistics.update(MeasurementList._new(self._values[chunk], self._uncertainties[chunk], self.unit))
+        return statistics
+
+    def sum(self):
+        "Sum of all measurements in the list, with their uncertainties added in quadrature."
+        return self.statistics().sum()
+
+    def mean(self):
+        "Unweighted mean of the measurements in the list."
+        return self.statistics().mean()
+
+    def weighted_mean(self):
+        "Inverse-variance weighted mean of the measurements in the list."
+        return self.statistics().weighted_mean()
+
+    def std(self, ddof : int = 1):
+        "Sample standard deviation of the values in the list. `ddof` is subtracted from the number of values as in NumPy."
+        return self.statistics().std(ddof)
+
+    def sem(self):
+        "Standard error of the mean estimated from the scatter of the values in the list."
+        return self.statistics().sem()
@@ -0,0 +1,187 @@
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Union
+
+import numpy as np
+from scipy.special import ndtri
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement
+from labtex.measurementlist import MeasurementList, _conversionfactor
+from labtex.dual import Dual
+from labtex import tracking
+
+class MonteCarlo:
+    """Monte Carlo uncertainty propagation of Measurements and MeasurementLists through a function.
+    Each independent input is sampled from a normal distribution, `func` is evaluated on whole blocks of samples
+    and the result is summarised by its mean, standard deviation and percentiles. For example,
+    >>> x = Measurement(0.1, 0.05, "")
+    >>> mc = MonteCarlo(lambda x: np.log(x), x, samples=100000, seed=1)
+    >>> mc.result # mean ± standard deviation
+
+    Inputs are sampled from the independent inputs they are derived from, so correlated inputs stay correlated,
+    e.g. `MonteCarlo(lambda a, b: a - b, x, x)` is exact. `func` receives the samples in the units of the inputs
+    and may use arithmetic and NumPy ufuncs, which combine units and prefixes as they do for Measurements and give
+    the unit of the result. With `unit`, the result is converted to it. Samples for which `func` is undefined are discarded and counted in `discarded`;
+    if more than a fraction `tolerance` of the samples of a result are discarded, `nonfinite` chooses whether to
+    "warn", "raise" or "ignore".
+    List elements are processed in chunks of at most `chunksize` evaluated values, which can be spread across
+    `processes` worker processes (this requires `func` to be picklable, i.e. not a lambda). Results are reproducible
+    for a given `seed` regardless of the number of processes.
+    """
+    def __init__(self, func : Any, *inputs : Union[Measurement,MeasurementList], samples : int = 10000,
+        seed : int = None, percentiles : Iterable[float] = (2.5, 50, 97.5), unit : Union[Unit,str] = None,
+        chunksize : int = 10**7, processes : int = None, tolerance : float = 0.01, nonfinite : str = "warn"):
+        self.func = func
+        self.inputs = inputs
+        self.samples = samples
+
+        if(not all(isinstance(x,(Measurement,MeasurementList)) for x in inputs)):
+            raise Exception("MonteCarlo Error: Inputs must be Measurements or MeasurementLists.")
+        lengths = { len(x) for x in inputs if isinstance(x,MeasurementList) }
+        if(len(lengths) > 1):
+            raise Exception(f"MonteCarlo Error: MeasurementList inputs must have the same length. Lengths: {lengths}")
+        if(nonfinite not in ("warn", "raise", "ignore")):
+            raise Exception(f"MonteCarlo Error: nonfinite must be \"warn\", \"raise\" or \"ignore\", not {nonfinite!r}.")
+        length = lengths.pop() if lengths else None
+
+        # Draws of the inputs shared by whole inputs, and keys of the streams of the inputs of each list
+        entropy = np.random.SeedSequence(seed).entropy
+        streams, shared, columns = {}, {}, []
+        def stream(key):
+            if(key not in streams):
+                streams[key] = tuple(np.random.SeedSequence(entropy, spawn_key=(1, len(streams))).generate_state(2, np.uint64).tolist())
+            return streams[key]
+        for x in inputs:
+            if(isinstance(x,MeasurementList)):
+                components, elements = x._tracked()
+                sharedterms = [ (key, np.broadcast_to(contribution, length)) for key, contribution in components.items() ]
+                entries = [
+                    (stream(key), tracking.positions(start, step, (length,)), np.broadcast_to(contribution, length))
+                    for (key, start, step), contribution in elements.items()
+                ]
+                columns.append((x._values, sharedterms, entries, x.unit))
+            else:
+                sharedterms = tracking.shared(x.components)
+                columns.append((x.value, sharedterms, [], x.unit))
+            for key, _ in sharedterms:
+                shared.setdefault(key, key if isinstance(key,tracking.Projection) else None)
+        draws = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(0,))).standard_normal((samples, len(shared)))
+        # A projection of a list is drawn from the same inputs as its elements
+        block = max(1, chunksize // samples)
+        for j, projection in enumerate(shared.values()):
+            if(projection is not None):
+                key = stream(projection.key)
+                draws[:, j] = sum(
+                    _normals(key, projection.positions[start:start + block], samples) @ projection.weights[start:start + block]
+                    for start in range(0, len(projection.positions), block)
+                )
+        index = { key: j for j, key in enumerate(shared) }
+        columns = [ (value, [ (index[key], contribution) for key, contribution in sharedterms ], entries, inputunit) for value, sharedterms, entries, inputunit in columns ]
+
+        width = max(1, chunksize // samples)
+        bounds = [(start, min(start + width, length)) for start in range(0, length, width)] if length is not None else [(None, None)]
+        percentiles = list(percentiles)
+        tasks = [
+            (func, [ _chunk(entry, start, stop) for entry in columns ], draws, samples, percentiles)
+            for start, stop in bounds
+        ]
+
+        if(processes is not None and len(tasks) > 1):
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                chunks = list(pool.map(_evaluate, *zip(*tasks)))
+        else:
+            chunks = [_evaluate(*task) for task in tasks]
+
+        resultunit = chunks[0][3]
+        if(unit is None):
+            self.unit, factor = resultunit, 1
+        else:
+            self.unit = unit if isinstance(unit,Unit) else Unit(unit)
+            try:
+                factor = _conversionfactor(resultunit, self.unit)
+            except Exception as error:
+                raise Exception(f"MonteCarlo Error: The result, in {resultunit}, cannot be given in {self.unit} ({error}).")
+        mean = np.concatenate([chunk[0] for chunk in chunks]) * factor
+        std = np.concatenate([chunk[1] for chunk in chunks]) * factor
+        quantiles = np.concatenate([chunk[2] for chunk in chunks], axis=1) * factor
+        discarded = np.concatenate([chunk[4] for chunk in chunks])
+        self.discarded = discarded[0].item() if length is None else discarded
+
+        if(nonfinite != "ignore" and discarded.max() > tolerance * samples):
+            message = f"MonteCarlo Error: {discarded.max()} of {samples} samples of the result are not finite and were discarded."
+            if(nonfinite == "raise"):
+                raise Exception(message)
+            warnings.warn(message, RuntimeWarning)
+
+        if(length is None):
+            self.result = Measurement(mean[0].item(), std[0].item(), self.unit)
+            self.percentiles = { q: Measurement(quantiles[i][0].item(), 0, self.unit) for i, q in enumerate(percentiles) }
+        else:
+            self.result = MeasurementList._new(mean, std, self.unit)
+            self.percentiles = { q: MeasurementList._new(quantiles[i], np.zeros(length), self.unit) for i, q in enumerate(percentiles) }
+
+    def __repr__(self):
+        return f"Result: {self.result}\n" + "\n".join(f"{q}th percentile: {value}" for q, value in self.percentiles.items())
+
+def _chunk(column, start, stop):
+    "The elements `start` to `stop` of an input's value, contributions and input positions. Measurements are broadcast across chunks."
+    value, sharedterms, entries, unit = column
+    if(not np.ndim(value)):
+        return column
+    return (
+        value[start:stop],
+        [ (j, contribution[start:stop]) for j, contribution in sharedterms ],
+        [ (key, positions[start:stop], contribution[start:stop]) for key, positions, contribution in entries ],
+        unit
+    )
+
+def _normals(key : tuple, positions : np.ndarray, samples : int):
+    """Standard normal draws of the inputs of a list at `positions`, of shape (samples, len(positions)).
+    Each position reads its own stretch of a counter based Philox stream keyed by the list,
+    so its draws are the same whichever chunk or process asks for them."""
+    unique, index = np.unique(positions, return_inverse=True)
+    draws = np.empty((len(unique), samples))
+    # Runs of nearby positions are read from the stream together
+    for run in np.split(np.arange(len(unique)), np.flatnonzero(np.diff(unique) > 16) + 1):
+        first, last = int(unique[run[0]]), int(unique[run[-1]])
+        generator = np.random.Philox(key=key)
+        blocks, remainder = divmod(first * samples, 4)
+        generator.advance(blocks)
+        generator.random_raw(remainder)
+        raw = generator.random_raw((last - first + 1) * samples).reshape(last - first + 1, samples)
+        draws[run] = ndtri(((raw[unique[run] - first] >> np.uint64(11)) + 0.5) * 2.0**-53)
+    return draws[index.ravel()].T
+
+def _evaluate(func, columns, draws, samples, percentiles):
+    """Evaluate one chunk: sample every input from its shared draws and the draws of the list inputs it depends on,
+    apply func and reduce along the sample axis. Also returns the unit of the result and the number of discarded samples."""
+    width = max([ len(value) for value, _, _, _ in columns if np.ndim(value) ], default=1)
+    # Positions of each list drawn once for all the inputs depending on them
+    positions = {}
+    for _, _, entries, _ in columns:
+        for key, inputs, _ in entries:
+            positions.setdefault(key, []).append(inputs)
+    normals = {}
+    for key, inputs in positions.items():
+        unique = np.unique(np.concatenate(inputs))
+        normals[key] = (unique, _normals(key, unique, samples))
+    duals = []
+    for value, sharedterms, entries, unit in columns:
+        sampled = np.broadcast_to(value, (1, np.size(value))).astype(float)
+        for j, contribution in sharedterms:
+            sampled = sampled + draws[:, j, None] * contribution
+        for key, inputs, contribution in entries:
+            unique, normal = normals[key]
+            sampled = sampled + normal[:, np.searchsorted(unique, inputs)] * contribution
+        # Samples carry units without tangents, so they combine like Measurements at no cost in derivatives
+        duals.append(Dual(np.broadcast_to(sampled, (samples, sampled.shape[1])), np.zeros((0, 1, 1)), unit))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = func(*duals)
+    unit = result.unit if isinstance(result,Dual) else Unit("")
+    result = np.broadcast_to(np.asarray(result.value if isinstance(result,Dual) else result, dtype=float), (samples, width))
+    # Samples outside the domain of func (e.g. log of a negative draw) are discarded
+    finite = np.isfinite(result)
+    result = np.where(finite, result, np.nan)
+    discarded = samples - np.count_nonzero(finite, axis=0)
+    return np.nanmean(result, axis=0), np.nanstd(result, axis=0, ddof=1), np.nanpercentile(result, percentiles, axis=0), unit, discarded
@@ -4,8 +4,9 @@ from labtex.measurementlist import MeasurementList
 
 import matplotlib.pyplot as plt 
 from matplotlib.axes import Axes
+import numpy as np
 from numpy import linspace
-from scipy.optimize import curve_fit
+from scipy.optimize import curve_fit, least_squares
 
 plt.style.use('seaborn-muted')
 # seaborn-whitegrid
@@ -36,15 +37,43 @@ plt.rcParams.update({
     "errorbar.capsize": 3,
 })
 
+def _slopes(func : Any, x, params):
+    "Derivatives of `func` with respect to x at every point, exact with dual numbers or by central differences if `func` does not support them."
+    from labtex.dual import Dual
+    try:
+        slopes = func(Dual(x, np.ones_like(x)), *params).tangent
+    except Exception:
+        h = 1e-6 * (np.abs(x) + 1e-3)
+        slopes = (func(x + h, *params) - func(x - h, *params)) / (2 * h)
+    return np.broadcast_to(slopes, x.shape)
+
+def _curvefit(func : Any, x : np.ndarray, y : np.ndarray, xerr : np.ndarray, yerr : np.ndarray, p0 = None, odr : bool = False):
+    "Optimal parameters and their covariance for arrays of values and uncertainties, by curve_fit and, with `odr`, effective variances."
+    sigma = yerr if (yerr != 0).all() else None
+    popt, pcov = curve_fit(func, x, y, sigma=sigma, p0=p0, absolute_sigma=True)
+    if(odr):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        xvariance, yvariance = np.asarray(xerr)**2, np.asarray(yerr)**2
+        def residuals(params):
+            variance = yvariance + _slopes(func, x, params)**2 * xvariance
+            if(not variance.all()):
+                raise Exception("NonlinearRegression Error: Orthogonal distance regression needs every point to have an uncertainty in x or y.")
+            return (y - func(x, *params)) / np.sqrt(variance)
+        result = least_squares(residuals, popt, method='lm')
+        popt, pcov = result.x, np.linalg.pinv(result.jac.T @ result.jac)
+    return popt, pcov
+
 class NonlinearRegression:
-    "Curve fit two MeasurementLists to a function."
-    def __init__(self,func : Any,x : MeasurementList, y : MeasurementList, init_params : list = None):
+    """Curve fit two MeasurementLists to a function.
+    With `odr`, the uncertainties of x are included by minimising the effective variance residuals
+    `(y - f(x)) / sqrt(dy**2 + (f'(x) * dx)**2)`, the orthogonal distances to the curve to first order.
+    This starts from the ordinary fit, and for a straight line it gives the same line as York's method."""
+    def __init__(self,func : Any,x : MeasurementList, y : MeasurementList, init_params : list = None, odr : bool = False):
         self.func = func
         self.x = x
         self.y = y
-        sigma = self.y.uncertainties() if all([i != 0 for i in self.y.uncertainties()]) else None
-
-        popt, pcov = curve_fit(func, self.x.values(), self.y.values(), sigma=sigma, p0=init_params or None, absolute_sigma=True)
+        self.odr = odr
+        popt, pcov = _curvefit(func, self.x.values(), self.y.values(), self.x.uncertainties(), self.y.uncertainties(), init_params or None, odr)
         self.optimal_params = popt
         self.param_uncertainties = [pcov[i][i]**0.5 for i in range(len(popt))]
         # return [ (popt[i], pcov[i][i]**0.5) for i in range(len(popt)) ]
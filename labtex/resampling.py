@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union
+
+import numpy as np
+from scipy.stats import norm
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement
+from labtex.linear import LinearRegression, _linearfit, _yorkfit
+from labtex.nonlinear import NonlinearRegression, _curvefit
+from labtex.leastsquares import LeastSquares, _solve
+
+class Bootstrap:
+    """Bootstrap estimate of the uncertainties of the parameters of a fit, from refits to resampled points.
+    For example,
+    >>> bootstrap = Bootstrap(LinearRegression(x, y), replicates=10000, seed=1)
+    >>> bootstrap.params["m"]     # fitted slope ± standard deviation over the replicates
+    >>> bootstrap.intervals["m"]  # percentile confidence interval
+    >>> bootstrap.samples["m"]    # slope of every replicate
+
+    Works with LinearRegression, NonlinearRegression (whose parameters are numbered) and LeastSquares.
+    The points are drawn with replacement, with all index sets of a chunk of at most `chunksize` resampled points
+    generated at once. Fits are refitted from their arrays without building MeasurementLists: straight lines
+    for a whole chunk in one vectorised call and curve fits one at a time, starting from the original parameters.
+    Chunks can be spread across `processes` worker processes (for a NonlinearRegression this requires its function
+    to be picklable, i.e. not a lambda). Results are reproducible for a given `seed` regardless of the number of processes.
+    Replicates whose fit fails are discarded.
+    """
+    _resamples = True
+
+    def __init__(self, fit : Union[LinearRegression,NonlinearRegression,LeastSquares], replicates : int = 1000,
+        seed : int = None, confidence : float = 0.95, chunksize : int = 10**7, processes : int = None):
+        self.fit = fit
+        self.confidence = confidence
+        kernel, arrays, n, self._estimates, self._units = _kernel(fit)
+
+        # Chunks of replicates covering at most `chunksize` resampled points, each with its own seed
+        count, width = replicates if self._resamples else n, max(1, chunksize // n)
+        bounds = [ (start, min(start + width, count)) for start in range(0, count, width) ]
+        seeds = np.random.SeedSequence(seed).spawn(len(bounds)) if self._resamples else [None] * len(bounds)
+        tasks = [ (kernel, arrays, n, start, stop, chunkseed) for (start, stop), chunkseed in zip(bounds, seeds) ]
+        if(processes is not None and len(tasks) > 1):
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                chunks = list(pool.map(_refit, *zip(*tasks)))
+        else:
+            chunks = [_refit(*task) for task in tasks]
+        samples = np.concatenate(chunks)
+        samples = samples[np.all(np.isfinite(samples), axis=1)]
+        if(len(samples) < 2):
+            raise Exception(f"{type(self).__name__} Error: Fewer than 2 replicates could be fitted.")
+        self.replicates = len(samples)
+        self.samples = { name: samples[:, j] for j, name in enumerate(self._estimates) }
+        self.params, self.intervals = {}, {}
+        for name, estimate in self._estimates.items():
+            uncertainty, (lower, upper) = self._summarise(self.samples[name], estimate)
+            unit = self._units[name]
+            self.params[name] = Measurement(estimate, uncertainty, unit)
+            self.intervals[name] = (Measurement(lower, 0, unit), Measurement(upper, 0, unit))
+
+    def _summarise(self, samples : np.ndarray, estimate : float):
+        "Standard error and percentile confidence interval from the replicates."
+        tail = 50 * (1 - self.confidence)
+        return np.std(samples, ddof=1).item(), tuple(np.percentile(samples, [tail, 100 - tail]).tolist())
+
+    def __repr__(self):
+        return "\n".join(
+            f"{name} = {param}, {100 * self.confidence:g}% interval [{lower.value:.4g}, {upper.value:.4g}]"
+            for (name, param), (lower, upper) in zip(self.params.items(), self.intervals.values())
+        )
+
+class Jackknife(Bootstrap):
+    """Jackknife estimate of the uncertainties of the parameters of a fit, from refits leaving out each point in turn:
+    >>> jackknife = Jackknife(LinearRegression(x, y))
+    >>> jackknife.params["m"]
+
+    The uncertainty is the jackknife standard error and the confidence interval is normal about the fitted value.
+    Chunking and processes are as for Bootstrap, and there is no randomness to seed."""
+    _resamples = False
+
+    def __init__(self, fit : Union[LinearRegression,NonlinearRegression,LeastSquares], confidence : float = 0.95,
+        chunksize : int = 10**7, processes : int = None):
+        super().__init__(fit, confidence=confidence, chunksize=chunksize, processes=processes)
+
+    def _summarise(self, samples : np.ndarray, estimate : float):
+        "Jackknife standard error and normal confidence interval about the fitted value."
+        n = len(samples)
+        error = np.sqrt((n - 1) / n * np.sum((samples - np.mean(samples))**2)).item()
+        z = norm.ppf(0.5 + self.confidence / 2)
+        return error, (estimate - z * error, estimate + z * error)
+
+def _kernel(fit):
+    "Function refitting index sets of points, its arrays, the number of points, the fitted parameters by name and their units."
+    if(isinstance(fit,LinearRegression)):
+        arrays = (fit.x.values(), fit.y.values(), fit.x.uncertainties(), fit.y.uncertainties(), fit.odr)
+        return _refitlines, arrays, len(fit.x), { name: param.value for name, param in fit.lobf.items() }, { name: param.unit for name, param in fit.lobf.items() }
+    if(isinstance(fit,NonlinearRegression)):
+        arrays = (fit.func, fit.x.values(), fit.y.values(), fit.x.uncertainties(), fit.y.uncertainties(), fit.optimal_params, fit.odr)
+        return _refitcurves, arrays, len(fit.x), dict(enumerate(fit.optimal_params.tolist())), { i: Unit("") for i in range(len(fit.optimal_params)) }
+    if(isinstance(fit,LeastSquares)):
+        return _refitlstsq, fit._weighted, len(fit.y), { name: param.value for name, param in fit.params.items() }, { name: param.unit for name, param in fit.params.items() }
+    raise Exception(f"Resampling Error: Cannot resample a {type(fit).__name__}. Use LinearRegression, NonlinearRegression or LeastSquares.")
+
+def _refit(kernel, arrays, n, start, stop, seed):
+    """Refit replicates `start` to `stop`: bootstrap index sets all drawn at once from `seed`,
+    or without a seed, the jackknife index sets leaving out each of those points."""
+    if(seed is not None):
+        indices = np.random.default_rng(seed).integers(0, n, (stop - start, n))
+    else:
+        # Row i counts through the points, skipping point start + i
+        indices = np.arange(n - 1) + (np.arange(n - 1) >= np.arange(start, stop)[:, None])
+    return kernel(*arrays, indices)
+
+def _refitlines(x, y, xerr, yerr, odr, indices):
+    "Slopes and intercepts of every index set at once."
+    x, y, xerr, yerr = (np.broadcast_to(a, (len(x),))[indices] for a in (x, y, xerr, yerr))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        m, c, _, _, _ = _yorkfit(x, y, xerr**2, yerr**2) if odr else _linearfit(x, y, 1 / yerr**2)
+    return np.column_stack([m, c])
+
+def _refitcurves(func, x, y, xerr, yerr, p0, odr, indices):
+    "Optimal parameters of every index set, starting from those of the original fit."
+    params = np.full((len(indices), len(p0)), np.nan)
+    for i, index in enumerate(indices):
+        try:
+            params[i] = _curvefit(func, x[index], y[index], xerr[index], yerr[index], p0, odr)[0]
+        except Exception:
+            pass
+    return params
+
+def _refitlstsq(A, b, indices):
+    "Least squares parameters of every index set."
+    params = np.full((len(indices), A.shape[1]), np.nan)
+    for i, index in enumerate(indices):
+        try:
+            params[i] = _solve(A[index], b[index])[0]
+        except Exception:
+            pass
+    return params
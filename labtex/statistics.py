@@ -0,0 +1,98 @@
+import math
+from typing import Union
+
+import numpy as np
+
+from labtex.unit import Unit
+from labtex.measurement import Measurement
+from labtex.measurementlist import MeasurementList, _conversionfactor
+
+class Statistics:
+    """Single pass summary of a stream of measurements that can be merged across chunks and processes.
+    For example, summarising a list read in two halves:
+    >>> statistics = Statistics("cm").update(ml[:100]).update(ml[100:])
+    >>> statistics.mean(), statistics.std()
+
+    Counts, means and sums of squared deviations are combined with the pairwise update of Welford and Chan et al.,
+    so no chunk needs to be revisited and the result does not suffer from cancellation.
+    Measurements in the stream are treated as independent.
+    """
+    def __init__(self, unit : Union[Unit,str] = ""):
+        self.unit = unit if isinstance(unit,Unit) else Unit(unit)
+        self.count = 0
+        # Mean and sum of squared deviations of the values
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Sum of the variances, and the total inverse-variance weight with its weighted mean
+        self._variance = 0.0
+        self._weight = 0.0
+        self._weightedmean = 0.0
+
+    def __repr__(self):
+        return f"Statistics of {self.count} measurements: mean {self.mean()}, standard deviation {self.std()}"
+
+    def update(self, ml : MeasurementList):
+        "Add a MeasurementList (e.g. a chunk of a larger list) to the summary. Returns the summary."
+        factor = 1 if ml.unit == self.unit else _conversionfactor(ml.unit, self.unit)
+        values = np.asarray(ml._values) * factor
+        uncertainties = np.asarray(ml._uncertainties) * factor
+        if(len(values) == 0):
+            return self
+        chunk = Statistics(self.unit)
+        chunk.count = len(values)
+        chunk._mean = np.mean(values).item()
+        chunk._m2 = np.sum((values - chunk._mean)**2).item()
+        chunk._variance = np.sum(uncertainties**2).item()
+        weights = 1 / uncertainties**2
+        chunk._weight = np.sum(weights).item()
+        chunk._weightedmean = (np.sum(weights * values) / chunk._weight).item()
+        self._merge(chunk)
+        return self
+
+    def merge(self, other):
+        "Combined summary of two disjoint streams."
+        merged = Statistics(self.unit)
+        merged._merge(self)
+        merged._merge(other)
+        return merged
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def _merge(self, other):
+        if(other.count == 0):
+            return
+        if(other.unit != self.unit):
+            raise Exception(f"Statistics Error: Cannot merge summaries in {self.unit} and {other.unit}.")
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._mean += delta * other.count / count
+        self._m2 += other._m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self._variance += other._variance
+        weight = self._weight + other._weight
+        if(weight != 0):
+            self._weightedmean += (other._weightedmean - self._weightedmean) * other._weight / weight
+        self._weight = weight
+
+    def sum(self):
+        "Sum of the measurements, with their uncertainties added in quadrature."
+        return Measurement(self._mean * self.count, math.sqrt(self._variance), self.unit)
+
+    def mean(self):
+        "Unweighted mean of the measurements."
+        return Measurement(self._mean, math.sqrt(self._variance) / self.count, self.unit)
+
+    def weighted_mean(self):
+        "Inverse-variance weighted mean of the measurements."
+        return Measurement(self._weightedmean, 1 / math.sqrt(self._weight), self.unit)
+
+    def std(self, ddof : int = 1):
+        """Sample standard deviation of the values, with the standard error of that estimate as its uncertainty.
+        `ddof` is subtracted from the number of values as in NumPy."""
+        std = math.sqrt(self._m2 / (self.count - ddof))
+        return Measurement(std, std / math.sqrt(2 * (self.count - 1)), self.unit)
+
+    def sem(self):
+        "Standard error of the mean estimated from the scatter of the values."
+        return self.std() / math.sqrt(self.count)
@@ -0,0 +1,210 @@
+import hashlib
+from numbers import Number
+
+import numpy as np
+
+# Elementwise inputs shared by MeasurementList and MeasurementArray.
+# An elementwise key (key, start, step) makes each element depend on one input of the list or array `key`:
+# at position `start + index · step` for views, with `step` the strides of an array,
+# or at the position given by an explicit index map (key, Positions, None) for other selections.
+
+class Positions:
+    """Index map giving the position of the input each element depends on, for selections that are not strided
+    such as index arrays and masks. Equal index maps compare and hash equal, so equal selections share a key."""
+    __slots__ = ('array', '_hash')
+
+    def __init__(self, array : np.ndarray):
+        array = np.array(array, dtype=np.int64)
+        array.flags.writeable = False
+        self.array = array
+        self._hash = hash((array.shape, hashlib.sha1(array.tobytes()).digest()))
+
+    def __eq__(self, obj):
+        return isinstance(obj,Positions) and self._hash == obj._hash and np.array_equal(self.array, obj.array)
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Positions({self._hash:x})"
+
+def positions(start, step, shape : tuple):
+    "Position of the input of each element of `shape` for an elementwise key (start, step)."
+    if(isinstance(start,Positions)):
+        return np.broadcast_to(start.array, shape)
+    steps = step if isinstance(step,tuple) else (step,)
+    grid = np.asarray(start, dtype=np.int64)
+    for axis, (n, stride) in enumerate(zip(shape, steps)):
+        grid = grid + stride * np.arange(n).reshape((n,) + (1,) * (len(shape) - axis - 1))
+    return np.broadcast_to(grid, shape)
+
+def indexmap(array : np.ndarray):
+    """The (start, step) of an elementwise key with the given positions: strides when they are evenly spaced
+    along every axis, so that the elements stay identified with those of views, or an explicit index map."""
+    array = np.asarray(array, dtype=np.int64)
+    if(array.size == 0):
+        return 0, (0,) * array.ndim
+    origin = (0,) * array.ndim
+    start = int(array[origin])
+    strides = tuple(
+        int(array[origin[:axis] + (1,) + origin[axis + 1:]]) - start if n > 1 else 0
+        for axis, n in enumerate(array.shape)
+    )
+    if(np.array_equal(positions(start, strides, array.shape), array)):
+        return start, strides
+    return Positions(array), None
+
+class Projection:
+    """Contributions of several inputs of one list or array to a Measurement, e.g. a sum of its elements,
+    as a sparse vector over their positions. Measurements propagate it like the contribution of a single input:
+    projections of the same list add, numbers scale them and the product of two is their dot product,
+    so a sum stays exactly correlated with the elements it adds up. Lists and arrays depending on a projection
+    use it as the key of a shared input, contributing `contribution · projection` to each element."""
+    __slots__ = ('key', 'positions', 'weights')
+    # NumPy scalars defer to the operators below instead of making object arrays
+    __array_ufunc__ = None
+
+    def __init__(self, key, positions : np.ndarray, weights : np.ndarray):
+        "Projection onto sorted, distinct positions."
+        self.key = key
+        self.positions = positions
+        self.weights = weights
+
+    @staticmethod
+    def of(key, positions : np.ndarray, weights : np.ndarray):
+        "Projection adding up the weights at each position."
+        positions = np.asarray(positions, dtype=np.int64)
+        weights = np.broadcast_to(np.asarray(weights, dtype=float), positions.shape).ravel()
+        positions = positions.ravel()
+        if(len(positions) > 1 and not np.all(positions[1:] > positions[:-1])):
+            positions, index = np.unique(positions, return_inverse=True)
+            weights = np.bincount(index.ravel(), weights=weights, minlength=len(positions))
+        return Projection(key, positions, weights)
+
+    def __add__(self, obj):
+        if(isinstance(obj,Projection)):
+            if(obj.positions is self.positions):
+                return Projection(self.key, self.positions, self.weights + obj.weights)
+            return Projection.of(self.key, np.concatenate((self.positions, obj.positions)), np.concatenate((self.weights, obj.weights)))
+        if(isinstance(obj,Number) and obj == 0):
+            return self
+        return NotImplemented
+
+    def __radd__(self, obj):
+        return self.__add__(obj)
+
+    def __mul__(self, obj):
+        if(isinstance(obj,Projection)):
+            return self.dot(obj)
+        if(isinstance(obj,Number) or (isinstance(obj,np.ndarray) and obj.ndim == 0)):
+            return Projection(self.key, self.positions, self.weights * float(obj))
+        return NotImplemented
+
+    def __rmul__(self, obj):
+        return self.__mul__(obj)
+
+    def __neg__(self):
+        return self * -1
+
+    def __pow__(self, power):
+        return self.dot(self) if power == 2 else NotImplemented
+
+    def dot(self, obj):
+        "Sum of the products of the weights at the positions of both projections."
+        if(obj.positions is self.positions):
+            return float(self.weights @ obj.weights)
+        _, i, j = np.intersect1d(self.positions, obj.positions, assume_unique=True, return_indices=True)
+        return float(self.weights[i] @ obj.weights[j])
+
+    def at(self, positions : np.ndarray):
+        "Weights at each of the given positions, zero for those not in the projection."
+        index = np.clip(np.searchsorted(self.positions, positions), 0, max(len(self.positions) - 1, 0))
+        return np.where(self.positions[index] == positions, self.weights[index], 0) if len(self.positions) else np.zeros(np.shape(positions))
+
+def combine(measurement : dict, key, contribution : float):
+    "Add the contribution of an input shared by a list or array (keyed by a projection or otherwise) to the components of a Measurement."
+    if(isinstance(key,Projection)):
+        key, contribution = key.key, contribution * key
+    measurement[key] = measurement.get(key, 0) + contribution
+
+def element(key, position : int, contribution : float):
+    "Component of a Measurement taken from the element of a list or array depending on the input at `position`."
+    return Projection(key, np.array([position], dtype=np.int64), np.array([contribution], dtype=float))
+
+def shared(components : dict):
+    "(key, contribution) pairs of a Measurement's components as inputs shared by a list or array, keying projections by themselves."
+    return [ (component, 1.0) if isinstance(component,Projection) else (key, component) for key, component in components.items() ]
+
+def groups(components : dict, elements : dict):
+    """Shared inputs that are independent of every other component, and for each list or array the entries
+    (start, step, contribution) of its elementwise keys and the (projection, contribution) pairs of its projections."""
+    independent, bases = {}, {}
+    for key, contribution in components.items():
+        if(isinstance(key,Projection)):
+            bases.setdefault(key.key, ([], []))[1].append((key, contribution))
+        else:
+            independent[key] = contribution
+    for (key, start, step), contribution in elements.items():
+        bases.setdefault(key, ([], []))[0].append((start, step, contribution))
+    return independent, bases
+
+def summed(entries : list, shape : tuple):
+    """Contribution of each input to each element it affects, summed over elementwise entries that coincide:
+    arrays of the input positions, the (flat) indices of the elements and the contributions."""
+    size = int(np.prod(shape))
+    rows = np.tile(np.arange(size), len(entries))
+    inputs = np.concatenate([ positions(start, step, shape).ravel() for start, step, _ in entries ])
+    contributions = np.concatenate([ np.broadcast_to(contribution, shape).ravel() for _, _, contribution in entries ])
+    pairs, index = np.unique(inputs * size + rows, return_inverse=True)
+    return pairs // size, pairs % size, np.bincount(index.ravel(), weights=contributions, minlength=len(pairs))
+
+def projected(entries : list, projections : list, shape : tuple):
+    """Terms of the covariance of elements depending on projections of a list: the contribution A of each projection
+    to each element, the dot products H of the projections and the overlap X of each element's own inputs with them,
+    so the elements' vectors over the inputs are S + A Pᵀ with S Sᵀ from `summed`, S P = X and Pᵀ P = H."""
+    size = int(np.prod(shape))
+    A = np.column_stack([ np.broadcast_to(contribution, shape).ravel() for _, contribution in projections ]).reshape(size, len(projections))
+    if(all(projection.positions is projections[0][0].positions for projection, _ in projections)):
+        union = projections[0][0].positions
+        W = np.array([ projection.weights for projection, _ in projections ]).reshape(len(projections), len(union))
+    else:
+        union = np.unique(np.concatenate([ projection.positions for projection, _ in projections ]))
+        W = np.zeros((len(projections), len(union)))
+        for row, (projection, _) in zip(W, projections):
+            row[np.searchsorted(union, projection.positions)] = projection.weights
+    X = np.zeros((size, len(projections)))
+    for start, step, contribution in entries:
+        inputs = positions(start, step, shape).ravel()
+        index = np.clip(np.searchsorted(union, inputs), 0, max(len(union) - 1, 0))
+        found = union[index] == inputs if len(union) else np.zeros(size, dtype=bool)
+        X += (np.broadcast_to(contribution, shape).ravel() * found)[:, None] * W[:, index].T
+    return A, W @ W.T, X
+
+def variances(components : dict, elements : dict, shape : tuple):
+    """Variance of each element due to each independent shared input and to the inputs of each list or array,
+    keyed by the input or by the key of that list. Contributions of the same input to an element, e.g. through a list
+    and a reversed view of it, or through an element and a mean it is compared with, are summed before squaring."""
+    independent, bases = groups(components, elements)
+    result = { key: np.square(np.broadcast_to(contribution, shape)) for key, contribution in independent.items() }
+    size = int(np.prod(shape))
+    for key, (entries, projections) in bases.items():
+        if(len(entries) == 1):
+            variance = np.square(np.broadcast_to(entries[0][2], shape))
+        elif(entries):
+            _, rows, contributions = summed(entries, shape)
+            variance = np.bincount(rows, weights=contributions**2, minlength=size).reshape(shape)
+        else:
+            variance = np.zeros(shape)
+        if(projections):
+            A, H, X = projected(entries, projections, shape)
+            variance = variance + np.sum((2 * X + A @ H) * A, axis=-1).reshape(shape)
+        result[key] = variance
+    return result
+
+def variance(components : dict, elements : dict, shape : tuple):
+    "Variance of each element from its uncertainty components."
+    return sum(variances(components, elements, shape).values(), np.zeros(shape))
+
+def overlapping(components : dict, elements : dict):
+    "Whether any components may share inputs: projections, or several elementwise keys of the same list or array."
+    return len({ key for key, _, _ in elements }) != len(elements) or any(isinstance(key,Projection) for key in components)
@@ -0,0 +1,100 @@
+import operator
+import numpy as np
+
+from labtex.unit import Unit
+
+# NumPy ufunc support shared by Measurement and MeasurementList.
+# Elementwise functions propagate first order uncertainty through f'(x) over whole arrays at once.
+
+def dimensionless(unit : Unit):
+    "Unit rule for functions that only take in dimensionless quantities."
+    if(not Unit.unitless(unit)):
+        raise Exception(f"Transcendental functions take in dimensionless quantities. Input has units: {unit}")
+    return Unit("")
+
+def sameunit(unit : Unit):
+    return unit
+
+# ufunc: (derivative, unit rule)
+unary = {
+    np.negative: (lambda x: -np.ones_like(x), sameunit),
+    np.positive: (lambda x: np.ones_like(x), sameunit),
+    np.absolute: (np.sign, sameunit),
+    np.sqrt: (lambda x: 0.5 / np.sqrt(x), lambda unit: unit ** 0.5),
+    np.cbrt: (lambda x: 1 / (3 * np.cbrt(x)**2), lambda unit: unit ** (1/3)),
+    np.square: (lambda x: 2 * x, lambda unit: unit ** 2),
+    np.reciprocal: (lambda x: -1 / x**2, lambda unit: 1 / unit),
+    np.exp: (np.exp, dimensionless),
+    np.exp2: (lambda x: np.log(2) * np.exp2(x), dimensionless),
+    np.expm1: (np.exp, dimensionless),
+    np.log: (lambda x: 1 / x, dimensionless),
+    np.log2: (lambda x: 1 / (x * np.log(2)), dimensionless),
+    np.log10: (lambda x: 1 / (x * np.log(10)), dimensionless),
+    np.log1p: (lambda x: 1 / (1 + x), dimensionless),
+    np.sin: (np.cos, dimensionless),
+    np.cos: (lambda x: -np.sin(x), dimensionless),
+    np.tan: (lambda x: 1 / np.cos(x)**2, dimensionless),
+    np.arcsin: (lambda x: 1 / np.sqrt(1 - x**2), dimensionless),
+    np.arccos: (lambda x: -1 / np.sqrt(1 - x**2), dimensionless),
+    np.arctan: (lambda x: 1 / (1 + x**2), dimensionless),
+    np.sinh: (np.cosh, dimensionless),
+    np.cosh: (np.sinh, dimensionless),
+    np.tanh: (lambda x: 1 / np.cosh(x)**2, dimensionless),
+    np.arcsinh: (lambda x: 1 / np.sqrt(x**2 + 1), dimensionless),
+    np.arccosh: (lambda x: 1 / np.sqrt(x**2 - 1), dimensionless),
+    np.arctanh: (lambda x: 1 / (1 - x**2), dimensionless),
+    np.deg2rad: (lambda x: np.full_like(x, np.pi / 180), dimensionless),
+    np.rad2deg: (lambda x: np.full_like(x, 180 / np.pi), dimensionless),
+}
+
+# ufunc: operator, dispatched to the arithmetic of Measurement/MeasurementList
+binary = {
+    np.add: operator.add,
+    np.subtract: operator.sub,
+    np.multiply: operator.mul,
+    np.true_divide: operator.truediv,
+    np.power: operator.pow,
+}
+
+def apply(ufunc, values, unit : Unit):
+    """Apply a supported unary ufunc to measurement values.
+    Returns the result, its derivative and unit, or None if the ufunc is not supported."""
+    if(ufunc not in unary):
+        return None
+    derivative, unitrule = unary[ufunc]
+    unit = unitrule(unit)
+    values = np.asarray(values, dtype=float)
+    return ufunc(values), derivative(values), unit
+
+def operands(inputs):
+    """Prepare ufunc inputs for the Measurement/MeasurementList operators.
+    NumPy scalars become Python numbers so operators do not dispatch back to NumPy, and 1-D arrays or lists become
+    float arrays, exact constants in the units of the other operand like numbers. A Measurement combined with an array
+    is repeated to a MeasurementList of its length. Returns None for unsupported inputs."""
+    from labtex.measurement import Measurement
+    from labtex.measurementlist import MeasurementList, _propagatelist
+    prepared = []
+    for obj in inputs:
+        if(isinstance(obj,np.generic) or (isinstance(obj,np.ndarray) and obj.ndim == 0)):
+            obj = obj.item()
+        elif(isinstance(obj,(np.ndarray,list))):
+            if(np.ndim(obj) != 1):
+                return None
+            obj = np.asarray(obj, dtype=float)
+        prepared.append(obj)
+    lengths = [ len(obj) for obj in prepared if isinstance(obj,np.ndarray) ]
+    if(lengths):
+        prepared = [
+            MeasurementList._derived(np.full(lengths[0], float(obj.value)), *_propagatelist(lengths[0], (1, obj)), obj.unit)
+            if isinstance(obj,Measurement) else obj
+            for obj in prepared
+        ]
+    return prepared
+
+def call(ufunc, first, second):
+    """Apply a binary ufunc with the operators of its operands. An array as the first operand would dispatch
+    back to NumPy, so the reflected operator of the second is used instead."""
+    operation = binary[ufunc]
+    if(isinstance(first,np.ndarray)):
+        return getattr(second, f"__r{operation.__name__}__")(first)
+    return operation(first, second)
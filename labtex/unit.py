@@ -1,8 +1,16 @@
 import re
+from functools import lru_cache
+from types import MappingProxyType
+from weakref import WeakValueDictionary
 from numbers import Number
 from typing import Union
 import math
 
+class _Dimensions(dict):
+    "Units of a Unit by symbol. Symbols registered after the Unit was created have power 0."
+    def __missing__(self, symbol):
+        return MappingProxyType({'prefix':'', 'power':0})
+
 class Unit:
     "SI Unit taking in a string."
     # Not Supported: mol (moles), cd (candela)
@@ -24,6 +32,9 @@ class Unit:
     knownUnits = list(derivedUnits.keys())
     knownUnits += baseUnits
 
+    # Canonical instances keyed on (class, canonical key). Unused Units are dropped.
+    _interned = WeakValueDictionary()
+
     prefixes = {
     # 'a':1e-18,
     # 'f':1e-15,
@@ -42,18 +53,109 @@ class Unit:
     # 'E':1e18
     }
 
-    def __init__(self,unitString: Union[str,dict]):
-
-        # Given user string input, parse the units, prefixes and powers
+    def __new__(cls, unitString: Union[str,dict]):
+        # Given user string input, parse the units, prefixes and powers (cached per string)
         if(type(unitString) == str):
-            self.units = dict.fromkeys(Unit.knownUnits)
-            for unit in self.units:
-                self.units[unit] = {'prefix':'', 'power':0}
-            self.parse(unitString.replace('{','(').replace('}',')'))
-        
+            key = Unit._parsekey(unitString)
         # Used internally to construct a Unit from a dictionary of its units
         else:
-            self.units = unitString
+            key = Unit._key(unitString)
+        return cls._fromkey(key)
+
+    @classmethod
+    def _fromkey(cls, key: tuple):
+        "Equal units share one canonical (immutable) instance."
+        unit = Unit._interned.get((cls,key))
+        if unit is None:
+            unit = object.__new__(cls)
+            units = { symbol: {'prefix':'', 'power':0} for symbol in Unit.knownUnits }
+            for symbol, prefix, power in key:
+                units[symbol] = {'prefix': prefix, 'power': power}
+            object.__setattr__(unit, 'units', MappingProxyType(_Dimensions({ symbol: MappingProxyType(dim) for symbol, dim in units.items() })))
+            object.__setattr__(unit, '_key', key)
+            factor, dimensions = Unit._factorandvector(key)
+            object.__setattr__(unit, 'factor', factor)
+            object.__setattr__(unit, 'dimensions', dimensions)
+            Unit._interned[(cls,key)] = unit
+        return unit
+
+    def __setattr__(self, name, value):
+        raise AttributeError("labtex Unit Error: Units are immutable.")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), ({ symbol: dict(dim) for symbol, dim in self.units.items() },))
+
+    @staticmethod
+    def _key(units: dict):
+        "Canonical hashable form of a dictionary of units: (symbol, prefix, power) for each nonzero power."
+        key = []
+        for symbol in Unit.knownUnits:
+            if symbol in units and units[symbol]['power'] != 0:
+                power = units[symbol]['power']
+                power = int(power) if float(power).is_integer() else power
+                key.append((symbol, units[symbol]['prefix'], power))
+        return tuple(key)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parsekey(unitString: str):
+        "Parse a unit string into its canonical key. Cached until the registry changes."
+        unit = object.__new__(Unit)
+        object.__setattr__(unit, 'units', { symbol: {'prefix':'', 'power':0} for symbol in Unit.knownUnits })
+        unit.parse(unitString.replace('{','(').replace('}',')'))
+        return Unit._key(unit.units)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _derived(symbol: str):
+        "Scale factor to SI and base unit exponents of a derived unit. Computed once per symbol."
+        derived = Unit.derivedUnits[symbol]
+        factor, dimensions = Unit._factorandvector(Unit._parsekey(derived[0]))
+        return factor * (derived[1] if len(derived) == 2 else 1), dimensions
+
+    @staticmethod
+    def _factorandvector(key: tuple):
+        "Scale factor to SI and the exponent of each base unit for a canonical key."
+        factor = 1
+        dimensions = [0] * len(Unit.baseUnits)
+        for symbol, prefix, power in key:
+            factor *= Unit.prefixes[prefix] ** power
+            if symbol in Unit.derivedUnits:
+                derivedfactor, deriveddimensions = Unit._derived(symbol)
+                factor *= derivedfactor ** power
+                for index, derivedpower in enumerate(deriveddimensions):
+                    dimensions[index] += derivedpower * power
+            elif symbol in Unit.baseUnits:
+                dimensions[Unit.baseUnits.index(symbol)] += power
+        return factor, tuple(dimensions)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _patterns():
+        "Compile the prefix, unit and power regexes for the current registry."
+        # Match a prefix that is followed by a non-whitespace character
+        prefix = re.compile(f'([{"".join(prefix for prefix in Unit.prefixes.keys())}])\\B')
+        # Match a known unit
+        # Compiles to '([JVNWTmgsACK]|(?:Pa)|(?:Hz))' for default (base + derived) units
+        unit = re.compile(f"([{''.join([ unit_str if len(unit_str) == 1 else '' for unit_str in Unit.knownUnits])}]|{'|'.join([ ('(?:' + unit_str + ')') for unit_str in filter(lambda x: len(x) > 1, Unit.knownUnits) ])})")
+        # Match a '^' followed optionally by '-' and then digits, with a fractional part for powers such as m^0.5
+        power = re.compile(r'(\^)(\-?)(\d+(?:\.\d+)?)')
+        return prefix, unit, power
+
+    @staticmethod
+    def clearcache():
+        "Invalidate parsed and interned Units. Call after modifying `Unit.baseUnits`, `Unit.derivedUnits` or `Unit.prefixes` directly."
+        Unit._parsekey.cache_clear()
+        Unit._patterns.cache_clear()
+        Unit._derived.cache_clear()
+        Unit._algebra.cache_clear()
+        Unit._interned.clear()
 
     def __repr__(self):
         unitoutput = []
@@ -82,15 +184,7 @@ class Unit:
     def parse(self,unitString):
         "Decompose string into its constituent SI units."
 
-        # Match a prefix that is followed by a non-whitespace character
-        prefix = re.compile(f'([{"".join(prefix for prefix in Unit.prefixes.keys())}])\\B')
-        # Match a known unit
-        # Compiles to '([JVNWTmgsACK]|(?:Pa)|(?:Hz))' for default (base + derived) units
-        unit = re.compile(f"([{''.join([ unit_str if len(unit_str) == 1 else '' for unit_str in Unit.knownUnits])}]|{'|'.join([ ('(?:' + unit_str + ')') for unit_str in filter(lambda x: len(x) > 1, Unit.knownUnits) ])})") 
-        # print(unit)
-        # Match a '^' followed optionally by '-' and then any number of digits
-        power = re.compile('(\^)(\-?)(\d+)')
-        # power = re.compile(r'\^(?:-?\d+)')
+        prefix, unit, power = Unit._patterns()
         flip = False
 
         i = 0
@@ -120,48 +214,75 @@ class Unit:
 
             self.units[unitstr] = {
                 "prefix": prefixstr,
-                "power": (-1)**(2-flip) * int(powermatch.group(2) + powermatch.group(3) if powermatch else 1)
+                "power": (-1)**(2-flip) * (_number(powermatch.group(2) + powermatch.group(3)) if powermatch else 1)
             }
 
             i += len(prefixstr) + len(unitstr) + (powermatch.span()[1] if powermatch else 0)
 
     @staticmethod
     def unitless(self):
-        # return all([ dim['power'] == 0 for dim in self.units.values() ])
-        factor, baseDims = factorandbasedims(self)
-        return all([ dim == 0 for dim in baseDims.values() ])
+        return not any(self.dimensions)
 
     @staticmethod
     def addUnit(symbol : str, SI_equivalent : str, constant_factor : float = 1):
         # inefficient but functional
         Unit.derivedUnits[symbol] = [SI_equivalent, constant_factor]
         Unit.knownUnits += [symbol]
+        Unit.clearcache()
 
     def __eq__(self, obj):
-        "Check if two Units are the same."
-        obj = obj if isinstance(obj,Unit) else Unit(obj)
-        return factorandbasedims(self) == factorandbasedims(obj) if isinstance(obj,Unit) else False
-        
+        "Check if two Units are the same, i.e. they have the same dimensions and scale."
+        if(isinstance(obj,str)):
+            obj = Unit(obj)
+        if(not isinstance(obj,Unit)):
+            return False
+        return self is obj or (self.factor == obj.factor and self.dimensions == obj.dimensions)
+
+    def __hash__(self):
+        return hash((self.factor, self.dimensions))
+
+    def samedimensions(self, obj):
+        "Check if two Units have the same dimensions, regardless of scale."
+        return self.dimensions == obj.dimensions
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _algebra(key: tuple, operation: str, other):
+        "Memoized Unit algebra on canonical keys. `other` is a key, or the exponent for '**'."
+        unit = Unit._fromkey(key)
+        if(operation == '**'):
+            return unit._power(other)
+        if(operation == '1/'):
+            return unit._inverse()
+        obj = Unit._fromkey(other)
+        if(operation == '*'):
+            return unit._multiply(obj)
+        if(operation == '/'):
+            return unit._divide(obj)
+        # Shared dimensions of obj are rescaled onto the prefixes of unit by a constant factor
+        factor, obj = unit._reconcile(obj)
+        if(operation == 'product'):
+            return factor, unit._multiply(obj)
+        if(operation == 'quotient'):
+            return factor, unit._divide(obj)
+        raise ValueError(f"Unknown Unit operation: {operation}")
+
+    @staticmethod
+    def product(unit, obj):
+        """Multiply two Units whose shared dimensions may have different prefixes.
+        Returns the factor to scale the value of `obj` by and the resulting Unit."""
+        return Unit._algebra(unit._key, 'product', obj._key)
+
+    @staticmethod
+    def quotient(unit, obj):
+        """Divide two Units whose shared dimensions may have different prefixes.
+        Returns the factor to scale the value of `obj` by and the resulting Unit."""
+        return Unit._algebra(unit._key, 'quotient', obj._key)
 
     def __mul__(self,obj):
         "Multiply two Units."
         if(isinstance(obj,Unit)):
-            newunits = {}
-            for unit in Unit.knownUnits:
-                # If one of the units is unitless, return the other, where prefix='' and power=0 by default.
-                if((self.units[unit]["power"] != 0) ^ (obj.units[unit]["power"] != 0) ):
-                    newunits[unit] = {
-                        "prefix": self.units[unit]["prefix"] + obj.units[unit]["prefix"],
-                        "power": self.units[unit]["power"] + obj.units[unit]["power"]
-                    }
-                elif(self.units[unit]["prefix"] == obj.units[unit]["prefix"]):
-                    newunits[unit] = {
-                        "prefix": self.units[unit]["prefix"] if self.units[unit]["power"] + obj.units[unit]["power"] != 0 else "",
-                        "power": self.units[unit]["power"] + obj.units[unit]["power"]
-                        }
-                else:
-                    raise Exception("Units have different prefixes. Multiplication not supported as constant factors arise..")
-            return Unit(newunits)
+            return Unit._algebra(self._key, '*', obj._key)
         elif(isinstance(obj,Number)):
             return self
         else:
@@ -170,39 +291,71 @@ class Unit:
     def __rmul__(self,obj):
         return self.__mul__(obj)
 
-
     def __truediv__(self,obj):
         if(isinstance(obj,Unit)):
-            newunits = {}
-            for unit in Unit.knownUnits:
-                if((self.units[unit]["power"] != 0) ^ (obj.units[unit]["power"] != 0 )):
-                    newunits[unit] = {
-                        "prefix": self.units[unit]["prefix"] + obj.units[unit]["prefix"],
-                        "power": self.units[unit]["power"] - obj.units[unit]["power"]
-                    }
-                elif(self.units[unit]["prefix"] == obj.units[unit]["prefix"]):
-                    newunits[unit] = {
-                        "prefix": self.units[unit]["prefix"] if self.units[unit]["power"] - obj.units[unit]["power"] != 0 else "",
-                        "power": self.units[unit]["power"] - obj.units[unit]["power"]
-                        }
-                else:
-                    raise Exception("Measurements have different prefixes. Division not supported as constant factors arise.")
-            return Unit(newunits)
+            return Unit._algebra(self._key, '/', obj._key)
         else:
             return self.__mul__(1/obj)
-    
-    def __rtruediv__(self,obj):
-        newunits = {
-            unit: {
-                "prefix": self.units[unit]["prefix"],
-                "power": -self.units[unit]["power"]
-            } for unit in Unit.knownUnits 
-        }
 
-        tmpUnit = Unit(newunits)
-        return tmpUnit.__mul__(obj)
+    def __rtruediv__(self,obj):
+        return Unit._algebra(self._key, '1/', None).__mul__(obj)
 
     def __pow__(self,obj):
+        return Unit._algebra(self._key, '**', obj)
+
+    def _reconcile(self, obj):
+        "Factor and Unit that rescale `obj` onto the prefixes of `self` wherever they share a dimension."
+        factor = 1
+        newunits = None
+        for dim in Unit.knownUnits:
+            if (self.units[dim]['power'] != 0
+                and obj.units[dim]['power'] != 0
+                and self.units[dim]['prefix'] != obj.units[dim]['prefix']):
+                if newunits is None:
+                    newunits = { d: dict(obj.units[d]) for d in obj.units }
+                factor *= (Unit.prefixes[obj.units[dim]['prefix']] / Unit.prefixes[self.units[dim]['prefix']])**obj.units[dim]['power']
+                newunits[dim]['prefix'] = self.units[dim]['prefix']
+        return factor, (obj if newunits is None else Unit(newunits))
+
+    def _multiply(self,obj):
+        newunits = {}
+        for unit in Unit.knownUnits:
+            # If one of the units is unitless, return the other, where prefix='' and power=0 by default.
+            if((self.units[unit]["power"] != 0) ^ (obj.units[unit]["power"] != 0) ):
+                newunits[unit] = {
+                    "prefix": self.units[unit]["prefix"] + obj.units[unit]["prefix"],
+                    "power": self.units[unit]["power"] + obj.units[unit]["power"]
+                }
+            elif(self.units[unit]["prefix"] == obj.units[unit]["prefix"]):
+                newunits[unit] = {
+                    "prefix": self.units[unit]["prefix"] if self.units[unit]["power"] + obj.units[unit]["power"] != 0 else "",
+                    "power": self.units[unit]["power"] + obj.units[unit]["power"]
+                    }
+            else:
+                raise Exception("Units have different prefixes. Multiplication not supported as constant factors arise..")
+        return Unit(newunits)
+
+    def _divide(self,obj):
+        newunits = {}
+        for unit in Unit.knownUnits:
+            if((self.units[unit]["power"] != 0) ^ (obj.units[unit]["power"] != 0 )):
+                newunits[unit] = {
+                    "prefix": self.units[unit]["prefix"] + obj.units[unit]["prefix"],
+                    "power": self.units[unit]["power"] - obj.units[unit]["power"]
+                }
+            elif(self.units[unit]["prefix"] == obj.units[unit]["prefix"]):
+                newunits[unit] = {
+                    "prefix": self.units[unit]["prefix"] if self.units[unit]["power"] - obj.units[unit]["power"] != 0 else "",
+                    "power": self.units[unit]["power"] - obj.units[unit]["power"]
+                    }
+            else:
+                raise Exception("Measurements have different prefixes. Division not supported as constant factors arise.")
+        return Unit(newunits)
+
+    def _inverse(self):
+        return self._power(-1)
+
+    def _power(self,obj):
         newunits = { 
             unit: {
                 "prefix": self.units[unit]["prefix"],
@@ -216,21 +369,9 @@ class U(Unit):
     pass
 
 def factorandbasedims(unit):
-    factor = 1
-    basedims = { unit : 0 for unit in Unit.baseUnits }
-    for dim in unit.units:
-        if unit.units[dim]['power'] != 0 and dim in Unit.derivedUnits:
-            if len(Unit.derivedUnits[dim]) == 2:
-                factor *= (Unit.derivedUnits[dim][1]) ** unit.units[dim]['power']
-            # print('Derived unit: ' + str(dim))
-            factor *= Unit.prefixes[unit.units[dim]['prefix']] ** unit.units[dim]['power']
-            equivalentunits = Unit(Unit.derivedUnits[dim][0]).units
-            for baseUnit in Unit.baseUnits: # as all equivalent units are base units
-                # print('Base unit: ' + str(baseUnit) + 'power: ' + str(equivalentunits[baseUnit]['power']))
-                basedims[baseUnit] += equivalentunits[baseUnit]['power'] * unit.units[dim]['power']
-                factor *= Unit.prefixes[equivalentunits[baseUnit]['prefix']]**(equivalentunits[baseUnit]['power'] * unit.units[dim]['power'])
-        elif dim in Unit.baseUnits:
-            # print('Base unit: ' + str(dim))
-            basedims[dim] += unit.units[dim]['power']
-            factor *= Unit.prefixes[unit.units[dim]['prefix']]**unit.units[dim]['power']
-    return factor, basedims
\ No newline at end of file
+    "Scale factor to SI and the power of each base unit as a dictionary."
+    return unit.factor, dict(zip(Unit.baseUnits, unit.dimensions))
+
+def _number(string : str):
+    "An integer, or a float for a string with a fractional part."
+    return float(string) if '.' in string else int(string)
@@ -21,6 +21,7 @@ setuptools.setup(
     author='CianLM',
     packages=['labtex'],
     install_requires=['matplotlib','numpy','scipy'],
+    extras_require={'parquet': ['pyarrow'], 'pandas': ['pandas']},
     classifiers=[
         "Programming Language :: Python :: 3",
         "Intended Audience :: Science/Research",
@@ -0,0 +1,38 @@
+from labtex import *
+import numpy as np
+import unittest
+
+class TestMeasurementBuffer(unittest.TestCase):
+
+    def test_append(self):
+        buffer = MeasurementBuffer("cm", capacity=2)
+        buffer.append(Measurement(185,5,"cm"))
+        buffer.append(Measurement(1.83,0.04,"m"))
+        buffer.append(182, 5)
+        self.assertEqual( len(buffer), 3)
+        self.assertEqual( buffer.capacity, 4)
+        self.assertEqual( repr(buffer.freeze()), "[185 ± 5, 183 ± 4, 182 ± 5] cm")
+
+    def test_extend(self):
+        buffer = MeasurementBuffer("cm")
+        buffer.extend([185,183], 5)
+        buffer.extend(MeasurementList([1.82,1.94],[0.05,0.06],"m"))
+        self.assertEqual( repr(buffer), "[185 ± 5, 183 ± 5, 182 ± 5, 194 ± 6] cm")
+
+    def test_freeze(self):
+        buffer = MeasurementBuffer("V", capacity=1)
+        for i in range(100):
+            buffer.append(i, 0.1)
+        frozen = buffer.freeze()
+        buffer.extend(np.arange(1000), 0.1)
+        self.assertEqual( len(frozen), 100)
+        self.assertEqual( frozen.values().tolist(), list(range(100)))
+        with self.assertRaises(ValueError):
+            frozen.values()[0] = 1
+
+    def test_exceptions(self):
+        buffer = MeasurementBuffer("V")
+        with self.assertRaises(Exception):
+            buffer.append(Measurement(1,0.1,"m"))
+        with self.assertRaises(Exception):
+            buffer.extend(np.zeros((2,2)))
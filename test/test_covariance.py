@@ -0,0 +1,64 @@
+from labtex import *
+import numpy as np
+import unittest
+
+heights = MeasurementList([185,183,182,194,184,177],[5,4,5,6,7,10],"cm")
+maxheight = Measurement(200,5,"cm")
+
+def pairwise(ml):
+    "Covariance matrix built from the individual Measurements of a list."
+    measurements = list(ml)
+    return np.array([[ Measurement.covariance(x, y) for y in measurements ] for x in measurements ])
+
+class TestCovariance(unittest.TestCase):
+
+    def test_structure(self):
+        self.assertEqual( heights.covariance().structure, 'diagonal')
+        self.assertEqual( (heights * maxheight).covariance().structure, 'lowrank')
+        self.assertEqual( (np.ones((2, 6)) @ heights).covariance().structure, 'dense')
+        for ml in (heights, heights * maxheight, heights[1:4] + heights[2:5], heights.concat(heights), heights + heights[2], np.arange(12.).reshape(2, 6) @ heights):
+            self.assertTrue( np.allclose(ml.covariance().toarray(), pairwise(ml)))
+
+    def test_from_covariance(self):
+        matrix = np.diag([1., 2., 3.]) + np.ones((3, 3))
+        ml = MeasurementList.from_covariance([1, 2, 3], matrix, "m")
+        self.assertTrue( np.allclose((2 * ml + Measurement(1, 0, "m")).covariance().toarray(), 4 * matrix))
+        self.assertTrue( np.allclose(ml.uncertainties(), np.sqrt(np.diag(matrix))))
+        lowrank = Covariance(np.ones(1000), np.ones((1000, 1)))
+        self.assertEqual( MeasurementList.from_covariance(np.zeros(1000), lowrank, "m").covariance().rank, 1)
+        self.assertEqual( Covariance.from_array(np.ones((3, 3))).structure, 'lowrank')
+
+    def test_products(self):
+        covariance = Covariance(np.arange(4.), np.ones((4, 2)))
+        self.assertTrue( np.allclose(covariance @ np.ones(4), covariance.toarray() @ np.ones(4)))
+        self.assertTrue( np.allclose(covariance.variances(), np.diag(covariance.toarray())))
+        self.assertEqual( repr(np.ones(6) @ heights), repr(heights.sum()))
+        self.assertEqual( repr(heights @ np.ones(6)), repr(heights.sum()))
+
+    def test_linear(self):
+        matrix = np.random.default_rng(1).normal(size=(8, 6))
+        for ml in (heights, heights + heights[::-1], heights[[0,0,1,3,4,5]]):
+            for rows in (matrix, matrix[:3]):
+                product = rows @ ml
+                self.assertTrue( np.allclose(product.covariance().toarray(), rows @ ml.covariance().toarray() @ rows.T))
+                self.assertAlmostEqual( (product[0] - (rows[0] * ml).sum()).uncertainty, 0)
+        # A few rows over a long list share one projection each, rather than one input per element
+        long = MeasurementList(np.arange(10.**5), 0.1, "m")
+        self.assertEqual( len((np.ones((3, 10**5)) @ long)._tracked()[0]), 3)
+
+    def test_calibration(self):
+        x = MeasurementList([1,2,3,4,5],0.1,"s")
+        fit = LinearRegression(x, MeasurementList([2.1,3.9,6.2,7.8,10.1],0.2,"m"))
+        self.assertLess( Measurement.correlation(fit.lobf["m"], fit.lobf["c"]), 0)
+        self.assertTrue( np.allclose(fit.predict(x).covariance().toarray(), pairwise(fit.predict(x))))
+        # Memory grows with the length of the list, not its square
+        covariance = fit.predict(MeasurementList(np.linspace(0, 10, 10**5), 0.1, "s")).covariance()
+        self.assertEqual( (covariance.structure, covariance.rank), ('lowrank', 2))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            Covariance.from_array([[1, 2], [0, 1]])
+        with self.assertRaises(Exception):
+            MeasurementList.from_covariance([1, 2], np.eye(3))
+        with self.assertRaises(Exception):
+            np.ones((2, 3)) @ heights
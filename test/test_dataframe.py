@@ -0,0 +1,56 @@
+from labtex import *
+import numpy as np
+import os
+import tempfile
+import unittest
+
+try:
+    import pandas
+    import labtex.dataframe
+except ImportError:
+    pandas = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+voltages = MeasurementList([1.2,3.4,5.6,7.8],0.1,"mV")
+
+@unittest.skipUnless(pandas, "requires pandas")
+class TestDataFrame(unittest.TestCase):
+
+    def test_series(self):
+        series = voltages.to_series(name="V")
+        self.assertEqual( str(series.dtype), "measurement[mV]")
+        self.assertIs( MeasurementList.from_series(series), voltages)
+        self.assertTrue( np.shares_memory(series.array._data._values, voltages._values))
+        self.assertEqual( repr(series[1]), repr(voltages[1]))
+        self.assertEqual( repr(MeasurementList.from_series(series.iloc[1:3])), repr(voltages[1:3]))
+        self.assertEqual( pandas.Series([1.2, Measurement(3.4,0.1,"mV")], dtype="measurement[mV]").dtype, series.dtype)
+
+    def test_operations(self):
+        frame = pandas.DataFrame({"V": voltages.to_series(), "group": ["a","b","a","b"]})
+        self.assertEqual( repr(MeasurementList.from_series(frame["V"] * 2 + frame["V"])), repr(3 * voltages))
+        self.assertEqual( repr(frame["V"].sum()), repr(voltages.sum()))
+        self.assertEqual( repr(frame["V"].mean()), repr(voltages.mean()))
+        grouped = MeasurementList.from_series(frame.groupby("group")["V"].sum())
+        self.assertEqual( repr(grouped), repr(MeasurementList([6.8,11.2],np.sqrt(2)*0.1,"mV")))
+        self.assertEqual( repr(MeasurementList.from_series(pandas.concat([frame["V"], frame["V"]]))), repr(voltages.concat(voltages)))
+
+    def test_missing(self):
+        series = voltages.to_series().reindex([0, 1, 4])
+        self.assertEqual( list(series.isna()), [False, False, True])
+        self.assertEqual( repr(series.sum()), repr(voltages[0] + voltages[1]))
+        series.iloc[2] = Measurement(1,0.1,"V")
+        self.assertEqual( repr(series.iloc[2]), repr(Measurement(1000,100,"mV")))
+
+    @unittest.skipUnless(pyarrow, "requires pyarrow")
+    def test_arrow(self):
+        frame = pandas.DataFrame({"V": voltages.to_series()})
+        table = pyarrow.Table.from_pandas(frame)
+        self.assertIsInstance( table.schema.field("V").type, labtex.dataframe.MeasurementArrowType)
+        self.assertEqual( repr(MeasurementList.from_series(table.to_pandas()["V"])), repr(voltages))
+        path = os.path.join(tempfile.mkdtemp(), "data.parquet")
+        frame.to_parquet(path)
+        self.assertEqual( repr(MeasurementList.from_series(pandas.read_parquet(path)["V"])), repr(voltages))
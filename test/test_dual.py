@@ -0,0 +1,38 @@
+from labtex import *
+import numpy as np
+import unittest
+
+x = Measurement(1.1,0.3,"m")
+y = Measurement(2.22,0.4,"m")
+heights = MeasurementList([185,183,182,194,184,177],[5,4,5,6,7,10],"cm")
+
+class TestApply(unittest.TestCase):
+
+    def test_measurement(self):
+        self.assertEqual( repr(Measurement.apply(lambda x, y: np.sqrt(x**2 + y**2), x, y)), repr(np.sqrt(x**2 + y**2)))
+        self.assertEqual( repr(Measurement.apply(lambda x, y: np.sin(x / y) * x, x, y)), repr(np.sin(x / y) * x))
+        self.assertEqual( repr(Measurement.apply(lambda t: 2 ** t, x / y)), repr(2 ** (x / y)))
+
+    def test_measurementlist(self):
+        self.assertEqual(
+            repr(MeasurementList.apply(lambda h, x: np.exp(h / x) * np.array([1,2,3,4,5,6]), heights, x)),
+            repr(np.exp(heights / x) * np.array([1,2,3,4,5,6]))
+        )
+        # Prefixes are reconciled as they are for Measurements
+        self.assertEqual( repr(MeasurementList.apply(lambda h, x: h * x, heights, x)), repr(heights * x))
+
+    def test_correlation(self):
+        ratio = Measurement.apply(lambda x, y: x / y, x, y)
+        self.assertAlmostEqual( (ratio - x / y).uncertainty, 0)
+
+    def test_unit(self):
+        self.assertEqual( repr(Measurement.apply(lambda x: x if x > 0 else -x, -x, unit="m")), repr(x))
+        # Constants are added in the units of the arguments
+        length = Measurement(1.0,0.1,"mm")
+        self.assertEqual( repr(Measurement.apply(lambda a: a + 1, length)), "2.0 ± 0.1 mm")
+        self.assertEqual( repr(Measurement.apply(lambda a, b: a + b, length, x)), repr(length + x))
+        self.assertEqual( repr(Measurement.apply(lambda a: a + 1, length, unit="m")), repr((length + 1).to("m")))
+        with self.assertRaises(Exception):
+            Measurement.apply(lambda a: a, length, unit="s")
+        with self.assertRaises(Exception):
+            Measurement.apply(lambda x, y: x + x * y, x, y)
@@ -0,0 +1,66 @@
+from labtex import *
+import numpy as np
+import os
+import tempfile
+import unittest
+
+voltages = MeasurementList([1.2,3.4,5.6],0.1,"mV")
+speeds = MeasurementList([0.5,1,1.5],[0.01,0.02,0.03],"m s^-1")
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+class TestFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def assertColumns(self, columns):
+        self.assertEqual( list(columns), ["V", "speed"])
+        self.assertEqual( repr(columns["V"]), repr(voltages))
+        self.assertEqual( repr(columns["speed"]), repr(speeds))
+        self.assertEqual( columns["speed"].unit, speeds.unit)
+
+    def test_csv(self):
+        write_csv(self.path("data.csv"), {"V": voltages, "speed": speeds})
+        with open(self.path("data.csv")) as file:
+            self.assertEqual( file.readline(), "V [mV],dV,speed [m s^-1],dspeed\n")
+        self.assertColumns( read_csv(self.path("data.csv"), chunksize=2))
+
+    def test_csv_headers(self):
+        with open(self.path("scan.csv"), "w") as file:
+            file.write("# Comments and blank lines are skipped\nV [mV];dV [uV];t [s]\n1;100;0\n\n2;200;1\n3;300;2\n")
+        columns = read_csv(self.path("scan.csv"), delimiter=";")
+        self.assertEqual( repr(columns["V"]), "[1.0 ± 0.1, 2.0 ± 0.2, 3.0 ± 0.3] mV")
+        self.assertEqual( repr(columns["t"]), "[0.0, 1.0, 2.0] s")
+
+    def test_npz(self):
+        write_npz(self.path("data.npz"), {"V": voltages, "speed": speeds})
+        self.assertColumns( read_npz(self.path("data.npz")))
+
+    def test_fractional_powers(self):
+        noise = MeasurementList([1,2],0.1,"V") / np.sqrt(MeasurementList([4,9],0,"Hz"))
+        noise = noise * MeasurementList([1,1],0,"s") ** (1/3)
+        write_csv(self.path("noise.csv"), {"noise": noise})
+        write_npz(self.path("noise.npz"), {"noise": noise})
+        for columns in (read_csv(self.path("noise.csv")), read_npz(self.path("noise.npz"))):
+            self.assertEqual( columns["noise"].unit, noise.unit)
+            self.assertEqual( repr(columns["noise"]), repr(noise))
+
+    @unittest.skipUnless(pyarrow, "requires pyarrow")
+    def test_parquet(self):
+        write_parquet(self.path("data.parquet"), {"V": voltages, "speed": speeds})
+        self.assertColumns( read_parquet(self.path("data.parquet"), chunksize=2))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            write_csv(self.path("data.csv"), {"V": voltages, "short": voltages[:2]})
+        with open(self.path("bad.csv"), "w") as file:
+            file.write("V [mV],dV [s]\n1,1\n")
+        with self.assertRaises(Exception):
+            read_csv(self.path("bad.csv"))
@@ -0,0 +1,46 @@
+from labtex import *
+import numpy as np
+import unittest
+
+heights = MeasurementList([185,183,182,194,184,177],[5,4,5,6,7,10],"cm")
+maxheight = Measurement(200,5,"cm")
+x = Measurement(1.1,0.3,"m")
+y = Measurement(2.22,0.4,"m")
+
+class TestExpression(unittest.TestCase):
+
+    def test_measurement(self):
+        self.assertEqual( repr(x.lazy() * y + x * Measurement(1,0,"m")), repr(x * y + x * Measurement(1,0,"m")))
+        self.assertEqual( repr(3 - x.lazy() / y), repr(3 - x / y))
+        self.assertEqual( repr(2 ** (x.lazy() / y)), repr(2 ** (x / y)))
+
+    def test_measurementlist(self):
+        h = heights.lazy()
+        self.assertEqual( repr(h * maxheight / maxheight - h), repr(heights - heights))
+        self.assertEqual( repr(np.sin(h / maxheight) * h + 1), repr(np.sin(heights / maxheight) * heights + 1))
+        offsets = np.arange(6)
+        self.assertEqual( repr(offsets + h * offsets - maxheight), repr(offsets + heights * offsets - maxheight))
+        self.assertEqual( repr((h / maxheight) ** Measurement(2,0.1,"")), repr((heights / maxheight) ** Measurement(2,0.1,"")))
+        self.assertEqual( repr((h + h).evaluate().sum()), repr((heights + heights).sum()))
+
+    def test_chunks(self):
+        Expression.chunksize = 4
+        try:
+            h = heights.lazy()
+            self.assertEqual( repr(np.sqrt(h * h) + h.evaluate()), repr(2 * heights))
+        finally:
+            Expression.chunksize = 2**16
+
+    def test_common_subexpressions(self):
+        h = heights.lazy()
+        nodes, graph = ((h * maxheight + 1) / (h * maxheight + 1))._graph()
+        # heights, maxheight, 1, the product, the sum and the quotient
+        self.assertEqual( len(nodes), 6)
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            heights.lazy() + Measurement(1,0,"V")
+        with self.assertRaises(Exception):
+            heights.lazy() + MeasurementList([3],0.1,"cm")
+        with self.assertRaises(Exception):
+            np.sin(x.lazy())
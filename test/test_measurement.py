@@ -1,5 +1,8 @@
 from labtex import *
 import unittest
+import multiprocessing
+import sys
+from labtex.measurement import _keys
 
 # Measurement Class 
 x = Measurement(1.1,0.3,"m")
@@ -30,6 +33,10 @@ class TestMeasurementClass(unittest.TestCase):
         self.assertEqual( repr(z / 3), "105 ± 3 V")
         self.assertEqual( repr(3 / z), "(96 ± 3) × 10^{-4} V^{-1}")
 
+    def test_mixed_prefixes(self):
+        self.assertEqual( repr(Measurement(1.5,0.1,"cm") * Measurement(4,0.4,"m s^-1")), "(60 ± 7) × 10^{1} cm^2 s^{-1}")
+        self.assertEqual( repr(Measurement(4,0.4,"m s^-1") / Measurement(1.5,0.1,"cm")), "(27 ± 3) × 10^{1} s^{-1}")
+
     def test_exponentiation(self):
         self.assertTrue( repr(x * x) == repr(x ** 2) == "1.2 ± 0.7 m^2")
         self.assertEqual( repr(2 ** (x / y) ), "1.4 ± 0.2 ")
@@ -43,6 +50,34 @@ class TestMeasurementClass(unittest.TestCase):
         self.assertEqual( repr(Measurement.acos(x/y)), "1.1 ± 0.2 ")
         self.assertEqual( repr(Measurement.atan(x/y)), "0.5 ± 0.1 ")
 
+    def test_abs(self):
+        self.assertEqual( repr(abs(-x)), repr(x))
+        self.assertAlmostEqual( Measurement.correlation(abs(x - y), y), -Measurement.correlation(x - y, y))
+
+    def test_numpy_ufuncs(self):
+        import numpy as np
+        self.assertEqual( repr(np.sin(x/y)), repr(Measurement.sin(x/y)))
+        self.assertEqual( repr(np.sqrt(x * y)), "1.6 ± 0.3 m")
+        self.assertEqual( repr(np.float64(3) * z), repr(3 * z))
+
+    def test_correlation(self):
+        self.assertEqual( repr(x - x), "0.0 m")
+        self.assertEqual( repr(x / x), "1.0 ")
+        # x * y + x depends on x through both terms
+        self.assertAlmostEqual( (x * y + x * Measurement(1,0,"m")).uncertainty, ((0.3 * 3.22)**2 + (1.1 * 0.4)**2)**0.5 )
+        self.assertAlmostEqual( Measurement.correlation(x, 2 * x), 1 )
+        self.assertAlmostEqual( Measurement.covariance(x, y), 0 )
+        self.assertEqual( [round(fraction,2) for fraction in (x * y).budget(x, y)], [0.7, 0.3])
+        self.assertEqual( repr(x ** Measurement(2,0.1,"")), "1.2 ± 0.7 m^2")
+
+    @unittest.skipIf(sys.platform == "win32", "Forking is not available on Windows")
+    def test_keys_unique_across_processes(self):
+        # Inputs created in a forked worker must not collide with those created here
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            keys = pool.map(_newkey, range(4))
+        keys.append(next(_keys))
+        self.assertEqual( len(set(keys)), len(keys) )
+
     def test_conversion(self):
         self.assertEqual( repr(Measurement(2,1,'cm^3').to('m^3')), "(2 ± 1) × 10^{-6} m^3")
         self.assertEqual( repr(x.to('cm')), "(11 ± 3) × 10^{1} cm")
@@ -56,3 +91,6 @@ class TestMeasurementClass(unittest.TestCase):
         with self.assertRaises(Exception):
             Measurement.sin(x)
         
+
+def _newkey(_):
+    return next(_keys)
@@ -0,0 +1,75 @@
+from labtex import *
+import numpy as np
+import unittest
+
+grid = MeasurementArray([[1,2,3],[4,5,6]],0.1,"V")
+offsets = MeasurementArray([10,20,30],1,"mV")
+
+class TestMeasurementArrayClass(unittest.TestCase):
+
+    def test_print(self):
+        self.assertEqual( repr(grid), "[[1.0 ± 0.1, 2.0 ± 0.1, 3.0 ± 0.1], [4.0 ± 0.1, 5.0 ± 0.1, 6.0 ± 0.1]] V")
+        self.assertEqual( grid.shape, (2, 3))
+
+    def test_broadcasting(self):
+        self.assertTrue( np.allclose((grid + offsets).values(), [[1.01, 2.02, 3.03], [4.01, 5.02, 6.03]]))
+        self.assertEqual( (grid * MeasurementList([1,2,3],0,"A")).unit, Unit("V A"))
+        self.assertEqual( repr((grid * np.arange(3))[1]), "[0.0, 5.0 ± 0.1, 12.0 ± 0.2] V")
+        self.assertEqual( repr(Measurement(1,0,"V") + grid[0]), "[2.0 ± 0.1, 3.0 ± 0.1, 4.0 ± 0.1] V")
+        # Broadcasting repeats the same inputs
+        self.assertAlmostEqual( (grid[None] * np.ones((4, 1, 1))).sum(0)._uncertainties[0, 0], 0.4)
+
+    def test_views(self):
+        self.assertEqual( repr(grid.T[2]), "[3.0 ± 0.1, 6.0 ± 0.1] V")
+        self.assertEqual( repr(grid[1, ::-1]), "[6.0 ± 0.1, 5.0 ± 0.1, 4.0 ± 0.1] V")
+        self.assertEqual( repr(grid[1, 2]), "6.0 ± 0.1 V")
+        self.assertEqual( grid.reshape(3, 2).shape, (3, 2))
+        self.assertTrue( np.shares_memory(grid.T.values(), grid.values()))
+        self.assertEqual( repr(grid[grid.values() > 4]), "[5.0 ± 0.1, 6.0 ± 0.1] V")
+        # Views stay correlated with the array they came from
+        self.assertEqual( repr(grid.T.T - grid), "[[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]] V")
+        self.assertEqual( repr(grid.reshape(-1)[4] - grid[1, 1]), "0.0 V")
+        self.assertEqual( repr(grid.T.reshape(-1) - grid.T.reshape(-1)), "[0.0, 0.0, 0.0, 0.0, 0.0, 0.0] V")
+        # Copies and index arrays keep the position of each element in the array they came from
+        self.assertEqual( repr(grid.T.reshape(6)[1] - grid[1, 0]), "0.0 V")
+        self.assertEqual( repr(grid[np.array([1, 0])][0] - grid[1]), "[0.0, 0.0, 0.0] V")
+        self.assertEqual( repr(grid[grid.values() > 3] - grid[1]), "[0.0, 0.0, 0.0] V")
+
+    def test_reductions(self):
+        self.assertEqual( repr(grid.sum(0)), "[5.0 ± 0.1, 7.0 ± 0.1, 9.0 ± 0.1] V")
+        self.assertEqual( repr(grid.mean(axis=1)), "[2.0 ± 0.06, 5.0 ± 0.06] V")
+        self.assertEqual( repr(grid.sum()), "21.0 ± 0.2 V")
+        self.assertEqual( repr(np.sum(grid, axis=1)), repr(grid.sum(1)))
+        self.assertEqual( repr(grid.std(1)), "[1.0 ± 0.5, 1.0 ± 0.5] V")
+        # np.std defaults to ddof=0 as for MeasurementLists
+        self.assertTrue( np.allclose(np.std(grid, axis=1).values(), np.std(grid.values(), axis=1)))
+        self.assertEqual( repr(np.std(grid, axis=1, ddof=1)), repr(grid.std(1)))
+        self.assertEqual( repr(np.std(grid[0])), repr(np.std(MeasurementList([1,2,3],0.1,"V"))))
+        self.assertEqual( repr(grid.weighted_mean(0)), repr(grid.mean(0)))
+        self.assertEqual( repr(grid.mean() - grid.sum() / 6), "0.0 V")
+        # Sums stay exactly correlated with the elements they add up
+        self.assertEqual( repr(grid.sum(axis=0) - grid[0] - grid[1]), "[0.0, 0.0, 0.0] V")
+        self.assertTrue( np.allclose((grid - grid.mean(axis=0)).uncertainties(), 0.1 / np.sqrt(2)))
+        self.assertAlmostEqual( (grid.sum() - grid.sum(axis=1)[0] - grid[1].sum()).uncertainty, 0)
+        self.assertTrue( np.allclose((grid.sum(axis=1) - grid[:, 0]).uncertainties(), 0.1 * np.sqrt(2)))
+
+    def test_lists(self):
+        ml = MeasurementList([1,2,3],0.1,"m")
+        self.assertEqual( repr(MeasurementArray(ml) - ml), "[0.0, 0.0, 0.0] m")
+        self.assertEqual( repr(MeasurementArray(ml).aslist() - ml), "[0.0, 0.0, 0.0] m")
+        self.assertEqual( repr(MeasurementArray(ml)[1] - ml[1]), "0.0 m")
+
+    def test_numpy_ufuncs(self):
+        self.assertEqual( repr(np.sqrt(MeasurementArray([[4]],0.4,"m^2"))), "[[2.0 ± 0.1]] m")
+        self.assertEqual( (MeasurementArray([[0.,1.]],0.1,"") ** 0).uncertainties().tolist(), [[0, 0]])
+        self.assertEqual( (MeasurementArray([[0.,1.]],0.1,"") ** 0.5).uncertainties().tolist(), [[0, 0.05]])
+        with self.assertRaises(Exception):
+            np.exp(grid)
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            grid + MeasurementArray([1,2],0.1,"V")
+        with self.assertRaises(Exception):
+            grid + MeasurementArray([1],0,"s")
+        with self.assertRaises(TypeError):
+            grid["x"]
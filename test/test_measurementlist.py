@@ -44,6 +44,11 @@ class TestMeasurementListClass(unittest.TestCase):
         self.assertEqual(
             repr( 10 ** (heights / maxheight)), "[8.4 ± 0.7, 8.2 ± 0.6, 8.1 ± 0.6, 9.3 ± 0.8, 8.3 ± 0.8, 8 ± 1] "
         )
+        # At zero, powers below 1 have no uncertainty, as for Measurements
+        zero = MeasurementList([0.,1.],0.1,"")
+        self.assertEqual( (zero ** 0).uncertainties().tolist(), [0, 0])
+        self.assertEqual( (zero ** 0.5).uncertainties().tolist(), [(Measurement(0.,0.1,"") ** 0.5).uncertainty, 0.05])
+        self.assertEqual( (zero ** 1).uncertainties().tolist(), [0.1, 0.1])
 
     def test_functions(self):
         self.assertEqual(
@@ -67,6 +72,7 @@ class TestMeasurementListClass(unittest.TestCase):
         self.assertEqual(
             repr(MeasurementList.atan(heights/maxheight)), "[0.75 ± 0.02, 0.74 ± 0.02, 0.74 ± 0.02, 0.77 ± 0.02, 0.74 ± 0.02, 0.72 ± 0.03] "
         )
+
     def test_exceptions(self):
         with self.assertRaises(Exception):
             heights + MeasurementList([3],0.1,"V")
@@ -87,6 +93,134 @@ class TestMeasurementListClass(unittest.TestCase):
         )
 
 
+    def test_indexing(self):
+        import numpy as np
+        self.assertEqual( repr(heights[-1]), "(18 ± 1) × 10^{1} cm")
+        self.assertTrue( np.shares_memory(heights[1:4].values(), heights.values()))
+        self.assertEqual( repr(heights[heights.values() > 183]), "[185 ± 5, 194 ± 6, 184 ± 7] cm")
+        self.assertEqual( repr(heights[[0,2,4]]), repr(heights[::2]))
+        self.assertEqual( repr(heights[[3,1]][0] - heights[3]), "0.0 cm")
+        self.assertEqual( repr(heights[[3,0,1]] - heights[[3,0,1]]), "[0.0, 0.0, 0.0] cm")
+        self.assertEqual( len(heights[[]]), 0)
+        with self.assertRaises(IndexError):
+            heights[[True, False]]
+        with self.assertRaises(TypeError):
+            heights["0"]
+
+    def test_arrays(self):
+        import numpy as np
+        values, uncertainties = np.array([185.,183.,182.,194.,184.,177.]), np.array([5.,4.,5.,6.,7.,10.])
+        wrapped = MeasurementList.from_arrays(values, uncertainties, "cm")
+        self.assertEqual(repr(wrapped), repr(heights))
+        self.assertTrue(np.shares_memory(wrapped.to_arrays()[0], values))
+        self.assertTrue(np.shares_memory(wrapped.to_arrays()[1], uncertainties))
+        self.assertEqual(repr(MeasurementList.from_arrays(values, 5, "cm")), repr(MeasurementList(values, 5, "cm")))
+        with self.assertRaises(ValueError):
+            wrapped.values()[0] = 0
+        with self.assertRaises(Exception):
+            MeasurementList.from_arrays(values, uncertainties[:2], "cm")
+
+    def test_numpy_ufuncs(self):
+        import numpy as np
+        self.assertEqual(
+            repr(np.exp(heights/maxheight)), repr(10 ** (heights/maxheight / np.log(10)))
+        )
+        self.assertEqual(
+            repr(np.sin(heights/maxheight)), repr(MeasurementList.sin(heights/maxheight))
+        )
+        self.assertEqual(
+            repr(np.sqrt(heights ** 2)), repr(heights)
+        )
+        self.assertEqual(
+            repr(np.array([1,2,3,4,5,6]) * heights), repr(heights * MeasurementList([1,2,3,4,5,6],0,""))
+        )
+        with self.assertRaises(Exception):
+            np.log(heights)
+        # Arrays are constants in the units of the list, like numbers
+        offsets = np.arange(6)
+        self.assertEqual( repr(heights + offsets), repr(heights + MeasurementList(offsets,0,"cm")))
+        self.assertEqual( repr(offsets + heights), repr(heights + offsets))
+        self.assertEqual( repr(offsets - heights), repr(-(heights - offsets)))
+        self.assertEqual( repr(1 / (offsets + 1) / heights), repr(1 / ((offsets + 1) * heights)))
+        self.assertEqual( repr(maxheight + offsets), repr(maxheight + MeasurementList(offsets,0,"cm")))
+        self.assertEqual( repr(offsets * maxheight), repr(MeasurementList(offsets,0,"") * maxheight))
+        with self.assertRaises(Exception):
+            heights + np.ones(5)
+
+    def test_abs(self):
+        self.assertEqual( repr(abs(-heights)), repr(heights))
+        self.assertEqual( repr(abs(heights - maxheight)), repr(maxheight - heights))
+
+    def test_numpy_functions(self):
+        import numpy as np
+        self.assertEqual(repr(np.sum(heights)), "(110 ± 2) × 10^{1} cm")
+        self.assertEqual(repr(np.mean(heights)), "184 ± 3 cm")
+        self.assertEqual(len(np.concatenate([heights, heights])), 12)
+        self.assertAlmostEqual(np.std(heights).value, np.std(heights.values()))
+        self.assertEqual(repr(np.std(heights, ddof=1)), repr(heights.std()))
+
+    def test_reductions(self):
+        self.assertEqual( repr(heights.sum()), "(110 ± 2) × 10^{1} cm")
+        self.assertEqual( repr(heights.mean()), "184 ± 3 cm")
+        self.assertEqual( repr(heights.weighted_mean()), "185 ± 2 cm")
+        self.assertEqual( repr(heights.std()), "6 ± 2 cm")
+        self.assertEqual( repr(heights.sem()), "2.3 ± 0.7 cm")
+        self.assertEqual( repr(MeasurementList([1,2,3],0.1,"m").weighted_mean()), repr(MeasurementList([1,2,3],0.1,"m").mean()))
+        # Reductions stay correlated with the list
+        self.assertAlmostEqual( (heights.mean() - heights.sum() / 6).uncertainty, 0)
+
+    def test_from_samples(self):
+        import numpy as np
+        self.assertEqual( repr(MeasurementList.from_samples([1.1, 0.9, 1.0, 1.2, 0.8], "V")), "1.0 ± 0.07 V")
+        self.assertEqual( repr(MeasurementList.from_samples([[1.1, 0.9, 1.0, 1.2, 0.8], [2.1, 1.9, 2.0, 2.2, 1.8]], "V")), "[1.0 ± 0.07, 2.0 ± 0.07] V")
+        self.assertEqual( len(MeasurementList.from_samples(np.ones((5, 3)), "V", axis=0)), 3)
+
+    def test_correlation(self):
+        self.assertEqual( repr(heights - heights), "[0.0, 0.0, 0.0, 0.0, 0.0, 0.0] cm")
+        self.assertEqual( repr(heights[1:3] - heights[1:3]), "[0.0, 0.0] cm")
+        self.assertEqual( repr(heights.concat(heights)[6:] - heights), repr(heights - heights))
+        self.assertEqual( repr(heights[0] - heights[0]), "0.0 cm")
+        # Overlapping slices share heights[2]
+        self.assertEqual( repr((heights[1:3] + heights[2:4]).sum()), repr(heights[1] + 2 * heights[2] + heights[3]))
+        self.assertEqual( round((heights * maxheight).budget(maxheight)[0][0].item(), 2), 0.46)
+
+    def test_selection_correlation(self):
+        import numpy as np
+        # Index arrays keep the position of each element in the list they select from
+        selected = heights[np.array([0,2,3])]
+        self.assertEqual( repr(selected[0] - heights[0]), "0.0 cm")
+        self.assertEqual( repr(selected - heights[[0,2,3]]), "[0.0, 0.0, 0.0] cm")
+        self.assertEqual( repr(selected[1:] - heights[2:4]), "[0.0, 0.0] cm")
+        self.assertEqual( repr(selected.concat(heights)[:3] - selected), "[0.0, 0.0, 0.0] cm")
+        self.assertAlmostEqual( (selected - heights[:3]).uncertainties()[0], 0)
+        # Inputs coinciding within an element, as in the middle of a list plus its reverse, are summed
+        self.assertEqual( repr((heights[:5] + heights[:5][::-1])[2]), repr(2 * heights[2]))
+        self.assertTrue( np.allclose(selected.covariance().diagonal, [25, 25, 36]))
+        self.assertAlmostEqual( (selected.sum() - heights[0] - heights[2] - heights[3]).uncertainty, 0)
+
+    def test_reduction_correlation(self):
+        import numpy as np
+        # Sums and means stay exactly correlated with the elements they add up
+        x = MeasurementList(np.arange(10.), 0.1, "m")
+        self.assertTrue( np.allclose((x - x.mean()).uncertainties(), 0.1 * np.sqrt(0.9)))
+        self.assertAlmostEqual( (x.sum() - x[:5].sum()).uncertainty, 0.1 * np.sqrt(5))
+        self.assertAlmostEqual( (x[:5].sum() + x[5:].sum() - x.sum()).uncertainty, 0)
+        self.assertTrue( np.allclose((x - x.mean()).covariance().toarray(), 0.01 * (np.eye(10) - 0.1)))
+        rng = np.random.default_rng(0)
+        y = MeasurementList(rng.normal(size=43), rng.uniform(0.1, 1, 43), "m")
+        self.assertAlmostEqual( (y.mean() - y.sum() / 43).uncertainty, 0)
+        self.assertTrue( np.allclose((x - x.mean()).budget(x)[0], 1))
+
+    def test_constant_uncertainty(self):
+        ml = MeasurementList([1,2,3],0.1,"m")
+        # A single uncertainty is stored once until an operation makes it vary
+        self.assertEqual( ml._uncertainties.strides, (0,))
+        self.assertEqual( (2 * ml + Measurement(1,0,"m"))._uncertainties.strides, (0,))
+        self.assertNotEqual( (ml * ml)._uncertainties.strides, (0,))
+        self.assertEqual( repr(2 * ml), "[2.0 ± 0.2, 4.0 ± 0.2, 6.0 ± 0.2] m")
+        self.assertEqual( repr(ml * ml), "[1.0 ± 0.2, 4.0 ± 0.4, 9.0 ± 0.6] m^2")
+        self.assertEqual( ml.tableprint(), ", ($\\pm 0.1$ m)& 1.0 & 2.0 & 3.0")
+
 
 #Measurement and MeasurementList Interactions 
 t = Measurement(5,0.1,"cm")
@@ -119,6 +253,10 @@ class TestMeasurementandListInteractions(unittest.TestCase):
             repr(heights / t), "[37 ± 1, 37 ± 1, 36 ± 1, 39 ± 1, 37 ± 2, 35 ± 2] "
         ) 
 
+    def test_correlation(self):
+        self.assertEqual( repr((heights - maxheight)[0] - (heights[0] - maxheight)), "0.0 cm")
+        self.assertAlmostEqual( max((heights * maxheight / maxheight - heights).uncertainties()), 0)
+
     def test_exceptions(self):
         with self.assertRaises(Exception):
             heights + Measurement(101300,1e3,"Pa")
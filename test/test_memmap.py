@@ -0,0 +1,77 @@
+from labtex import *
+import numpy as np
+import gc
+import os
+import tempfile
+import unittest
+
+heights = MeasurementList([185,183,182,194,184,177],[5,4,5,6,7,10],"cm")
+maxheight = Measurement(200,5,"cm")
+
+class TestMappedMeasurementList(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        MappedMeasurementList.directory = self.directory.name
+        MappedMeasurementList.chunksize = 4
+        self.heights = MappedMeasurementList.save(heights, os.path.join(self.directory.name, "heights"))
+
+    def tearDown(self):
+        MappedMeasurementList.directory = None
+        MappedMeasurementList.chunksize = 2**20
+        self.directory.cleanup()
+
+    def test_open(self):
+        opened = MappedMeasurementList.open(self.heights.path)
+        self.assertEqual( repr(opened), repr(heights))
+        self.assertIsInstance( opened.values(), np.memmap)
+
+    def test_operators(self):
+        self.assertEqual( repr(self.heights + 1), repr(heights + 1))
+        self.assertEqual( repr(1 - self.heights), repr(1 - heights))
+        self.assertEqual( repr(self.heights * maxheight), repr(heights * maxheight))
+        self.assertEqual( repr(self.heights / self.heights), repr(heights / heights))
+        # A saved list is a new independent input
+        self.assertEqual( repr(heights / self.heights), repr(heights / MeasurementList.from_arrays(*heights.to_arrays(), "cm")))
+        self.assertEqual( repr(self.heights ** 2), repr(heights ** 2))
+        self.assertEqual( repr(np.sqrt(self.heights)), repr(np.sqrt(heights)))
+        self.assertEqual( repr(self.heights.to("m")), repr(heights.to("m")))
+        self.assertIsInstance( self.heights * 2, MappedMeasurementList)
+
+    def test_temporary_results(self):
+        # Intermediate results are deleted with them, while results given a path are kept
+        scaled = self.heights * 2
+        temporary = scaled.path
+        kept = self.heights.map(lambda x: x * 2, path=os.path.join(self.directory.name, "kept"))
+        self.assertTrue( os.path.exists(temporary))
+        del scaled
+        gc.collect()
+        self.assertFalse( os.path.exists(temporary))
+        self.assertEqual( repr(MappedMeasurementList.open(kept.path)), repr(heights * 2))
+
+    def test_reductions(self):
+        self.assertEqual( repr(self.heights.sum()), repr(heights.sum()))
+        self.assertEqual( repr(np.mean(self.heights)), repr(heights.mean()))
+        self.assertEqual( repr(np.std(self.heights)), repr(np.std(heights)))
+        self.assertEqual( repr(self.heights.std()), repr(heights.std()))
+
+    def test_functions(self):
+        ratios = self.heights / maxheight
+        self.assertEqual( repr(MeasurementList.sin(ratios)), repr(MeasurementList.sin(heights / maxheight)))
+        self.assertIsInstance( MeasurementList.sin(ratios), MappedMeasurementList)
+        self.assertEqual( repr(abs(-self.heights)), repr(abs(-heights)))
+        self.assertIsInstance( abs(self.heights), MappedMeasurementList)
+
+    def test_slices(self):
+        # Slices view the same files instead of reading them into memory
+        sliced = self.heights[1:5:2]
+        self.assertIsInstance( sliced, MappedMeasurementList)
+        self.assertIsInstance( sliced.values(), np.memmap)
+        self.assertEqual( repr(sliced), repr(heights[1:5:2]))
+        self.assertEqual( repr(self.heights[[0, 2]]), repr(heights[[0, 2]]))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            self.heights + MeasurementList([1],0.1,"cm")
+        with self.assertRaises(Exception):
+            self.heights + maxheight.to("V")
@@ -0,0 +1,51 @@
+from labtex import *
+import unittest
+import numpy as np
+
+x = Measurement(2,0.01,"m")
+lengths = MeasurementList([1,2,3],[0.01,0.02,0.03],"cm")
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_linear_agreement(self):
+        # For small relative uncertainties Monte Carlo agrees with first order propagation
+        mc = MonteCarlo(lambda l, x: l * x, lengths, x, samples=20000, seed=0)
+        self.assertEqual(repr(mc.result), repr(lengths * x))
+        self.assertEqual(repr(mc.result.unit), "cm^2")
+
+    def test_nonlinear(self):
+        mc = MonteCarlo(lambda t: np.tan(t), Measurement(1.4,0.1,""), samples=100000, seed=1)
+        self.assertGreater(mc.result.value, np.tan(1.4))
+        self.assertLess(mc.percentiles[2.5].value, mc.percentiles[50].value)
+        self.assertLess(mc.percentiles[50].value, mc.percentiles[97.5].value)
+
+    def test_seeded_chunks(self):
+        mc1 = MonteCarlo(lambda l: l ** 2, lengths, samples=1000, seed=5, chunksize=1000)
+        mc2 = MonteCarlo(lambda l: l ** 2, lengths, samples=1000, seed=5, chunksize=1000)
+        self.assertEqual(mc1.result.values().tolist(), mc2.result.values().tolist())
+
+    def test_correlation(self):
+        # Inputs are sampled from the independent inputs they depend on
+        self.assertEqual(repr(MonteCarlo(lambda a, b: a - b, x, x, seed=0).result), "0.0 m")
+        self.assertEqual(repr(MonteCarlo(lambda a, b: b - 2 * a, x, 2 * x, seed=0).result), "0.0 m")
+        self.assertEqual(repr(MonteCarlo(lambda a, b: a - b, lengths[::-1], lengths[::-1], seed=0).result), "[0.0, 0.0, 0.0] cm")
+        mc = MonteCarlo(lambda a, b: a - b, lengths, lengths.mean(), samples=100000, seed=0, chunksize=10**5)
+        self.assertTrue(np.allclose(mc.result.uncertainties(), (lengths - lengths.mean()).uncertainties(), rtol=0.02))
+
+    def test_units(self):
+        # Constants are in the units of the inputs, as for Measurements
+        self.assertEqual(repr(MonteCarlo(lambda a: a + 1, Measurement(1.0,0.1,"mm"), seed=0).result), "2.0 ± 0.1 mm")
+        self.assertEqual(MonteCarlo(lambda l: l, lengths, seed=0, unit="m").result.unit, Unit("m"))
+        with self.assertRaises(Exception):
+            MonteCarlo(lambda l: l, lengths, unit="s")
+
+    def test_discarded(self):
+        # Samples outside the domain of func are counted, and too many of them warn or raise
+        y = Measurement(0.1,0.1,"")
+        with self.assertWarns(RuntimeWarning):
+            mc = MonteCarlo(lambda y: np.log(y), y, samples=10000, seed=0)
+        self.assertTrue(1400 < mc.discarded < 1800)
+        with self.assertRaises(Exception):
+            MonteCarlo(lambda y: np.log(y), y, samples=10000, seed=0, nonfinite="raise")
+        self.assertEqual(MonteCarlo(lambda y: np.log(y), y, seed=0, tolerance=0.5).discarded, mc.discarded)
+        self.assertEqual(MonteCarlo(lambda l: np.sqrt(l), lengths, seed=0).discarded.tolist(), [0, 0, 0])
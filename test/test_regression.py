@@ -0,0 +1,112 @@
+from labtex import *
+import numpy as np
+import unittest
+
+x = np.linspace(0, 10, 20)
+rng = np.random.default_rng(1)
+y = 2 * x + 1 + rng.normal(0, 0.3, (50, 20))
+yerr = rng.uniform(0.2, 0.4, (50, 20))
+
+class TestBatchRegression(unittest.TestCase):
+
+    def test_batch(self):
+        fit = LinearRegression.batch(x, y, yerr)
+        self.assertEqual( fit["m"].shape, (50,))
+        for i in (0, 17, 49):
+            line = LinearRegression(MeasurementList(x,0,"s"), MeasurementList(y[i],yerr[i],"m"))
+            m, c = line.lobf["m"], line.lobf["c"]
+            self.assertTrue( np.allclose([fit["m"][i], fit["c"][i], fit["dm"][i], fit["dc"][i]], [m.value, c.value, m.uncertainty, c.uncertainty]))
+            self.assertAlmostEqual( fit["cov"][i], Measurement.covariance(m, c))
+
+    def test_axis(self):
+        fit = LinearRegression.batch(x, y, yerr)
+        transposed = LinearRegression.batch(x[:, None], y.T, yerr.T, axis=0)
+        for key in fit:
+            self.assertTrue( np.allclose(fit[key], transposed[key]))
+        self.assertTrue( np.allclose(LinearRegression.batch(x, y, 0.3)["m"], LinearRegression.batch(x, y, np.full_like(y, 0.3))["m"]))
+
+voltages = MeasurementList(1e6 + x, 0.1, "V")
+currents = MeasurementList(y[0], yerr[0], "mA")
+
+class TestOnlineRegression(unittest.TestCase):
+
+    def assertLine(self, fit, line):
+        for key in ("m", "c"):
+            self.assertAlmostEqual( fit.lobf[key].value / line.lobf[key].value, 1)
+            self.assertAlmostEqual( fit.lobf[key].uncertainty / line.lobf[key].uncertainty, 1)
+        self.assertAlmostEqual( Measurement.correlation(fit.lobf["m"], fit.lobf["c"]), Measurement.correlation(line.lobf["m"], line.lobf["c"]))
+
+    def test_update(self):
+        fit = OnlineLinearRegression("V", "mA")
+        for start in range(0, 20, 6):
+            fit.update(voltages[start:start + 6], currents[start:start + 6])
+        self.assertEqual( fit.count, 20)
+        self.assertLine(fit, LinearRegression(voltages, currents))
+        self.assertIs( fit.lobf, fit.lobf)
+
+    def test_merge(self):
+        merged = OnlineLinearRegression("V", "A").update(voltages[:7], currents[:7].to("A")) + OnlineLinearRegression("V", "A").update(voltages[7:].to("mV"), currents[7:])
+        self.assertLine(merged, LinearRegression(voltages, currents.to("A")))
+        self.assertEqual( merged.lobf["m"].unit, Unit("A V^-1"))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            OnlineLinearRegression("V", "mA").update(voltages, currents).merge(OnlineLinearRegression("s", "mA").update(MeasurementList(x,0,"s"), currents))
+        with self.assertRaises(Exception):
+            OnlineLinearRegression("V", "mA").update(voltages[:2], currents[:2]).lobf
+
+times = MeasurementList(x, 0, "s")
+distances = MeasurementList(0.5 * x**2 - x + 3 + rng.normal(0, 0.3, 20), yerr[1], "m")
+
+class TestLeastSquares(unittest.TestCase):
+
+    def test_polynomial(self):
+        fit = PolynomialRegression(times, distances, 2)
+        values, covariance = np.polyfit(x, distances.values(), 2, w=1/distances.uncertainties(), cov='unscaled')
+        self.assertTrue( np.allclose([ param.value for param in fit.params.values() ], values[::-1]))
+        self.assertTrue( np.allclose(np.asarray(PolynomialRegression(times, distances, 2, absolute_sigma=True).covariance), covariance[::-1, ::-1]))
+        self.assertEqual( fit.params["a2"].unit, Unit("m s^-2"))
+        self.assertAlmostEqual( Measurement.covariance(fit.params["a0"], fit.params["a2"]), fit.covariance.toarray()[0, 2])
+        self.assertAlmostEqual( fit.predict(2.0), fit.predict(Measurement(2, 0, "s")).value)
+
+    def test_linear(self):
+        line = LinearRegression(times, distances)
+        fit = LeastSquares(distances, {"m": times, "c": 1})
+        for key in ("m", "c"):
+            self.assertAlmostEqual( fit.params[key].value, line.lobf[key].value)
+            self.assertAlmostEqual( fit.params[key].uncertainty, line.lobf[key].uncertainty)
+        self.assertEqual( repr(fit.predict({"m": times, "c": 1})), repr(line.predict(times)))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            LeastSquares(distances, {"a": times, "b": times.to("ms")})
+        with self.assertRaises(Exception):
+            LeastSquares(distances, {"a": times[:5]})
+        with self.assertRaises(Exception):
+            PolynomialRegression(times[:3], distances[:3], 2)
+
+# Data of Pearson (1901) with the weights of York (1966)
+pearson = MeasurementList([0,0.9,1.8,2.6,3.3,4.4,5.2,6.1,6.5,7.4], 1/np.sqrt([1000,1000,500,800,200,80,60,20,1.8,1]), "")
+york = MeasurementList([5.9,5.4,4.4,4.6,3.5,3.7,2.8,2.8,2.4,1.5], 1/np.sqrt([1,1.8,4,8,20,20,70,70,100,500]), "")
+
+class TestErrorsInVariables(unittest.TestCase):
+
+    def test_york(self):
+        fit = LinearRegression(pearson, york, odr=True)
+        self.assertAlmostEqual( fit.lobf["m"].value, -0.48053, 5)
+        self.assertAlmostEqual( fit.lobf["c"].value, 5.47991, 5)
+        # Without uncertainties in x it is the ordinary fit
+        exact = MeasurementList(pearson.values(), 0, "")
+        self.assertEqual( repr(LinearRegression(exact, york, odr=True)), repr(LinearRegression(exact, york)))
+
+    def test_batch(self):
+        fit = LinearRegression.batch(pearson.values(), np.stack([york.values()] * 3), york.uncertainties(), xerr=pearson.uncertainties())
+        line = LinearRegression(pearson, york, odr=True)
+        self.assertTrue( np.allclose(fit["m"], line.lobf["m"].value))
+        self.assertTrue( np.allclose(fit["dc"], line.lobf["c"].uncertainty))
+        self.assertTrue( np.allclose(fit["cov"], Measurement.covariance(line.lobf["m"], line.lobf["c"])))
+
+    def test_nonlinear(self):
+        fit = NonlinearRegression(lambda x, m, c: m * x + c, pearson, york, odr=True)
+        self.assertTrue( np.allclose(fit.optimal_params, [-0.48053, 5.47991], atol=1e-5))
+        self.assertFalse( np.allclose(NonlinearRegression(lambda x, m, c: m * x + c, pearson, york).optimal_params, fit.optimal_params, atol=1e-2))
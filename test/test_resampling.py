@@ -0,0 +1,48 @@
+from labtex import *
+import numpy as np
+import unittest
+
+rng = np.random.default_rng(2)
+times = MeasurementList(np.linspace(0, 10, 40), 0.05, "s")
+distances = MeasurementList(2 * times.values() + 1 + rng.normal(0, 0.3, 40), 0.3, "m")
+line = LinearRegression(times, distances)
+
+def root(x, a, b):
+    return a * np.sqrt(x + 1) + b
+
+class TestResampling(unittest.TestCase):
+
+    def test_bootstrap(self):
+        bootstrap = Bootstrap(line, replicates=4000, seed=3)
+        self.assertEqual( bootstrap.replicates, 4000)
+        self.assertEqual( bootstrap.params["m"].value, line.lobf["m"].value)
+        self.assertEqual( bootstrap.params["c"].unit, Unit("m"))
+        self.assertAlmostEqual( bootstrap.params["m"].uncertainty / line.lobf["m"].uncertainty, 1, delta=0.15)
+        lower, upper = bootstrap.intervals["m"]
+        self.assertLess( lower.value, line.lobf["m"].value)
+        self.assertGreater( upper.value, line.lobf["m"].value)
+
+    def test_seeded_chunks(self):
+        # The replicates depend on the seed and chunks only, not on the processes fitting them
+        bootstrap = Bootstrap(line, replicates=100, seed=3, chunksize=400)
+        self.assertEqual( bootstrap.samples["m"].tolist(), Bootstrap(line, replicates=100, seed=3, chunksize=400, processes=2).samples["m"].tolist())
+        self.assertNotEqual( bootstrap.samples["m"].tolist(), Bootstrap(line, replicates=100, seed=4, chunksize=400).samples["m"].tolist())
+
+    def test_jackknife(self):
+        jackknife = Jackknife(line, chunksize=100)
+        self.assertEqual( jackknife.replicates, 40)
+        self.assertAlmostEqual( jackknife.samples["c"][0], LinearRegression(times[1:], distances[1:]).lobf["c"].value)
+        self.assertAlmostEqual( jackknife.params["m"].uncertainty / line.lobf["m"].uncertainty, 1, delta=0.25)
+
+    def test_fits(self):
+        curve = NonlinearRegression(root, times, distances)
+        bootstrap = Bootstrap(curve, replicates=50, seed=1)
+        self.assertEqual( list(bootstrap.params), [0, 1])
+        self.assertEqual( bootstrap.params[0].value, curve.optimal_params[0])
+        polynomial = PolynomialRegression(times, distances, 1)
+        self.assertTrue( np.allclose(Jackknife(polynomial).samples["a1"], Jackknife(line).samples["m"]))
+        self.assertTrue( np.allclose(Bootstrap(LinearRegression(times, distances, odr=True), replicates=10, seed=1).samples["m"], Bootstrap(line, replicates=10, seed=1).samples["m"], rtol=1e-2))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            Bootstrap(MonteCarlo(lambda x: x, times[0]))
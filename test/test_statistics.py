@@ -0,0 +1,29 @@
+from labtex import *
+import numpy as np
+import unittest
+
+heights = MeasurementList([185,183,182,194,184,177],[5,4,5,6,7,10],"cm")
+
+class TestStatistics(unittest.TestCase):
+
+    def test_single_pass(self):
+        statistics = heights.statistics()
+        for reduction in ("sum", "mean", "weighted_mean", "std", "sem"):
+            self.assertEqual( repr(getattr(statistics, reduction)()), repr(getattr(heights, reduction)()))
+
+    def test_merge(self):
+        merged = Statistics("cm").update(heights[:2]).update(heights[2:4].to("m")) + heights[4:].statistics()
+        self.assertEqual( merged.count, 6)
+        self.assertAlmostEqual( merged.std().value, heights.std().value)
+        self.assertAlmostEqual( merged.weighted_mean().value, heights.weighted_mean().value)
+        self.assertAlmostEqual( merged.sum().uncertainty, heights.sum().uncertainty)
+
+    def test_stability(self):
+        # A large offset would swamp the variance in a naive sum of squares
+        values = 1e9 + np.array([1., 2., 3., 4.])
+        statistics = Statistics("m").update(MeasurementList.from_arrays(values[:2], 1, "m")).update(MeasurementList.from_arrays(values[2:], 1, "m"))
+        self.assertAlmostEqual( statistics.std().value, np.std([1., 2., 3., 4.], ddof=1))
+
+    def test_exceptions(self):
+        with self.assertRaises(Exception):
+            Statistics("cm").update(MeasurementList([1],0.1,"V"))
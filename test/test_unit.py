@@ -6,6 +6,8 @@ class TestUnitClass(unittest.TestCase):
 
     def test_powerparsing(self):
         self.assertEqual(repr(Unit("m^2")), "m^2")
+        self.assertEqual(Unit("m^0.5 s^-1.5"), Unit("m") ** 0.5 / Unit("s") ** 1.5)
+        self.assertEqual(Unit("kg/m^0.25").dimensions, (-0.25, 1, 0, 0, 0))
     
     def test_prefixparsing(self):
         self.assertEqual(repr(Unit("um")), "um")
@@ -45,3 +47,42 @@ class TestUnitClass(unittest.TestCase):
         self.assertEqual(repr(Unit("V/m")), "V m^{-1}")
         self.assertEqual(repr(Unit("kg / s^2m")), "m^{-1} kg s^{-2}")
         self.assertEqual(repr(Unit("ngs^2 / C^3 mm^-1")), "C^{-3} mm ng s^2")
+
+    def test_interning(self):
+        self.assertIs(Unit("kg m^2"), Unit("kg m^2"))
+        self.assertIs(Unit("m/s"), Unit("m s^-1"))
+        self.assertIs(Unit("m") * Unit("s"), Unit("m s"))
+        with self.assertRaises(AttributeError):
+            Unit("m").units = {}
+
+    def test_addunit_invalidation(self):
+        # The registry is restored afterwards so "bar" does not leak into other tests
+        derivedUnits, knownUnits = dict(Unit.derivedUnits), list(Unit.knownUnits)
+        try:
+            with self.assertRaises(Exception):
+                Unit("bar")
+            Unit.addUnit("bar", "kg m^-1 s^-2", 1e5)
+            self.assertEqual(repr(Unit("bar")), "bar")
+            self.assertEqual(Measurement(1,0,"bar").to("kPa").value, 100)
+        finally:
+            Unit.derivedUnits, Unit.knownUnits = derivedUnits, knownUnits
+            Unit.clearcache()
+        with self.assertRaises(Exception):
+            Unit("bar")
+
+    def test_dimensions(self):
+        self.assertEqual(Unit("J").dimensions, (2, 1, -2, 0, 0))
+        self.assertEqual(Unit("kJ"), Unit("Mg m^2 s^-2"))
+        self.assertEqual(hash(Unit("N m")), hash(Unit("J")))
+        self.assertTrue(Unit("mm").samedimensions(Unit("km")))
+        self.assertNotEqual(Unit("mm"), Unit("km"))
+
+    def test_algebra(self):
+        self.assertEqual(repr(Unit("cm") * Unit("s^-1")), "cm s^{-1}")
+        self.assertIs(Unit("m") ** 2, Unit("m") ** 2)
+        factor, unit = Unit.product(Unit("cm"), Unit("m s^-1"))
+        self.assertAlmostEqual(factor, 100)
+        self.assertEqual(repr(unit), "cm^2 s^{-1}")
+        factor, unit = Unit.quotient(Unit("mm^2"), Unit("cm"))
+        self.assertAlmostEqual(factor, 10)
+        self.assertEqual(repr(unit), "mm")